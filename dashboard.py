@@ -3,17 +3,25 @@ from PyQt6.QtGui import *
 from PyQt6.QtCore import Qt
 from widgets import *
 from salles import *
-from database.candidats_db import CandidatsDB
-from database.salles_db import SallesDB
+from database.candidats_db import (CandidatsDB, CodesEnDoubleError, formater_code_en_double,
+                                   DTYPES_FICHIER_CANDIDATS, COLONNES_NUMERIQUES, SCHEMA_CANDIDATS)
+from database.salles_db import (SallesDB, DTYPES_FICHIER_SALLES, COLONNES_NUMERIQUES_SALLES,
+                                SCHEMA_SALLES, SCHEMA_SALLES_DB)
+from database.validation import valider, formater_resume
+from database.snapshot_cache import SnapshotCache
+from database.historique_imports import HistoriqueImports
+from database.lecture_fichiers import lire_excel, lire_csv, lire_salles_excel
+from database.inventaire_salles import inventaire_salles
+from modeles import (configurer_vue, HAUTEUR_LIGNE, ModeleCandidats, ModeleCandidatsSQL,
+                     ModeleSallesGroupees, ProxyRecherche)
 import os
 from datetime import datetime
 import pandas as pd
 import random
-from reportlab import *
 import sys
 from PyQt6.QtWidgets import QApplication
 from repartition import *
-from resultats import ResultatsDialog
+from db_async import AsyncDB
 
 class ConMedPartApp(QMainWindow):
     def __init__(self):
@@ -31,6 +39,11 @@ class ConMedPartApp(QMainWindow):
             # Créer au moins un centre par défaut si nécessaire
             self.salles_db.add_centre_if_empty("Centre par défaut")
             
+            # Instantanés disque des données nettoyées (démarrage sans relecture complète)
+            self.snapshots = SnapshotCache(os.path.join(os.path.dirname(self.candidats_db.db_path), 'cache'))
+            # Dernier fichier importé par type (réimport du même fichier sans relecture)
+            self.historique_imports = HistoriqueImports(self.snapshots.dossier)
+            
         except Exception as e:
             print(f"Erreur d'initialisation des bases de données: {e}")
             
@@ -56,8 +69,8 @@ class ConMedPartApp(QMainWindow):
         gc.enable()
 
     def setup_ui(self):
-        # Widget principal avec fond
-        self.background_widget = BackgroundWidget()
+        # Widget principal avec fond (image décodée à la taille des écrans)
+        self.background_widget = BackgroundWidget(taille_decodage=taille_ecrans())
         self.setCentralWidget(self.background_widget)
         
         # Layout principal
@@ -81,9 +94,8 @@ class ConMedPartApp(QMainWindow):
         main_layout.addLayout(content_layout)
         self.background_widget.setLayout(main_layout)
         
-        # Charger les données des bases de données
+        # Charger les données des bases de données (les statistiques sont mises à jour à la réception)
         self.charger_donnees_db()
-        self.mettre_a_jour_stats()
 
     def create_header(self, layout):
         header = QFrame()
@@ -171,6 +183,9 @@ class ConMedPartApp(QMainWindow):
         self.btn_import_candidats = ModernButton("Importer Liste Candidats")
         self.btn_import_candidats.clicked.connect(lambda: self.import_file('candidats'))
         
+        self.btn_import_multiple = ModernButton("Importer Plusieurs Fichiers", height=32)
+        self.btn_import_multiple.clicked.connect(self.importer_plusieurs_fichiers)
+        
         self.btn_import_salles = ModernButton("Gestion des Salles")
         self.btn_import_salles.clicked.connect(lambda: self.import_file('salles'))
         
@@ -182,6 +197,7 @@ class ConMedPartApp(QMainWindow):
         
         import_layout.addWidget(import_title)
         import_layout.addWidget(self.btn_import_candidats)
+        import_layout.addWidget(self.btn_import_multiple)
         import_layout.addWidget(self.info_candidats)
         import_layout.addWidget(self.btn_import_salles)
         import_layout.addWidget(self.info_salles)
@@ -338,8 +354,27 @@ class ConMedPartApp(QMainWindow):
         self.btn_show_salles.clicked.connect(self.afficher_salles)
         self.btn_show_salles.setEnabled(False)
         
+        # Recherche dans le tableau affiché
+        self.recherche = QLineEdit()
+        self.recherche.setPlaceholderText("Rechercher : code, CIN, nom ou prénom...")
+        self.recherche.setClearButtonEnabled(True)
+        self.recherche.setMinimumHeight(32)
+        self.recherche.setEnabled(False)
+        self.recherche.setStyleSheet("""
+            QLineEdit {
+                background-color: rgba(50, 50, 60, 0.7);
+                color: white;
+                border: 1px solid #394150;
+                border-radius: 5px;
+                padding: 4px 8px;
+                font-size: 13px;
+            }
+        """)
+        self.recherche.textChanged.connect(self.filtrer_resultats)
+        
         buttons_layout.addWidget(self.btn_show_candidats)
         buttons_layout.addWidget(self.btn_show_salles)
+        buttons_layout.addWidget(self.recherche)
         buttons_layout.setSpacing(10)
         buttons_frame.setLayout(buttons_layout)
         
@@ -356,10 +391,10 @@ class ConMedPartApp(QMainWindow):
             }
         """)
         
-        # Tableau pour l'affichage des résultats
-        self.results_table = QTableWidget()
-        self.results_table.setStyleSheet("""
-            QTableWidget {
+        # Tableau des résultats : les cellules sont lues dans le modèle au dessin
+        self.results_view = QTableView()
+        self.results_view.setStyleSheet("""
+            QTableView {
                 background-color: rgba(50, 50, 60, 0.7);
                 color: white;
                 border-radius: 5px;
@@ -375,13 +410,20 @@ class ConMedPartApp(QMainWindow):
             }
         """)
         # Empêcher l'édition des cellules
-        self.results_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.results_table.setVisible(False)
+        self.results_view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        configurer_vue(self.results_view)
+        # Largeur des colonnes estimée sur un échantillon de lignes
+        self.results_view.horizontalHeader().setResizeContentsPrecision(200)
+        self.results_view.horizontalHeader().sortIndicatorChanged.connect(self.controler_tri)
+        self.results_view.setVisible(False)
+        # Modèle affiché et filtre de recherche branché devant lui
+        self.modele_affiche = None
+        self.proxy_recherche = None
         
         results_layout.addWidget(results_title)
         results_layout.addWidget(buttons_frame)
         results_layout.addWidget(self.results_text)
-        results_layout.addWidget(self.results_table)
+        results_layout.addWidget(self.results_view)
         results_frame.setLayout(results_layout)
         
         # Ajouter les widgets à la page du tableau de bord
@@ -398,6 +440,8 @@ class ConMedPartApp(QMainWindow):
         
     def show_resultats(self):
         """Affiche la fenêtre des résultats"""
+        # Génération des documents (reportlab) chargée à la première ouverture
+        from resultats import ResultatsDialog
         resultats_dialog = ResultatsDialog(self)
         resultats_dialog.exec()
 
@@ -468,8 +512,9 @@ class ConMedPartApp(QMainWindow):
                 self.df_salles['climatise'] = self.df_salles['climatise'].astype(str)
                 self.df_salles['camera'] = self.df_salles['camera'].astype(str)
                 
-                # Sauvegarder dans la base de données
-                self.salles_db.save_salles(self.df_salles)
+                # Sauvegarder dans la base de données (le dialogue a déjà écrit ses modifications :
+                # seules d'éventuelles différences restantes sont appliquées)
+                self.salles_db.synchroniser_salles(self.df_salles)
                 
                 self.nb_salles = len(self.df_salles)
                 self.card_salles.update_value(self.nb_salles)
@@ -491,38 +536,43 @@ class ConMedPartApp(QMainWindow):
                     self.fichier_candidats = file_path
                     filename = os.path.basename(file_path)
                     
+                    # Fichier identique au dernier import et base inchangée : reprendre les données stockées
+                    if self.historique_imports.deja_importe('candidats', file_path, [self.candidats_db.db_path]):
+                        self.df_candidats = self.snapshots.charger_ou_construire(
+                            'candidats', [self.candidats_db.db_path], self.candidats_db.get_candidats
+                        )
+                        self.nb_candidats = len(self.df_candidats)
+                        self.card_candidats.update_value(self.nb_candidats)
+                        self.btn_show_candidats.setEnabled(True)
+                        self.info_candidats.setText(f"✅ {self.nb_candidats} candidats (fichier déjà importé)")
+                        self.mettre_a_jour_stats()
+                        return
 
-                    # Correction : forcer l'utilisation de l'engine openpyxl pour Excel
+                    # Excel : lecture en flux (openpyxl en lecture seule, par lots)
                     if file_path.endswith('.xlsx'):
-                        self.df_candidats = pd.read_excel(file_path, engine='openpyxl')
+                        self.df_candidats = lire_excel(file_path)
                     else:
-                        # Import CSV avec gestion d'encodage
-                        try:
-                            self.df_candidats = pd.read_csv(file_path, encoding='utf-8')
-                        except UnicodeDecodeError:
-                            try:
-                                self.df_candidats = pd.read_csv(file_path, encoding='latin1')
-                            except Exception as e2:
-                                raise Exception(f"Impossible de lire le fichier CSV en UTF-8 ou latin1 : {e2}")
+                        # Import CSV : encodage et séparateur détectés sur le début du fichier
+                        self.df_candidats = lire_csv(file_path, DTYPES_FICHIER_CANDIDATS, COLONNES_NUMERIQUES)
                     
-                    # Vérifier les cases vides
-                    missing = []
-                    for i, row in self.df_candidats.iterrows():
-                        for j, value in enumerate(row):
-                            if pd.isna(value) or (isinstance(value, str) and value.strip() == ""):
-                                col_name = self.df_candidats.columns[j]
-                                missing.append(f"Ligne {i+2}, colonne '{col_name}'")
+                    # Valider le fichier en une passe (cases vides, types, bornes, formats, doublons)
+                    validation = valider(self.df_candidats, SCHEMA_CANDIDATS)
                     
-                    # Sauvegarder dans la base de données si aucune case vide
-                    if not missing:
+                    # Sauvegarder dans la base de données si le fichier est valide
+                    if validation['valide']:
                         try:
-                            # Réinitialiser la base de données avant d'importer
-                            self.candidats_db.reinitialiser_db()
-                            self.candidats_db.save_candidats(self.df_candidats)
+                            # N'écrire que les lignes ajoutées, modifiées ou supprimées
+                            rapport = self.candidats_db.importer_differentiel(self.df_candidats)
                             self.nb_candidats = len(self.df_candidats)
                             self.card_candidats.update_value(self.nb_candidats)
                             self.btn_show_candidats.setEnabled(True)
-                            self.info_candidats.setText(f"✅ {self.nb_candidats} candidats importés")
+                            self.info_candidats.setText(
+                                f"✅ {self.nb_candidats} candidats importés "
+                                f"(+{len(rapport['ajouts'])} / ~{len(rapport['modifications'])} / "
+                                f"-{len(rapport['suppressions'])})"
+                            )
+                            self.historique_imports.enregistrer('candidats', file_path, [self.candidats_db.db_path])
+                            self.rafraichir_snapshots()
                         except ValueError as e:
                             # Créer une boîte de dialogue personnalisée pour les erreurs de validation
                             error_dialog = QDialog(self)
@@ -559,25 +609,39 @@ class ConMedPartApp(QMainWindow):
                             title_layout.addWidget(title)
                             layout.addLayout(title_layout)
                             
-                            # Message d'erreur scrollable
-                            text_area = QTextEdit()
-                            text_area.setReadOnly(True)
-                            text_area.setText(str(e))
-                            text_area.setStyleSheet("""
-                                QTextEdit {
-                                    background-color: rgba(40, 44, 52, 1);
-                                    color: #ffffff;
-                                    font-size: 14px;
-                                    font-weight: normal;
-                                    border: 2px solid rgba(255, 255, 255, 0.2);
-                                    border-radius: 6px;
-                                    padding: 15px;
-                                    selection-background-color: #3498db;
-                                    selection-color: white;
-                                }
-                            """)
-                            text_area.setMinimumHeight(200)
-                            layout.addWidget(text_area)
+                            if isinstance(e, CodesEnDoubleError):
+                                # Rapport complet des codes en double, mis en forme page par page
+                                rapport = e.rapport
+                                resume = QLabel(f"{len(rapport)} codes utilisés par plusieurs lignes :")
+                                resume.setStyleSheet("color: white; font-size: 14px;")
+                                layout.addWidget(resume)
+                                layout.addWidget(RapportPagine(
+                                    len(rapport),
+                                    lambda debut, fin: [
+                                        formater_code_en_double(*ligne)
+                                        for ligne in rapport.iloc[debut:fin].itertuples(index=False, name=None)
+                                    ]
+                                ))
+                            else:
+                                # Message d'erreur scrollable
+                                text_area = QTextEdit()
+                                text_area.setReadOnly(True)
+                                text_area.setText(str(e))
+                                text_area.setStyleSheet("""
+                                    QTextEdit {
+                                        background-color: rgba(40, 44, 52, 1);
+                                        color: #ffffff;
+                                        font-size: 14px;
+                                        font-weight: normal;
+                                        border: 2px solid rgba(255, 255, 255, 0.2);
+                                        border-radius: 6px;
+                                        padding: 15px;
+                                        selection-background-color: #3498db;
+                                        selection-color: white;
+                                    }
+                                """)
+                                text_area.setMinimumHeight(200)
+                                layout.addWidget(text_area)
                             
                             # Message d'aide
                             help_text = QLabel("Veuillez corriger ces erreurs dans votre fichier avant de réessayer l'importation.")
@@ -609,75 +673,9 @@ class ConMedPartApp(QMainWindow):
                             QMessageBox.critical(self, "Erreur", f"Erreur lors de la sauvegarde: {str(e)}")
                             return
                     else:
-                        msg = "Des cases vides ont été détectées dans le fichier des candidats.\n\n" + "\n".join(missing)
-                        # QDialog personnalisé pour l'erreur
-                        error_dialog = QDialog(self)
-                        error_dialog.setWindowTitle("Erreur - Cases vides détectées")
-                        error_dialog.setStyleSheet("""
-                           QDialog {
-                            background-color: rgba(40, 40, 50, 0.7);
-                            border-radius: 12px;
-                        }
-                         """)
-                        error_dialog.setMinimumWidth(500)
-                        layout = QVBoxLayout(error_dialog)
-                        title = QLabel("<span style='color:#3498db; font-size:18px; font-weight:bold;'>Des cases vides ont été détectées</span>")
-                        title.setTextFormat(Qt.TextFormat.RichText)
-                        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                        layout.addWidget(title)
-                        # Texte scrollable
-                        from PyQt6.QtWidgets import QTextEdit
-                        text_area = QTextEdit()
-                        text_area.setReadOnly(True)
-                        text_area.setText(msg)
-                        text_area.setStyleSheet("""
-                        QTextEdit {
-                            background: transparent;
-                            color: white;
-                            font-size: 15px;
-                            border: none;
-                         }
-                       """)
-                        text_area.setMinimumHeight(200)
-                        layout.addWidget(text_area)
-                       # Bouton fermer
-                        btn_close = QPushButton("Fermer")
-                        btn_close.setStyleSheet("""
-                        QPushButton {
-                            background-color: #3498db;
-                            color: white;
-                            border-radius: 6px;
-                            padding: 8px 24px;
-                            font-weight: bold;
-                            font-size: 15px;
-                        }
-                        QPushButton:hover {
-                            background-color: #217dbb;
-                        }
-                       """)
-                        btn_close.clicked.connect(error_dialog.accept)
-                        layout.addWidget(btn_close, alignment=Qt.AlignmentFlag.AlignCenter)
-                        error_dialog.exec()
+                        self.afficher_rapport_validation("Le fichier des candidats contient des erreurs", validation)
                         return
 
-                elif file_type == 'salles':
-                    self.fichier_salles = file_path
-                    filename = os.path.basename(file_path)
-                    self.info_salles.setText(f"✅ {filename}")
-
-                    if file_path.endswith('.xlsx'):
-                        self.df_salles = pd.read_excel(file_path, engine='openpyxl')
-                    else:
-                        self.df_salles = pd.read_csv(file_path)
-                    
-                    # Réinitialiser la base de données avant d'importer
-                    self.salles_db.reinitialiser_db()
-                    # Sauvegarder les nouvelles données
-                    self.salles_db.save_salles(self.df_salles)
-                    self.nb_salles = len(self.df_salles)
-                    self.card_salles.update_value(self.nb_salles)
-                    self.btn_show_salles.setEnabled(True)
-
             except Exception as e:
                 # Appliquer un style personnalisé aux QMessageBox pour les erreurs
                 error_box = QMessageBox()
@@ -718,44 +716,71 @@ class ConMedPartApp(QMainWindow):
                 error_box.setText(f"Erreur lors de l'importation : {str(e)}\n\nAssurez-vous que le fichier n'est pas ouvert dans Excel et que le format est correct.")
                 error_box.exec()
 
+    def afficher_modele(self, modele, hauteur_ligne=HAUTEUR_LIGNE):
+        """Affiche un modèle de tableau dans la zone de résultats"""
+        self.modele_affiche = modele
+        self.results_text.setVisible(False)
+        self.results_view.verticalHeader().setDefaultSectionSize(hauteur_ligne)
+        self.recherche.setEnabled(hasattr(modele, 'index_recherche') or isinstance(modele, ModeleCandidatsSQL))
+        self.installer_modele(modele)
+        if self.recherche.text().strip():
+            self.filtrer_resultats(self.recherche.text())
+        self.results_view.setVisible(True)
+
+    def installer_modele(self, modele):
+        """Branche le modèle sur la vue, derrière le filtre de recherche s'il est indexable"""
+        self.proxy_recherche = ProxyRecherche(modele) if hasattr(modele, 'index_recherche') else None
+        self.results_view.setModel(self.proxy_recherche or modele)
+        # Tri par clic sur l'en-tête seulement si le modèle sait trier
+        triable = getattr(modele, 'triable', False)
+        if triable:
+            self.results_view.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.results_view.setSortingEnabled(triable)
+        # QTableView n'interroge pas span() du modèle : appliquer ses fusions
+        self.results_view.clearSpans()
+        for ligne, colonne, nb in getattr(modele, 'fusions', list)():
+            self.results_view.setSpan(ligne, colonne, nb, 1)
+        self.results_view.resizeColumnsToContents()
+        self.results_view.scrollToTop()
+
+    def controler_tri(self, colonne, ordre):
+        """Remet l'indicateur de tri sur le tri courant si le modèle ne trie pas sur cette colonne"""
+        modele = self.results_view.model()
+        if not hasattr(modele, 'colonne_triable') or modele.colonne_triable(colonne):
+            return
+        entete = self.results_view.horizontalHeader()
+        entete.blockSignals(True)
+        entete.setSortIndicator(*modele.section_tri())
+        entete.blockSignals(False)
+
+    def filtrer_resultats(self, texte):
+        """Filtre le tableau affiché (Code, CIN, début du nom ou du prénom)"""
+        modele = self.modele_affiche
+        if modele is None:
+            return
+        if isinstance(modele, ModeleCandidatsSQL):
+            # La base n'est lue que par pages : la recherche porte sur les candidats en mémoire
+            source = self.proxy_recherche.sourceModel() if self.proxy_recherche else None
+            if texte.strip() and (source is None or source.df is not self.df_candidats):
+                self.installer_modele(ModeleCandidats(self.df_candidats))
+            elif not texte.strip() and source is not None:
+                self.installer_modele(modele)
+                return
+        if self.proxy_recherche is not None:
+            self.proxy_recherche.rechercher(texte)
+
     def afficher_candidats(self):
         if self.df_candidats is not None:
             try:
-                self.results_table.clearSpans()
-                self.results_text.setVisible(False)
-                self.results_table.setVisible(True)
-                self.results_table.clear()
-                self.results_table.setRowCount(len(self.df_candidats))
-                self.results_table.setColumnCount(len(self.df_candidats.columns))
-                self.results_table.setHorizontalHeaderLabels([str(col) for col in self.df_candidats.columns])
-                self.results_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-                for i, row in self.df_candidats.iterrows():
-                    for j, value in enumerate(row):
-                        col_name = self.df_candidats.columns[j].lower()
-                        display_value = value
-                        if isinstance(value, str) and ("-" in value and ":" in value):
-                            try:
-                                display_value = value.split()[0]
-                            except Exception:
-                                display_value = value
-                        elif (col_name in ["annee", "année", "anneenaissance", "annee_naissance"] or ("annee" in col_name or "année" in col_name)) and isinstance(value, float):
-                            if pd.isna(value):
-                                display_value = ""
-                            else:
-                                display_value = str(int(value))
-                        elif hasattr(value, 'strftime'):
-                            display_value = value.strftime('%d-%m-%Y')
-                        item = QTableWidgetItem(str(display_value))
-                        item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                        item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        self.results_table.setItem(i, j, item)
-                self.results_table.resizeColumnsToContents()
-                self.results_table.resizeRowsToContents()
-                self.results_table.scrollToTop()
-                for i in range(self.results_table.rowCount()):
-                    self.results_table.setRowHeight(i, 38)
+                # Candidats enregistrés : lus dans la base par pages au défilement ;
+                # sinon (données non enregistrées) formatés à l'affichage depuis le DataFrame
+                if self.candidats_db.contient_candidats():
+                    modele = ModeleCandidatsSQL(self.candidats_db)
+                else:
+                    modele = ModeleCandidats(self.df_candidats)
+                self.afficher_modele(modele, hauteur_ligne=38)
             except Exception as e:
-                self.results_table.setVisible(False)
+                self.results_view.setVisible(False)
                 self.results_text.setVisible(True)
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de la lecture : {str(e)}")
 
@@ -763,207 +788,62 @@ class ConMedPartApp(QMainWindow):
         """Affiche les salles dans le tableau avec des statistiques"""
         if self.df_salles is not None and not self.df_salles.empty:
             try:
-                # Réinitialiser le tableau
-                self.results_table.clearSpans()
-                self.results_table.clear()
-                self.results_text.setVisible(False)
-                self.results_table.setVisible(True)
-                
-                # Créer une copie du DataFrame pour ne pas modifier l'original
-                df = self.df_salles.copy()
-                
-                # Standardiser les noms de colonnes
-                df = df.rename(columns={
-                    "Centres d'examen": 'centre',
-                    "Locaux d'examen": 'nom',
-                    "Capacité": 'capacite',
-                    "Type": 'type',
-                    "Climatisé": 'climatise',
-                    "Camera": 'camera'
-                })
-                
-                # S'assurer que les capacités sont des nombres
-                df['capacite'] = pd.to_numeric(df['capacite'], errors='coerce')
-                
-                centres = df['centre'].unique()
-                
-                # Préparer le tableau
-                self.results_table.clear()
-                self.results_table.setRowCount(len(df))
-                self.results_table.setColumnCount(8)
-                self.results_table.setHorizontalHeaderLabels([
-                    "Centre", "Nom de la salle", "Capacité", "Climatisé", 
-                    "Caméra", "Type", "Total Centre", "Total Grandes Salles"
-                ])
-                
-                row_idx = 0
-                for centre in centres:
-                    centre_df = df[df['centre'] == centre]
-                    total = centre_df['capacite'].sum()
-                    total_grande = centre_df[centre_df['type'] == 'Grande']['capacite'].sum()
-                    n_salles = len(centre_df)
-                    
-                    for i, (_, salle) in enumerate(centre_df.iterrows()):
-                        # Centre (première colonne, fusionnée)
-                        if i == 0:
-                            centre_item = QTableWidgetItem(centre)
-                            centre_item.setBackground(QBrush(QColor(40, 40, 50)))
-                            centre_item.setForeground(QBrush(QColor("white")))
-                            centre_item.setFont(QFont("Arial", 11, QFont.Weight.Bold))
-                            centre_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                            self.results_table.setItem(row_idx, 0, centre_item)
-                            if n_salles > 1:
-                                self.results_table.setSpan(row_idx, 0, n_salles, 1)
-                        
-                            # Totaux (fusionnés aussi)
-                            total_item = QTableWidgetItem(str(int(total)))
-                            total_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                            self.results_table.setItem(row_idx, 6, total_item)
-                            if n_salles > 1:
-                                self.results_table.setSpan(row_idx, 6, n_salles, 1)
-                                
-                            total_grande_item = QTableWidgetItem(str(int(total_grande)))
-                            total_grande_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                            self.results_table.setItem(row_idx, 7, total_grande_item)
-                            if n_salles > 1:
-                                self.results_table.setSpan(row_idx, 7, n_salles, 1)
-                        
-                        # Informations de la salle
-                        nom_item = QTableWidgetItem(str(salle['nom']))
-                        nom_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        if str(salle['type']).strip() == 'Petite':
-                            nom_item.setForeground(QBrush(QColor("#FF0000")))
-                        if str(salle['type']).strip() == 'Petite':
-                            nom_item.setForeground(QBrush(QColor("#FF0000")))
-                        self.results_table.setItem(row_idx, 1, nom_item)
-                        
-                        capacite_item = QTableWidgetItem(str(int(salle['capacite'])))
-                        capacite_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        # Si c'est une petite salle, mettre le texte en rouge
-                        if str(salle['type']).strip() == 'Petite':
-                            capacite_item.setForeground(QBrush(QColor("#FF0000")))
-                        self.results_table.setItem(row_idx, 2, capacite_item)
-                        
-                        climatise_item = QTableWidgetItem(str(salle['climatise']))
-                        climatise_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        self.results_table.setItem(row_idx, 3, climatise_item)
-                        
-                        camera_item = QTableWidgetItem(str(salle['camera']))
-                        camera_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        self.results_table.setItem(row_idx, 4, camera_item)
-                        
-                        type_item = QTableWidgetItem(str(salle['type']))
-                        type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                        self.results_table.setItem(row_idx, 5, type_item)
-                        
-                        row_idx += 1
-                        
-                self.results_table.resizeColumnsToContents()
-                self.results_table.resizeRowsToContents()
-                
-                # Augmenter la hauteur des lignes
-                for i in range(self.results_table.rowCount()):
-                    self.results_table.setRowHeight(i, 38)
-                    
+                # Salles groupées par centre et totaux depuis l'inventaire partagé
+                self.afficher_modele(ModeleSallesGroupees(inventaire_salles(self.salles_db)), hauteur_ligne=38)
             except Exception as e:
-                self.results_table.setVisible(False)
+                self.results_view.setVisible(False)
                 self.results_text.setVisible(True)
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de l'affichage : {str(e)}")
 
     def charger_donnees_db(self):
-        """Charge les données depuis les bases de données"""
+        """Charge les données depuis les bases de données sans bloquer l'interface"""
+        self.card_status.update_value("Chargement...")
+        AsyncDB.instance().lire(
+            'donnees_initiales',
+            self.lire_donnees_db,
+            on_resultat=self.appliquer_donnees_db,
+            on_erreur=self.erreur_chargement_db
+        )
+
+    def lire_donnees_db(self):
+        """Lit les candidats et les salles (exécuté sur le thread base de données)"""
+        # Instantanés disque si les bases n'ont pas changé, sinon
+        # candidats typés et nettoyés en SQL, salles et centres en une seule requête
+        candidats = self.snapshots.charger_ou_construire(
+            'candidats', [self.candidats_db.db_path], self.candidats_db.get_candidats
+        )
+        salles = self.snapshots.charger_ou_construire(
+            'salles', [self.salles_db.db_path], self.salles_db.get_salles_avec_centres
+        )
+        return candidats, salles
+
+    def rafraichir_snapshots(self):
+        """Réécrit en arrière-plan les instantanés périmés après une importation"""
+        AsyncDB.instance().ecrire(self.lire_donnees_db)
+
+    def closeEvent(self, event):
+        """Attend les écritures en attente sur le thread base de données (instantanés) avant de fermer"""
+        AsyncDB.instance().arreter()
+        super().closeEvent(event)
+
+    def appliquer_donnees_db(self, donnees):
+        """Met à jour l'interface avec les données lues par charger_donnees_db"""
         try:
-            self.card_status.update_value("Chargement...")
-            
-            # Charger les candidats depuis la base de données
-            self.df_candidats = self.candidats_db.get_all_candidats()
-            self.df_candidats = self.df_candidats.fillna('')  # Remplacer les NaN par des chaînes vides
+            self.df_candidats, salles = donnees
             if self.df_candidats is not None and not self.df_candidats.empty:
-                # S'assurer que les colonnes nécessaires existent
-                colonnes_requises = ['Code', 'LastName', 'FirstName', 'region', 'province']
-                colonnes_manquantes = [col for col in colonnes_requises if col not in self.df_candidats.columns]
-                if colonnes_manquantes:
-                    raise Exception(f"Colonnes manquantes dans la base candidats : {', '.join(colonnes_manquantes)}")
-                
-                # Nettoyer les données des candidats
-                self.df_candidats['Code'] = self.df_candidats['Code'].astype(str)
-                self.df_candidats['LastName'] = self.df_candidats['LastName'].str.strip()
-                self.df_candidats['FirstName'] = self.df_candidats['FirstName'].str.strip()
-                self.df_candidats['region'] = self.df_candidats['region'].str.strip()
-                self.df_candidats['province'] = self.df_candidats['province'].str.strip()
-                
                 # Mettre à jour l'interface
                 self.nb_candidats = len(self.df_candidats)
                 self.card_candidats.update_value(self.nb_candidats)
                 self.btn_show_candidats.setEnabled(True)
                 self.info_candidats.setText(f"✅ {self.nb_candidats} candidats chargés")
             
-            # Charger les centres et salles depuis la base de données
-            centres = self.salles_db.get_all_centres()
-            if centres is None or centres.empty:
-                raise Exception("Aucun centre trouvé dans la base de données")
-                
-            all_salles = []
-            for _, centre in centres.iterrows():
-                salles = self.salles_db.get_salles_by_centre(centre['id'])
-                if not salles.empty:
-                    # Renommer les colonnes si nécessaire pour correspondre au format attendu
-                    column_mapping = {
-                        'Locaux d\'examen': 'nom',
-                        'Capacité': 'capacite',
-                        'Climatisé': 'climatise',
-                        'Caméra': 'camera',
-                        'Type': 'type'
-                    }
-                    
-                    # Normaliser les noms de colonnes (enlever les accents et mettre en minuscules)
-                    salles.columns = [col.strip().lower().replace('é', 'e').replace('è', 'e').replace('à', 'a') for col in salles.columns]
-                    
-                    # Renommer les colonnes selon le mapping
-                    for old_col, new_col in column_mapping.items():
-                        old_col_normalized = old_col.lower().replace('é', 'e').replace('è', 'e').replace('à', 'a')
-                        if old_col_normalized in salles.columns:
-                            salles = salles.rename(columns={old_col_normalized: new_col})
-                    
-                    # S'assurer que toutes les colonnes requises sont présentes
-                    colonnes_requises = ['nom', 'capacite', 'climatise', 'camera', 'type']
-                    colonnes_manquantes = [col for col in colonnes_requises if col not in salles.columns]
-                    if colonnes_manquantes:
-                        raise Exception(f"Colonnes manquantes pour le centre {centre['nom']} : {', '.join(colonnes_manquantes)}")
-                    
-                    # Ajouter le nom du centre
-                    salles['centre'] = centre['nom']
-                    all_salles.append(salles)
-            
-            if all_salles:
-                self.df_salles = pd.concat(all_salles)
-                
-                # Standardiser les noms de colonnes
-                self.df_salles = self.df_salles.rename(columns={
-                    'Centre': 'Centre',
-                    'Locaux d\'examen': 'Locaux d\'examen',
-                    'Capacité': 'Capacité',
-                    'Type': 'Type',
-                    'Climatisé': 'Climatisé',
-                    'Caméra': 'Caméra'
-                })
-                
-                # Nettoyer et convertir les types de données
-                self.df_salles['capacite'] = pd.to_numeric(self.df_salles['capacite'], errors='coerce')
-                self.df_salles['climatise'] = self.df_salles['climatise'].astype(str)
-                self.df_salles['camera'] = self.df_salles['camera'].astype(str)
-                self.df_salles['type'] = self.df_salles['type'].astype(str)
-                self.df_salles['nom'] = self.df_salles['nom'].str.strip()
-                self.df_salles['centre'] = self.df_salles['centre'].str.strip()
+            if not salles.empty:
+                self.df_salles = salles
                 
                 # Vérifier la validité des données
-                salles_invalides = self.df_salles[self.df_salles['capacite'].isna()]
-                if not salles_invalides.empty:
-                    raise Exception(f"Capacités invalides détectées dans les salles: {', '.join(salles_invalides['nom'].tolist())}")
-                    
-                if self.df_salles['capacite'].min() <= 0:
-                    salles_zero = self.df_salles[self.df_salles['capacite'] <= 0]['nom'].tolist()
-                    raise Exception(f"Les salles suivantes ont une capacité nulle ou négative : {', '.join(salles_zero)}")
+                validation = valider(self.df_salles, SCHEMA_SALLES_DB)
+                if not validation['valide']:
+                    raise Exception(f"Salles invalides dans la base :\n{formater_resume(validation)}")
                 
                 # Mettre à jour l'interface
                 self.nb_salles = len(self.df_salles)
@@ -978,13 +858,24 @@ class ConMedPartApp(QMainWindow):
                 print(f"- {self.nb_salles} salles dans {len(self.df_salles['centre'].unique())} centres")
                 print(f"- Capacité totale: {self.df_salles['capacite'].sum()} places")
             
+            self.mettre_a_jour_stats()
+            
         except Exception as e:
-            error_msg = f"Erreur lors du chargement des données: {str(e)}"
-            print(error_msg)
-            self.afficher_message_erreur("Erreur de chargement", error_msg)
-            self.df_candidats = pd.DataFrame()
-            self.df_salles = pd.DataFrame()
-            self.card_status.update_value("Erreur ❌")
+            self.erreur_chargement_db(e)
+
+    def erreur_chargement_db(self, e):
+        """Affiche l'erreur de chargement et réinitialise les données"""
+        error_msg = f"Erreur lors du chargement des données: {str(e)}"
+        print(error_msg)
+        self.afficher_message_erreur("Erreur de chargement", error_msg)
+        self.df_candidats = pd.DataFrame()
+        self.df_salles = pd.DataFrame()
+        self.card_status.update_value("Erreur ❌")
+        self.mettre_a_jour_stats()
+
+    def afficher_rapport_validation(self, titre, rapport):
+        """Affiche le rapport de validation d'un fichier : résumé par règle et détail paginé"""
+        DialogueRapportValidation(titre, rapport, self).exec()
 
     def importer_candidats(self):
         """Importe les candidats depuis un fichier Excel et les sauvegarde dans la base de données"""
@@ -998,10 +889,17 @@ class ConMedPartApp(QMainWindow):
             
             if fichier:
                 if fichier.endswith('.csv'):
-                    df = pd.read_csv(fichier)
+                    df = lire_csv(fichier, DTYPES_FICHIER_CANDIDATS, COLONNES_NUMERIQUES)
+                elif fichier.endswith('.xlsx'):
+                    df = lire_excel(fichier)
                 else:
                     df = pd.read_excel(fichier)
                 
+                validation = valider(df, SCHEMA_CANDIDATS)
+                if not validation['valide']:
+                    self.afficher_rapport_validation("Le fichier des candidats contient des erreurs", validation)
+                    return
+                
                 # Sauvegarder dans la base de données
                 self.candidats_db.save_candidats(df)
                 
@@ -1027,6 +925,133 @@ class ConMedPartApp(QMainWindow):
             error_box.setText(f"Erreur lors de l'importation : {str(e)}\n\nAssurez-vous que le fichier n'est pas ouvert dans Excel et que le format est correct.")
             error_box.exec()
 
+    def importer_plusieurs_fichiers(self):
+        """
+        Importe plusieurs fichiers de candidats (un par région) en une seule opération :
+        lecture et validation en parallèle, contrôle des codes communs à plusieurs
+        fichiers, puis écriture de l'ensemble fusionné en une transaction.
+        """
+        fichiers, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Sélectionner les fichiers des candidats",
+            "",
+            "Excel/CSV files (*.xlsx *.csv);;All files (*.*)"
+        )
+        if not fichiers:
+            return
+
+        # Lecture, validation et écriture sur le thread base de données : l'interface reste disponible
+        self.info_candidats.setText(f"⏳ Lecture de {len(fichiers)} fichiers...")
+        self.btn_import_multiple.setEnabled(False)
+        AsyncDB.instance().ecrire(
+            self.importer_fichiers_db, fichiers,
+            on_resultat=lambda import_multiple: self.terminer_import_multiple(fichiers, import_multiple),
+            on_erreur=self.erreur_import_multiple
+        )
+
+    def importer_fichiers_db(self, fichiers):
+        """
+        Import de plusieurs fichiers, exécuté sur le thread base de données (sans widgets).
+        Les fichiers du dernier import, base inchangée, ne sont pas relus.
+        :return: dictionnaire {'resultat': résultat de lire_fichiers_candidats (None si déjà importés),
+                 'rapport': rapport de importer_differentiel (None si rien n'a été écrit),
+                 'candidats': DataFrame des candidats en base}
+        """
+        from database.import_multiple import lire_fichiers_candidats
+        chemins_db = [self.candidats_db.db_path]
+        if self.historique_imports.deja_importe('candidats', fichiers, chemins_db):
+            candidats = self.snapshots.charger_ou_construire('candidats', chemins_db, self.candidats_db.get_candidats)
+            return {'resultat': None, 'rapport': None, 'candidats': candidats}
+
+        resultat = lire_fichiers_candidats(fichiers)
+        if not resultat['valide']:
+            return {'resultat': resultat, 'rapport': None, 'candidats': None}
+        # Tous les fichiers sont valides : une seule écriture pour l'ensemble fusionné
+        rapport = self.candidats_db.importer_differentiel(resultat['fusion'])
+        self.historique_imports.enregistrer('candidats', fichiers, chemins_db)
+        return {'resultat': resultat, 'rapport': rapport, 'candidats': resultat['fusion']}
+
+    def terminer_import_multiple(self, fichiers, import_multiple):
+        """Affiche l'issue d'un import multiple (appelé sur le thread Qt)"""
+        from database.import_multiple import formater_resume_fichiers
+        self.btn_import_multiple.setEnabled(True)
+        resultat, rapport = import_multiple['resultat'], import_multiple['rapport']
+        if resultat is not None and not resultat['valide']:
+            self.info_candidats.setText("❌ Import annulé : fichiers invalides")
+            self.afficher_resume_import_multiple(
+                "Les fichiers des candidats contiennent des erreurs", resultat
+            )
+            return
+
+        self.df_candidats = import_multiple['candidats']
+        self.fichier_candidats = fichiers[0]
+        self.nb_candidats = len(self.df_candidats)
+        self.mettre_a_jour_stats()
+        if resultat is None:
+            self.info_candidats.setText(f"✅ {self.nb_candidats} candidats (fichiers déjà importés)")
+            return
+        self.info_candidats.setText(
+            f"✅ {self.nb_candidats} candidats importés depuis {len(fichiers)} fichiers "
+            f"(+{len(rapport['ajouts'])} / ~{len(rapport['modifications'])} / "
+            f"-{len(rapport['suppressions'])})"
+        )
+        self.rafraichir_snapshots()
+
+        QMessageBox.information(
+            self,
+            "Succès",
+            f"{self.nb_candidats} candidats ont été importés avec succès\n\n"
+            + formater_resume_fichiers(resultat)
+        )
+
+    def erreur_import_multiple(self, e):
+        self.btn_import_multiple.setEnabled(True)
+        self.info_candidats.setText("❌ Erreur lors de l'import")
+        QMessageBox.critical(self, "Erreur", f"Erreur lors de l'importation : {str(e)}")
+
+    def afficher_resume_import_multiple(self, titre, resultat):
+        """Affiche le résumé par fichier d'un import multiple et le détail paginé des erreurs"""
+        from database.import_multiple import formater_resume_fichiers, details_import_multiple
+        error_dialog = QDialog(self)
+        error_dialog.setWindowTitle("Erreur - Fichiers invalides")
+        error_dialog.setStyleSheet("""
+           QDialog {
+            background-color: rgba(40, 40, 50, 0.7);
+            border-radius: 12px;
+        }
+         """)
+        error_dialog.setMinimumWidth(600)
+        layout = QVBoxLayout(error_dialog)
+        title = QLabel(f"<span style='color:#3498db; font-size:18px; font-weight:bold;'>{titre}</span>")
+        title.setTextFormat(Qt.TextFormat.RichText)
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        # Résumé fichier par fichier
+        resume_label = QLabel(formater_resume_fichiers(resultat))
+        resume_label.setStyleSheet("color: white; font-size: 14px; background: transparent;")
+        layout.addWidget(resume_label)
+        # Détail des violations et des codes communs, page par page
+        nb_elements, formater = details_import_multiple(resultat)
+        if nb_elements:
+            layout.addWidget(RapportPagine(nb_elements, formater))
+        btn_close = QPushButton("Fermer")
+        btn_close.setStyleSheet("""
+        QPushButton {
+            background-color: #3498db;
+            color: white;
+            border-radius: 6px;
+            padding: 8px 24px;
+            font-weight: bold;
+            font-size: 15px;
+        }
+        QPushButton:hover {
+            background-color: #217dbb;
+        }
+       """)
+        btn_close.clicked.connect(error_dialog.accept)
+        layout.addWidget(btn_close, alignment=Qt.AlignmentFlag.AlignCenter)
+        error_dialog.exec()
+
     def importer_salles(self):
         """Importe les salles depuis un fichier Excel et les sauvegarde dans la base de données"""
         try:
@@ -1038,17 +1063,27 @@ class ConMedPartApp(QMainWindow):
             )
             
             if fichier:
+                types_salles = None
                 if fichier.endswith('.csv'):
-                    df = pd.read_csv(fichier)
+                    df = lire_csv(fichier, DTYPES_FICHIER_SALLES, COLONNES_NUMERIQUES_SALLES)
+                elif fichier.endswith('.xlsx'):
+                    df, types_salles = lire_salles_excel(fichier)
                 else:
                     df = pd.read_excel(fichier)
                 
+                validation = valider(df, SCHEMA_SALLES)
+                if not validation['valide']:
+                    self.afficher_rapport_validation("Le fichier des salles contient des erreurs", validation)
+                    return
+                
+                # Sauvegarder dans la base de données (colonnes du fichier d'import)
+                succes, message = self.salles_db.save_salles(df, types_salles=types_salles)
+                if not succes:
+                    raise Exception(message)
+                
                 # Normaliser les noms de colonnes
                 df.columns = [col.strip().lower().replace('é', 'e').replace('è', 'e').replace('à', 'a') for col in df.columns]
                 
-                # Sauvegarder dans la base de données
-                self.salles_db.save_salles(df)
-                
                 # Mettre à jour les variables d'état
                 self.fichier_salles = fichier
                 self.df_salles = df
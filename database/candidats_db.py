@@ -1,8 +1,133 @@
 import sqlite3
 import pandas as pd
+import numpy as np
 import os
 import sys
 
+# Colonnes de la table candidats, dans l'ordre du fichier d'import
+COLONNES_CANDIDATS = ["Code", "FirstName", "LastName", "Cin", "DateNaissance",
+                      "TypeBac", "Genre", "LieuNaissance", "Annee", "MoyContCon",
+                      "MoyGenerale", "MoyNationale", "MoyRegional", "Score",
+                      "VersionEspace", "region", "province", "espace", "langues",
+                      "centreExamen", "gestionnaire", "serieBac"]
+
+COLONNES_NUMERIQUES = ['MoyContCon', 'MoyGenerale', 'MoyNationale', 'MoyRegional', 'Score']
+
+# Colonnes à faible cardinalité, chargées en 'category'
+COLONNES_CATEGORIELLES = ['region', 'province', 'langues', 'centreExamen', 'Genre']
+
+# Colonnes de tri indexées pour la consultation paginée (lire_page_candidats) ;
+# le tableau paginé ne propose que ces colonnes et Code au tri
+COLONNES_TRI_INDEXEES = ['LastName', 'FirstName', 'Cin', 'region', 'province', 'centreExamen']
+
+# Colonnes nécessaires à la répartition
+COLONNES_REPARTITION = ['Code', 'LastName', 'FirstName', 'region', 'province', 'langues', 'centreExamen']
+
+# Types explicites appliqués au chargement depuis SQLite
+DTYPES_CANDIDATS = {
+    col: ('float64' if col in COLONNES_NUMERIQUES
+          else 'category' if col in COLONNES_CATEGORIELLES
+          else 'object')
+    for col in COLONNES_CANDIDATS
+}
+
+# Colonnes texte, stockées telles quelles (str)
+COLONNES_TEXTE = [col for col in COLONNES_CANDIDATS if col not in COLONNES_NUMERIQUES]
+
+# Types imposés à la lecture des fichiers CSV : tout en texte (codes et CIN gardent
+# leurs zéros initiaux), les notes sont ensuite converties par la lecture
+DTYPES_FICHIER_CANDIDATS = {col: str for col in COLONNES_CANDIDATS}
+
+# Schéma de validation du fichier des candidats (voir database/validation.py) :
+# toutes les colonnes sont obligatoires et sans case vide. L'unicité du Code n'en
+# fait pas partie : detecter_codes_en_double la contrôle et nomme les candidats.
+SCHEMA_CANDIDATS = {col: {} for col in COLONNES_TEXTE}
+SCHEMA_CANDIDATS.update({
+    'Code': {'regex': r'[A-Za-z0-9_\-/.]+'},
+    'Cin': {'regex': r'[A-Za-z0-9]+'},
+    'DateNaissance': {'type': 'date', 'formats': ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%Y-%m-%d %H:%M:%S']},
+    'MoyContCon': {'type': 'nombre', 'min': 0, 'max': 20},
+    'MoyGenerale': {'type': 'nombre', 'min': 0, 'max': 20},
+    'MoyNationale': {'type': 'nombre', 'min': 0, 'max': 20},
+    'MoyRegional': {'type': 'nombre', 'min': 0, 'max': 20},
+    'Score': {'type': 'nombre', 'min': 0},
+})
+SCHEMA_CANDIDATS = {col: SCHEMA_CANDIDATS[col] for col in COLONNES_CANDIDATS}
+
+
+def _typer_candidats(df):
+    """Applique les types de stockage : float64 pour les notes, str pour le reste"""
+    df = df.copy()
+    for col in COLONNES_NUMERIQUES:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in COLONNES_TEXTE:
+        df[col] = df[col].fillna('').astype(str)
+    return df
+
+
+def calculer_empreintes(df):
+    """
+    Calcule une empreinte 64 bits par ligne (toutes les colonnes de la table).
+    Le DataFrame doit avoir été typé par _typer_candidats, pour qu'une ligne
+    lue en base et la même ligne lue dans un fichier donnent la même empreinte.
+    :return: Series d'entiers signés (stockables en INTEGER SQLite), indexée par Code
+    """
+    empreintes = pd.util.hash_pandas_object(df[COLONNES_CANDIDATS], index=False)
+    return pd.Series(empreintes.to_numpy().view('int64'), index=df['Code'].to_numpy())
+
+
+def _cle_tri(col):
+    """Expression SQL de tri d'une colonne (identique dans les index et les requêtes)"""
+    return 'Code' if col == 'Code' else f"IFNULL(\"{col}\", '')"
+
+
+def detecter_codes_en_double(df):
+    """
+    Détecte les codes utilisés par plusieurs lignes, en un seul passage vectorisé
+    (factorisation des codes puis tri stable), linéaire en la taille du fichier.
+    :return: DataFrame (Code, lignes, noms), une ligne par code en double, dans
+             l'ordre de première apparition ; 'lignes' contient les numéros de
+             ligne du fichier (en-tête en ligne 1)
+    """
+    masque = df['Code'].duplicated(keep=False).to_numpy()
+    if not masque.any():
+        return pd.DataFrame(columns=['Code', 'lignes', 'noms'])
+
+    doublons = df.loc[masque]
+    vide = pd.Series('', index=doublons.index)
+    noms = (doublons.get('FirstName', vide).astype(str) + ' ' +
+            doublons.get('LastName', vide).astype(str)).str.strip().to_numpy()
+    lignes = np.flatnonzero(masque) + 2
+
+    # Regrouper les lignes de chaque code : groupes numérotés par première apparition
+    groupes, codes = pd.factorize(doublons['Code'], sort=False, use_na_sentinel=False)
+    ordre = np.argsort(groupes, kind='stable')
+    bornes = np.flatnonzero(np.diff(groupes[ordre])) + 1
+    return pd.DataFrame({
+        'Code': np.asarray(codes, dtype=object),
+        'lignes': [bloc.tolist() for bloc in np.split(lignes[ordre], bornes)],
+        'noms': [bloc.tolist() for bloc in np.split(noms[ordre], bornes)],
+    })
+
+
+def formater_code_en_double(code, lignes, noms):
+    numeros = ', '.join(str(ligne) for ligne in lignes)
+    return f"Code {code} utilisé plusieurs fois (lignes {numeros}) pour : {', '.join(noms)}"
+
+
+class CodesEnDoubleError(ValueError):
+    """Codes en double dans un fichier d'import ; le rapport complet est dans self.rapport"""
+    APERCU = 20
+
+    def __init__(self, rapport):
+        self.rapport = rapport
+        apercu = [formater_code_en_double(*ligne)
+                  for ligne in rapport.head(self.APERCU).itertuples(index=False, name=None)]
+        if len(rapport) > self.APERCU:
+            apercu.append(f"... et {len(rapport) - self.APERCU} autres codes")
+        super().__init__("Codes en double détectés :\n" + "\n".join(apercu))
+
+
 class CandidatsDB:
     def __init__(self):
         """Initialise la base de données"""
@@ -34,6 +159,13 @@ class CandidatsDB:
                 if table_count == 0:
                     self.create_tables()
                     print("Base de données des candidats créée avec succès")
+                else:
+                    self._creer_table_empreintes(cursor)
+                    self._creer_index_tri(cursor)
+        except sqlite3.OperationalError as e:
+            # Base verrouillée ou occupée : elle n'est pas corrompue, ne surtout pas la recréer
+            print(f"Base de données des candidats inaccessible: {e}")
+            raise
         except sqlite3.Error as e:
             print(f"Erreur lors de l'initialisation de la base de données: {e}")
             if os.path.exists(self.db_path):
@@ -47,10 +179,31 @@ class CandidatsDB:
                 with sqlite3.connect(self.db_path) as conn:
                     cursor = conn.cursor()
                     cursor.execute('DROP TABLE IF EXISTS candidats')
+                    cursor.execute('DROP TABLE IF EXISTS candidats_empreintes')
                     self.create_tables()
         except Exception as e:
             print(f"Erreur lors de la réinitialisation de la base de données: {e}")
 
+    def _creer_table_empreintes(self, cursor):
+        """Table Code -> empreinte de la ligne, utilisée par l'import différentiel"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS candidats_empreintes (
+                Code TEXT PRIMARY KEY,
+                empreinte INTEGER NOT NULL
+            )
+        ''')
+
+    def _creer_index_tri(self, cursor):
+        """
+        Index (valeur de tri, Code) des colonnes de COLONNES_TRI_INDEXEES, créés avec la
+        table : la lecture paginée n'écrit jamais dans la base (ce qui changerait sa
+        signature, utilisée par le cache d'instantanés et l'historique des imports).
+        """
+        for col in COLONNES_TRI_INDEXEES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_candidats_tri_{col}" ON candidats({_cle_tri(col)}, Code)'
+            )
+
     def create_tables(self):
         """Crée la table des candidats si elle n'existe pas"""
         try:
@@ -83,7 +236,9 @@ class CandidatsDB:
                     serieBac TEXT
                 )
             ''')
-            conn.commit()
+                self._creer_table_empreintes(cursor)
+                self._creer_index_tri(cursor)
+                conn.commit()
         except sqlite3.Error as e:
             print(f"Erreur lors de la création de la table candidats: {e}")
             # Créer un nouveau fichier de base de données si erreur
@@ -92,61 +247,55 @@ class CandidatsDB:
             self.create_tables()
 
     def check_duplicate_codes(self, df):
-        """Vérifie s'il y a des codes en double dans le DataFrame"""
-        duplicates = df[df.duplicated(['Code'], keep=False)]
-        if not duplicates.empty:
-            duplicate_codes = duplicates['Code'].unique()
-            error_details = []
-            for code in duplicate_codes:
-                rows = duplicates[duplicates['Code'] == code]
-                candidates = [f"{row['FirstName']} {row['LastName']}" for _, row in rows.iterrows()]
-                error_details.append(f"Code {code} utilisé plusieurs fois pour : {', '.join(candidates)}")
-            raise ValueError("Codes en double détectés :\n" + "\n".join(error_details))
+        """
+        Vérifie s'il y a des codes en double dans le DataFrame.
+        :raises CodesEnDoubleError: avec le rapport structuré (voir detecter_codes_en_double)
+        """
+        rapport = detecter_codes_en_double(df)
+        if not rapport.empty:
+            raise CodesEnDoubleError(rapport)
+
+    def preparer_candidats(self, df):
+        """
+        Nettoie et type un DataFrame de candidats comme il sera stocké en base.
+        :raises ValueError: codes en double ou colonnes manquantes
+        :return: DataFrame limité aux colonnes de la table, sans doublon de Code
+        """
+        required_columns = COLONNES_CANDIDATS
+        
+        # Nettoyer les données avant la sauvegarde
+        df = df.copy()
+        for col in df.columns:
+            if col in required_columns:
+                if df[col].dtype == 'object':
+                    df[col] = df[col].fillna('')
+                else:
+                    df[col] = df[col].fillna(0)
+        
+        # Vérifier les codes en double avant de faire quoi que ce soit
+        self.check_duplicate_codes(df)
+        
+        # Vérifier les colonnes manquantes
+        missing_cols = [col for col in required_columns if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Colonnes manquantes dans le fichier: {', '.join(missing_cols)}")
+        
+        # Supprimer les doublons basés sur le Code
+        initial_count = len(df)
+        df = df.drop_duplicates(subset=['Code'], keep='first')
+        duplicates_removed = initial_count - len(df)
+        if duplicates_removed > 0:
+            print(f"Info: {duplicates_removed} doublons de Code ont été supprimés")
+        
+        return _typer_candidats(df[required_columns])
 
     def save_candidats(self, df):
         try:
             # S'assurer que la table existe
             self.create_tables()
             
-            # Vérifier que les colonnes requises sont présentes
-            required_columns = ["Code", "FirstName", "LastName", "Cin", "DateNaissance", 
-                            "TypeBac", "Genre", "LieuNaissance", "Annee", "MoyContCon",
-                            "MoyGenerale", "MoyNationale", "MoyRegional", "Score",
-                            "VersionEspace", "region", "province", "espace", "langues",
-                            "centreExamen", "gestionnaire", "serieBac"]
-            
-            # Nettoyer les données avant la sauvegarde
-            df = df.copy()
-            for col in df.columns:
-                if col in required_columns:
-                    if df[col].dtype == 'object':
-                        df[col] = df[col].fillna('')
-                    else:
-                        df[col] = df[col].fillna(0)
-            
-            # Vérifier les codes en double avant de faire quoi que ce soit
-            self.check_duplicate_codes(df)
-            
-            # Vérifier les colonnes manquantes
-            missing_cols = [col for col in required_columns if col not in df.columns]
-            if missing_cols:
-                raise ValueError(f"Colonnes manquantes dans le fichier: {', '.join(missing_cols)}")
-            
-            # Supprimer les doublons basés sur le Code
-            initial_count = len(df)
-            df = df.drop_duplicates(subset=['Code'], keep='first')
-            duplicates_removed = initial_count - len(df)
-            if duplicates_removed > 0:
-                print(f"Info: {duplicates_removed} doublons de Code ont été supprimés")
-            
-            # Convertir les types de données
-            numeric_cols = ['MoyContCon', 'MoyGenerale', 'MoyNationale', 'MoyRegional', 'Score']
-            for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            text_cols = [col for col in required_columns if col not in numeric_cols]
-            for col in text_cols:
-                df[col] = df[col].astype(str)
+            required_columns = COLONNES_CANDIDATS
+            df = self.preparer_candidats(df)
 
             # Se connecter à la base de données
             success_count = 0
@@ -182,6 +331,10 @@ class CandidatsDB:
                 
                 # Valider les changements seulement si tout s'est bien passé
                 if error_count == 0:
+                    cursor.executemany(
+                        'INSERT OR REPLACE INTO candidats_empreintes (Code, empreinte) VALUES (?, ?)',
+                        calculer_empreintes(df).items()
+                    )
                     conn.commit()
                     print(f"Importation terminée: {success_count} candidats importés avec succès")
                 else:
@@ -196,11 +349,175 @@ class CandidatsDB:
             print(error_msg)
             raise Exception(error_msg)
 
+    def _lire_empreintes(self, conn):
+        """
+        Lit les empreintes stockées (Code -> empreinte).
+        Si elles sont incomplètes (base remplie avant l'import différentiel),
+        elles sont recalculées une fois depuis la table candidats.
+        """
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM candidats')
+        nb_candidats = cursor.fetchone()[0]
+        stockees = pd.read_sql_query('SELECT Code, empreinte FROM candidats_empreintes', conn)
+        if len(stockees) == nb_candidats:
+            return pd.Series(stockees['empreinte'].to_numpy(), index=stockees['Code'].to_numpy())
+
+        colonnes = ', '.join(f'"{col}"' for col in COLONNES_CANDIDATS)
+        existants = _typer_candidats(pd.read_sql_query(f'SELECT {colonnes} FROM candidats', conn))
+        empreintes = calculer_empreintes(existants)
+        cursor.execute('DELETE FROM candidats_empreintes')
+        cursor.executemany(
+            'INSERT INTO candidats_empreintes (Code, empreinte) VALUES (?, ?)',
+            zip(empreintes.index.tolist(), empreintes.tolist())
+        )
+        return empreintes
+
+    def importer_differentiel(self, df):
+        """
+        Importe un fichier de candidats en n'écrivant que les lignes qui ont changé.
+        Chaque ligne est comparée par son Code à l'empreinte stockée : les nouveaux
+        codes sont insérés, les lignes modifiées mises à jour, les codes absents du
+        fichier supprimés, le tout dans une seule transaction. Si rien n'a changé,
+        la base n'est pas modifiée.
+        :param df: DataFrame issu du fichier d'import
+        :raises ValueError: codes en double ou colonnes manquantes
+        :return: dictionnaire {'ajouts': [codes], 'modifications': [codes],
+                 'suppressions': [codes], 'inchanges': nombre}
+        """
+        df = self.preparer_candidats(df)
+        nouvelles = calculer_empreintes(df)
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                anciennes = self._lire_empreintes(conn)
+
+                deja_presents = nouvelles.index.isin(anciennes.index)
+                ajouts = nouvelles.index[~deja_presents]
+                suppressions = anciennes.index[~anciennes.index.isin(nouvelles.index)]
+                communs = nouvelles.index[deja_presents]
+                modifications = communs[nouvelles[communs].to_numpy() != anciennes[communs].to_numpy()]
+
+                lignes = df.set_index(df['Code'].to_numpy())
+
+                if len(suppressions):
+                    codes = [(code,) for code in suppressions]
+                    cursor.executemany('DELETE FROM candidats WHERE Code = ?', codes)
+                    cursor.executemany('DELETE FROM candidats_empreintes WHERE Code = ?', codes)
+
+                if len(modifications):
+                    colonnes_maj = [col for col in COLONNES_CANDIDATS if col != 'Code']
+                    assignations = ', '.join(f'"{col}" = ?' for col in colonnes_maj)
+                    cursor.executemany(
+                        f'UPDATE candidats SET {assignations} WHERE Code = ?',
+                        lignes.loc[modifications, colonnes_maj + ['Code']].itertuples(index=False, name=None)
+                    )
+
+                if len(ajouts):
+                    colonnes = ', '.join(f'"{col}"' for col in COLONNES_CANDIDATS)
+                    placeholders = ', '.join('?' for _ in COLONNES_CANDIDATS)
+                    cursor.executemany(
+                        f'INSERT INTO candidats ({colonnes}) VALUES ({placeholders})',
+                        lignes.loc[ajouts, COLONNES_CANDIDATS].itertuples(index=False, name=None)
+                    )
+
+                ecrites = nouvelles[nouvelles.index.isin(ajouts.union(modifications))]
+                if len(ecrites):
+                    cursor.executemany(
+                        'INSERT OR REPLACE INTO candidats_empreintes (Code, empreinte) VALUES (?, ?)',
+                        zip(ecrites.index.tolist(), ecrites.tolist())
+                    )
+                conn.commit()
+        except sqlite3.Error as e:
+            error_msg = f"Erreur lors de l'import différentiel: {str(e)}"
+            print(error_msg)
+            raise Exception(error_msg)
+
+        rapport = {
+            'ajouts': ajouts.tolist(),
+            'modifications': modifications.tolist(),
+            'suppressions': suppressions.tolist(),
+            'inchanges': len(communs) - len(modifications),
+        }
+        print(f"Import différentiel: {len(rapport['ajouts'])} ajouts, "
+              f"{len(rapport['modifications'])} modifications, "
+              f"{len(rapport['suppressions'])} suppressions, "
+              f"{rapport['inchanges']} inchangés")
+        return rapport
+
     def get_all_candidats(self):
         """Récupère tous les candidats de la base de données"""
         with sqlite3.connect(self.db_path) as conn:
             return pd.read_sql_query('SELECT * FROM candidats', conn)
 
+    def get_candidats(self, colonnes=None):
+        """
+        Charge les candidats en ne lisant que les colonnes demandées, avec des types explicites.
+        Les colonnes texte sont nettoyées directement en SQL (TRIM, NULL -> ''),
+        les colonnes à faible cardinalité sont chargées en 'category'.
+        :param colonnes: liste de colonnes à charger (toutes par défaut), ex. COLONNES_REPARTITION
+        :return: DataFrame typé
+        """
+        colonnes = list(colonnes) if colonnes else list(COLONNES_CANDIDATS)
+        inconnues = [col for col in colonnes if col not in COLONNES_CANDIDATS]
+        if inconnues:
+            raise ValueError(f"Colonnes inconnues : {', '.join(inconnues)}")
+        
+        select = []
+        for col in colonnes:
+            if col in COLONNES_NUMERIQUES:
+                select.append(f'"{col}"')
+            else:
+                select.append(f"TRIM(COALESCE(CAST(\"{col}\" AS TEXT), '')) as \"{col}\"")
+        
+        with sqlite3.connect(self.db_path) as conn:
+            df = pd.read_sql_query(f"SELECT {', '.join(select)} FROM candidats", conn)
+        return df.astype({col: DTYPES_CANDIDATS[col] for col in colonnes})
+
+    def lire_page_candidats(self, tri='Code', decroissant=False, apres=None, taille=500):
+        """
+        Lit une page de candidats triée, par pagination sur clé (keyset) : la page
+        suivante reprend après la clé (valeur de tri, Code) de la dernière ligne lue,
+        sans OFFSET. Pour Code et COLONNES_TRI_INDEXEES, SQLite parcourt l'index
+        (valeur, Code) dans un sens ou dans l'autre ; les autres colonnes sont triées
+        sans index. La base n'est jamais modifiée.
+        :param tri: colonne de tri
+        :param decroissant: ordre décroissant
+        :param apres: clé de la dernière ligne de la page précédente (None = début)
+        :param taille: nombre de lignes de la page
+        :return: (lignes dans l'ordre de COLONNES_CANDIDATS, clé de la dernière ligne ou None)
+        """
+        if tri not in COLONNES_CANDIDATS:
+            raise ValueError(f"Colonne de tri inconnue : {tri}")
+        cle = _cle_tri(tri)
+        sens, comparaison = ('DESC', '<') if decroissant else ('ASC', '>')
+
+        select = []
+        for col in COLONNES_CANDIDATS:
+            if col in COLONNES_NUMERIQUES:
+                select.append(f'"{col}"')
+            else:
+                select.append(f"TRIM(COALESCE(CAST(\"{col}\" AS TEXT), ''))")
+        select += [cle, 'Code']
+
+        if tri == 'Code':
+            ordre = f'Code {sens}'
+            condition, params = ('WHERE Code ' + comparaison + ' ?', [apres[1]]) if apres else ('', [])
+        else:
+            ordre = f'{cle} {sens}, Code {sens}'
+            condition, params = (f'WHERE ({cle}, Code) {comparaison} (?, ?)', list(apres)) if apres else ('', [])
+
+        with sqlite3.connect(self.db_path) as conn:
+            lignes = conn.execute(
+                f"SELECT {', '.join(select)} FROM candidats {condition} ORDER BY {ordre} LIMIT ?",
+                params + [taille]
+            ).fetchall()
+
+        if not lignes:
+            return [], None
+        derniere = lignes[-1]
+        return [ligne[:-2] for ligne in lignes], (derniere[-2], derniere[-1])
+
     def get_candidat_by_code(self, code):
         """Récupère un candidat par son code"""
         with sqlite3.connect(self.db_path) as conn:
@@ -246,8 +563,14 @@ class CandidatsDB:
             
             return stats
 
+    def contient_candidats(self):
+        """Vrai si la base contient au moins un candidat (sans parcourir la table)"""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute('SELECT EXISTS(SELECT 1 FROM candidats)').fetchone()[0] == 1
+
     def clear_all_candidats(self):
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM candidats')
+            cursor.execute('DELETE FROM candidats_empreintes')
             conn.commit()
@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from database.snapshot_cache import signatures_db
+
+# Historique du dernier import par type ('candidats', 'salles').
+# Pour chaque import réussi on garde le chemin, la taille, la date de modification
+# et l'empreinte du contenu de chaque fichier (un import peut en réunir plusieurs),
+# ainsi que la signature de la base juste après l'écriture. Si l'opérateur
+# sélectionne à nouveau les mêmes fichiers et que la base n'a pas changé depuis,
+# lecture, validation et écriture sont inutiles.
+
+TAILLE_BLOC = 1024 * 1024
+
+
+def empreinte_fichier(chemin):
+    """Empreinte BLAKE2b du contenu d'un fichier, lu par blocs"""
+    empreinte = hashlib.blake2b(digest_size=20)
+    with open(chemin, 'rb') as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC), b''):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+
+def _liste(chemins_fichiers):
+    return [chemins_fichiers] if isinstance(chemins_fichiers, str) else list(chemins_fichiers)
+
+
+class HistoriqueImports:
+    def __init__(self, dossier):
+        """
+        :param dossier: répertoire du fichier d'historique (créé si besoin)
+        """
+        self.dossier = dossier
+        os.makedirs(self.dossier, exist_ok=True)
+        self.chemin = os.path.join(self.dossier, 'imports.json')
+        # Import multiple enregistré depuis le thread base de données, les autres depuis l'interface
+        self._verrou = threading.Lock()
+
+    def _lire(self):
+        try:
+            with open(self.chemin, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Historique des imports illisible, ignoré: {e}")
+            return {}
+
+    def _ecrire(self, historique):
+        temporaire = None
+        try:
+            fd, temporaire = tempfile.mkstemp(prefix='imports.json.', suffix='.tmp', dir=self.dossier)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(historique, f, indent=2)
+            os.replace(temporaire, self.chemin)
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de l'historique des imports: {e}")
+            if temporaire and os.path.exists(temporaire):
+                os.remove(temporaire)
+
+    def deja_importe(self, type_fichier, chemins_fichiers, chemins_db):
+        """
+        Indique si ces fichiers sont ceux du dernier import et si la base n'a pas changé depuis.
+        Le contenu n'est relu (empreinte) que si la taille est identique mais que
+        le chemin ou la date de modification diffèrent (copie, réenregistrement).
+        :param chemins_fichiers: chemin du fichier, ou liste des fichiers d'un import multiple
+        """
+        with self._verrou:
+            chemins_fichiers = _liste(chemins_fichiers)
+            historique = self._lire()
+            dernier = historique.get(type_fichier)
+            if not dernier or dernier.get('signature_db') != signatures_db(chemins_db):
+                return False
+            fichiers = dernier.get('fichiers', [])
+            if len(fichiers) != len(chemins_fichiers):
+                return False
+
+            a_relire = []
+            for fichier, chemin_fichier in zip(fichiers, chemins_fichiers):
+                infos = os.stat(chemin_fichier)
+                if infos.st_size != fichier['taille']:
+                    return False
+                chemin_absolu = os.path.abspath(chemin_fichier)
+                if chemin_absolu != fichier['chemin'] or infos.st_mtime_ns != fichier['mtime_ns']:
+                    a_relire.append((fichier, chemin_fichier, chemin_absolu, infos))
+            if not a_relire:
+                return True
+
+            for fichier, chemin_fichier, chemin_absolu, infos in a_relire:
+                if empreinte_fichier(chemin_fichier) != fichier['empreinte']:
+                    return False
+                # Même contenu : retenir ce chemin et cette date pour la prochaine fois
+                fichier.update({'chemin': chemin_absolu, 'mtime_ns': infos.st_mtime_ns})
+            self._ecrire(historique)
+            return True
+
+    def enregistrer(self, type_fichier, chemins_fichiers, chemins_db):
+        """
+        Enregistre un import réussi (à appeler après l'écriture en base)
+        :param chemins_fichiers: chemin du fichier, ou liste des fichiers d'un import multiple
+        """
+        fichiers = []
+        for chemin_fichier in _liste(chemins_fichiers):
+            infos = os.stat(chemin_fichier)
+            fichiers.append({
+                'chemin': os.path.abspath(chemin_fichier),
+                'taille': infos.st_size,
+                'mtime_ns': infos.st_mtime_ns,
+                'empreinte': empreinte_fichier(chemin_fichier),
+            })
+        with self._verrou:
+            historique = self._lire()
+            historique[type_fichier] = {
+                'fichiers': fichiers,
+                'signature_db': signatures_db(chemins_db),
+            }
+            self._ecrire(historique)
@@ -0,0 +1,196 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from database.candidats_db import (SCHEMA_CANDIDATS, DTYPES_FICHIER_CANDIDATS, COLONNES_NUMERIQUES,
+                                   detecter_codes_en_double, formater_code_en_double)
+from database.lecture_fichiers import lire_excel, lire_csv
+from database.validation import valider, formater_resume, formater_detail
+
+# Import de plusieurs fichiers de candidats (un par région) en une opération.
+# Chaque fichier est lu et validé dans un processus séparé ; le processus principal
+# ne fait que rassembler les résultats, chercher les codes présents dans plusieurs
+# fichiers et fusionner les fichiers valides en un seul DataFrame, qui est ensuite
+# écrit en base en une transaction (CandidatsDB.importer_differentiel).
+
+
+def lire_et_valider_candidats(chemin):
+    """
+    Lit et valide un fichier de candidats (exécuté dans un processus de travail).
+    :return: (DataFrame, rapport de validation, codes en double du fichier
+             (voir detecter_codes_en_double), durée en secondes)
+    """
+    debut = time.perf_counter()
+    if chemin.lower().endswith('.csv'):
+        df = lire_csv(chemin, DTYPES_FICHIER_CANDIDATS, COLONNES_NUMERIQUES)
+    elif chemin.lower().endswith('.xlsx'):
+        df = lire_excel(chemin)
+    else:
+        df = pd.read_excel(chemin)
+    validation = valider(df, SCHEMA_CANDIDATS)
+    codes_en_double = detecter_codes_en_double(df) if 'Code' in df.columns else pd.DataFrame()
+    return df, validation, codes_en_double, time.perf_counter() - debut
+
+
+def detecter_codes_inter_fichiers(tables):
+    """
+    Codes présents dans plusieurs fichiers.
+    Les codes de chaque fichier (dédoublonnés, les doublons internes relevant de la
+    validation) sont rassemblés dans une seule table ; une passe de hachage sur le
+    Code repère ceux qui apparaissent dans plus d'un fichier.
+    :param tables: dictionnaire nom de fichier -> DataFrame (ordre des fichiers conservé)
+    :return: DataFrame (Code, fichier, ligne) trié par code puis par fichier,
+             ligne = première ligne du code dans le fichier
+    """
+    occurrences = []
+    for fichier, df in tables.items():
+        if 'Code' not in df.columns or df.empty:
+            continue
+        codes = df['Code'].astype(str).str.strip()
+        premieres = ~codes.duplicated().to_numpy()
+        occurrences.append(pd.DataFrame({
+            'Code': codes.to_numpy()[premieres],
+            'fichier': fichier,
+            'ligne': (premieres.nonzero()[0] + 2),
+        }))
+    if not occurrences:
+        return pd.DataFrame(columns=['Code', 'fichier', 'ligne'])
+
+    toutes = pd.concat(occurrences, ignore_index=True)
+    toutes = toutes[toutes['Code'] != '']
+    communs = toutes[toutes['Code'].duplicated(keep=False)]
+    return communs.sort_values('Code', kind='stable').reset_index(drop=True)
+
+
+def formater_codes_inter_fichiers(doublons, debut, fin):
+    """Lignes de texte des codes debut à fin-1 du rapport de detecter_codes_inter_fichiers"""
+    codes = doublons['Code'].drop_duplicates().iloc[debut:fin]
+    selection = doublons[doublons['Code'].isin(codes)]
+    return [
+        f"Code {code} : " + ", ".join(
+            f"{fichier} (ligne {ligne})"
+            for fichier, ligne in groupe[['fichier', 'ligne']].itertuples(index=False, name=None)
+        )
+        for code, groupe in selection.groupby('Code', sort=False)
+    ]
+
+
+def lire_fichiers_candidats(chemins, nb_processus=None):
+    """
+    Lit et valide plusieurs fichiers de candidats en parallèle puis les fusionne.
+    :param chemins: chemins des fichiers à importer
+    :param nb_processus: nombre de processus de travail (défaut : un par fichier, au plus un par cœur)
+    :return: dictionnaire {'valide': bool,
+             'fichiers': [{'fichier', 'chemin', 'lignes', 'validation', 'erreur',
+                           'codes_en_double', 'codes_communs', 'duree'}] dans l'ordre de chemins,
+             'doublons': DataFrame de detecter_codes_inter_fichiers,
+             'fusion': DataFrame fusionné (None si un fichier est invalide)}
+    """
+    noms = [os.path.basename(chemin) for chemin in chemins]
+    # Deux fichiers de même nom dans des dossiers différents : garder le chemin complet
+    if len(set(noms)) < len(noms):
+        noms = list(chemins)
+
+    resultats = {}
+    if len(chemins) == 1:
+        try:
+            resultats[noms[0]] = lire_et_valider_candidats(chemins[0])
+        except Exception as e:
+            resultats[noms[0]] = e
+    else:
+        nb_processus = nb_processus or min(len(chemins), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+            taches = {nom: executeur.submit(lire_et_valider_candidats, chemin)
+                      for nom, chemin in zip(noms, chemins)}
+            for nom, tache in taches.items():
+                try:
+                    resultats[nom] = tache.result()
+                except Exception as e:
+                    resultats[nom] = e
+
+    tables = {nom: resultat[0] for nom, resultat in resultats.items()
+              if not isinstance(resultat, Exception)}
+    doublons = detecter_codes_inter_fichiers(tables)
+    communs_par_fichier = doublons['fichier'].value_counts()
+
+    fichiers = []
+    for nom, chemin in zip(noms, chemins):
+        resultat = resultats[nom]
+        erreur = resultat if isinstance(resultat, Exception) else None
+        fichiers.append({
+            'fichier': nom,
+            'chemin': chemin,
+            'lignes': 0 if erreur else len(resultat[0]),
+            'validation': None if erreur else resultat[1],
+            'erreur': None if erreur is None else str(erreur),
+            'codes_en_double': None if erreur else resultat[2],
+            'codes_communs': int(communs_par_fichier.get(nom, 0)),
+            'duree': 0.0 if erreur else resultat[3],
+        })
+
+    valide = doublons.empty and all(
+        f['erreur'] is None and f['validation']['valide'] and f['codes_en_double'].empty
+        for f in fichiers
+    )
+    fusion = pd.concat(list(tables.values()), ignore_index=True) if valide else None
+    return {'valide': valide, 'fichiers': fichiers, 'doublons': doublons, 'fusion': fusion}
+
+
+def formater_resume_fichiers(resultat):
+    """Résumé par fichier : lignes lues, erreurs de validation, codes partagés avec d'autres fichiers"""
+    lignes = []
+    for f in resultat['fichiers']:
+        if f['erreur']:
+            lignes.append(f"❌ {f['fichier']} : illisible ({f['erreur']})")
+            continue
+        etat = "✅" if (f['validation']['valide'] and f['codes_en_double'].empty
+                      and not f['codes_communs']) else "❌"
+        lignes.append(f"{etat} {f['fichier']} : {f['lignes']} lignes lues en {f['duree']:.1f} s")
+        if not f['validation']['valide']:
+            lignes.extend("    " + ligne for ligne in formater_resume(f['validation']).splitlines())
+        if not f['codes_en_double'].empty:
+            lignes.append(f"    {len(f['codes_en_double'])} codes utilisés par plusieurs lignes")
+        if f['codes_communs']:
+            lignes.append(f"    {f['codes_communs']} codes présents dans un autre fichier")
+    return "\n".join(lignes)
+
+
+def details_import_multiple(resultat):
+    """
+    Détail des erreurs à paginer : violations et codes en double de chaque fichier,
+    puis codes partagés.
+    :return: (nombre d'éléments, formater(debut, fin))
+    """
+    blocs = []
+    for f in resultat['fichiers']:
+        if f['validation'] is not None and len(f['validation']['detail']):
+            blocs.append((
+                len(f['validation']['detail']),
+                lambda debut, fin, f=f: [f"{f['fichier']} — {ligne}"
+                                         for ligne in formater_detail(f['validation'], debut, fin)]
+            ))
+        if f['codes_en_double'] is not None and not f['codes_en_double'].empty:
+            blocs.append((
+                len(f['codes_en_double']),
+                lambda debut, fin, f=f: [
+                    f"{f['fichier']} — " + formater_code_en_double(*ligne)
+                    for ligne in f['codes_en_double'].iloc[debut:fin].itertuples(index=False, name=None)
+                ]
+            ))
+    doublons = resultat['doublons']
+    if not doublons.empty:
+        blocs.append((
+            doublons['Code'].nunique(),
+            lambda debut, fin: formater_codes_inter_fichiers(doublons, debut, fin)
+        ))
+
+    def formater(debut, fin):
+        lignes = []
+        decalage = 0
+        for taille, formater_bloc in blocs:
+            if debut < decalage + taille and fin > decalage:
+                lignes.extend(formater_bloc(max(debut - decalage, 0), min(fin - decalage, taille)))
+            decalage += taille
+        return lignes
+
+    return sum(taille for taille, _ in blocs), formater
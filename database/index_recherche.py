@@ -0,0 +1,114 @@
+import re
+import unicodedata
+import weakref
+import numpy as np
+import pandas as pd
+
+# Index de recherche des tableaux de résultats, construits une fois par jeu de données :
+# - Code et Cin : table de hachage clé normalisée -> lignes (correspondance exacte) ;
+# - LastName / FirstName : clés normalisées (sans accents ni casse) triées, où un
+#   préfixe se résout par deux recherches dichotomiques. Les noms complets
+#   « nom prénom » et « prénom nom » sont indexés aussi.
+# Une recherche rend les positions des lignes retenues, sans parcourir le DataFrame.
+
+COLONNES_EXACTES = ['Code', 'Cin']
+COLONNES_NOMS = ['LastName', 'FirstName']
+FIN_PREFIXE = '\uffff'
+# Accents séparés de leur lettre par la décomposition NFKD
+ACCENTS = '[\u0300-\u036f]'
+
+
+def normaliser(texte):
+    """Texte sans accents, en minuscules, espaces réduits"""
+    texte = re.sub(ACCENTS, '', unicodedata.normalize('NFKD', str(texte)))
+    return ' '.join(texte.lower().split())
+
+
+def _normaliser_serie(serie):
+    """normaliser() appliqué à une colonne, une fois par valeur distincte"""
+    codes, valeurs = pd.factorize(serie.fillna('').astype(str))
+    normalisees = np.array([normaliser(v) for v in valeurs] + [''], dtype=object)
+    return normalisees[codes]
+
+
+def _cle_exacte(serie):
+    """Clé des codes : sans espaces autour, en minuscules"""
+    return serie.fillna('').astype(str).str.strip().str.lower().to_numpy(dtype=object)
+
+
+def _grouper(cles, lignes, trier=False):
+    """
+    Regroupe les lignes par clé : (clés distinctes, lignes rangées par clé, bornes),
+    les lignes de la clé i étant lignes[bornes[i]:bornes[i + 1]].
+    """
+    codes, distinctes = pd.factorize(cles, sort=trier)
+    tri = np.argsort(codes, kind='stable')
+    bornes = np.searchsorted(codes[tri], np.arange(len(distinctes) + 1))
+    return np.asarray(distinctes, dtype=object), lignes[tri], bornes
+
+
+class IndexRecherche:
+    def __init__(self, df):
+        """
+        :param df: DataFrame contenant tout ou partie de Code, Cin, LastName, FirstName
+        """
+        self.nb_lignes = len(df)
+        lignes = np.arange(self.nb_lignes)
+
+        # Code, Cin : clé -> numéro de groupe (table de hachage), puis tranche de lignes
+        self.exacts = []
+        for col in COLONNES_EXACTES:
+            if col in df.columns:
+                distinctes, lignes_col, bornes = _grouper(_cle_exacte(df[col]), lignes)
+                self.exacts.append((dict(zip(distinctes, range(len(distinctes)))), lignes_col, bornes))
+
+        # Noms : clés distinctes triées pour la recherche par préfixe
+        noms = [_normaliser_serie(df[col]) for col in COLONNES_NOMS if col in df.columns]
+        if len(noms) == 2:
+            noms += [noms[0] + ' ' + noms[1], noms[1] + ' ' + noms[0]]
+        cles = np.concatenate(noms) if noms else np.empty(0, dtype=object)
+        self.cles_noms, self.lignes_noms, self.bornes_noms = _grouper(cles, np.tile(lignes, len(noms)), trier=True)
+
+    def rechercher(self, texte):
+        """
+        Lignes correspondant au texte : Code ou Cin identique, ou nom / prénom /
+        nom complet commençant par le texte.
+        :return: positions des lignes retenues (croissantes), ou None si le texte
+                 est vide (tout afficher)
+        """
+        cle = normaliser(texte)
+        if not cle:
+            return None
+        masque = np.zeros(self.nb_lignes, dtype=bool)
+        for groupes, lignes, bornes in self.exacts:
+            i = groupes.get(cle)
+            if i is not None:
+                masque[lignes[bornes[i]:bornes[i + 1]]] = True
+        debut = np.searchsorted(self.cles_noms, cle, side='left')
+        fin = np.searchsorted(self.cles_noms, cle + FIN_PREFIXE, side='left')
+        masque[self.lignes_noms[self.bornes_noms[debut]:self.bornes_noms[fin]]] = True
+        return np.flatnonzero(masque)
+
+
+# Index par jeu de données : id(df) -> (référence faible vers df, index).
+# Le cache ne retient pas les DataFrames ; une entrée disparaît avec son DataFrame.
+_index = {}
+
+
+def _oublier(cle):
+    def rappel(reference):
+        if _index.get(cle, (None,))[0] is reference:
+            del _index[cle]
+    return rappel
+
+
+def index_recherche(df):
+    """
+    Index de recherche d'un DataFrame, construit à la première recherche puis
+    réutilisé tant que le même jeu de données existe.
+    """
+    en_cache = _index.get(id(df))
+    if en_cache is None or en_cache[0]() is not df:
+        en_cache = (weakref.ref(df, _oublier(id(df))), IndexRecherche(df))
+        _index[id(df)] = en_cache
+    return en_cache[1]
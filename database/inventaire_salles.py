@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from database.snapshot_cache import signature_db
+
+# Inventaire des salles en mémoire, construit une fois depuis SallesDB et partagé
+# par la répartition, l'affichage des salles, les totaux par centre et l'export.
+# Les salles sont rangées dans des tableaux numpy (ordre de la base : centre puis
+# salle) ; chaque centre occupe une tranche contiguë de l'ordre par centre.
+# Les caractéristiques sont codées en bits, et pour chaque combinaison
+# (centre, caractéristiques) demandée un index des capacités triées est construit
+# une fois : « salles du centre X d'au moins 30 places avec caméra » se résout par
+# une recherche dichotomique.
+
+GRANDE = 1
+CLIMATISE = 2
+CAMERA = 4
+
+VALEURS_VRAIES = {'1', 'true', 'oui', 'yes', 'o', 'y'}
+
+
+def _bits(serie, valeurs_vraies, bit):
+    """Bit de caractéristique pour chaque salle (comparaison sans casse ni espaces)"""
+    texte = serie.fillna('').astype(str).str.strip().str.lower()
+    return np.where(texte.isin(valeurs_vraies).to_numpy(), bit, 0).astype(np.uint8)
+
+
+class InventaireSalles:
+    def __init__(self, df_salles):
+        """
+        :param df_salles: salles au format de SallesDB.get_salles_avec_centres
+                          (nom, capacite, climatise, camera, type, centre)
+        """
+        df = df_salles.reset_index(drop=True)
+        self.df = df
+        self.noms = df['nom'].astype(str).str.strip().to_numpy(dtype=object)
+        self.centres_salles = df['centre'].astype(str).str.strip().to_numpy(dtype=object)
+        self.capacites = pd.to_numeric(df['capacite'], errors='coerce').fillna(0).astype(np.int64).to_numpy()
+        self.types = df['type'].fillna('Grande').astype(str).str.strip().to_numpy(dtype=object)
+        self.caracteristiques = (
+            np.where(self.types == 'Grande', GRANDE, 0).astype(np.uint8)
+            | _bits(df['climatise'], VALEURS_VRAIES, CLIMATISE)
+            | _bits(df['camera'], VALEURS_VRAIES, CAMERA)
+        )
+
+        # Tranche de chaque centre dans l'ordre par centre (ordre d'origine conservé dans un centre)
+        codes, centres = pd.factorize(self.centres_salles, sort=False)
+        self.centres = list(centres)
+        self._code_centre = {centre: i for i, centre in enumerate(self.centres)}
+        self._ordre = np.argsort(codes, kind='stable')
+        self._bornes = np.searchsorted(codes[self._ordre], np.arange(len(self.centres) + 1))
+        self._codes = codes
+
+        # Recherche des centres d'examen : nom en minuscules -> centre
+        self._centres_minuscules = {centre.lower(): centre for centre in reversed(self.centres)}
+        self._index_capacites = {}
+        self._places = {}
+        self._totaux = None
+
+    def __len__(self):
+        return len(self.noms)
+
+    @property
+    def capacite_totale(self):
+        return int(self.capacites.sum())
+
+    def positions_centre(self, centre):
+        """Positions des salles d'un centre, dans l'ordre de la base"""
+        i = self._code_centre.get(centre)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        return self._ordre[self._bornes[i]:self._bornes[i + 1]]
+
+    def ordre_par_centre(self):
+        """
+        Positions des salles regroupées par centre (ordre de la base dans un centre)
+        et bornes des tranches : le centre i occupe ordre[bornes[i]:bornes[i + 1]].
+        """
+        return self._ordre, self._bornes
+
+    def _index(self, centre, requises, exclues):
+        """(capacités triées, positions) des salles du centre ayant les bits requis et aucun bit exclu"""
+        cle = (centre, requises, exclues)
+        if cle not in self._index_capacites:
+            positions = self.positions_centre(centre) if centre is not None else np.arange(len(self))
+            bits = self.caracteristiques[positions]
+            positions = positions[((bits & requises) == requises) & ((bits & exclues) == 0)]
+            tri = np.argsort(self.capacites[positions], kind='stable')
+            self._index_capacites[cle] = (self.capacites[positions][tri], positions[tri])
+        return self._index_capacites[cle]
+
+    def rechercher(self, centre=None, capacite_min=0, requises=0, exclues=0):
+        """
+        Positions des salles d'un centre (None = tous) d'au moins capacite_min places,
+        ayant toutes les caractéristiques requises et aucune des exclues
+        (ex. requises=CAMERA, exclues=GRANDE pour les petites salles avec caméra),
+        triées par capacité croissante.
+        """
+        capacites, positions = self._index(centre, requises, exclues)
+        return positions[np.searchsorted(capacites, capacite_min, side='left'):]
+
+    def salles(self, positions):
+        """Lignes de df_salles aux positions données"""
+        return self.df.iloc[positions]
+
+    def trouver_centre(self, nom):
+        """
+        Centre des salles correspondant à un centre d'examen : nom identique sans
+        casse ni espaces, sinon premier centre dont le nom contient l'autre.
+        :return: nom du centre ou None
+        """
+        nom = str(nom).strip().lower()
+        centre = self._centres_minuscules.get(nom)
+        if centre is not None:
+            return centre
+        return next((c for c in self.centres if nom in c.lower() or c.lower() in nom), None)
+
+    def places(self, centre):
+        """
+        Suite des places d'un centre dans l'ordre de remplissage : grandes salles puis
+        petites, chacune dans l'ordre de la base, chaque salle répétée autant de fois que
+        sa capacité.
+        :return: (positions des salles, numéros de place à partir de 1)
+        """
+        if centre not in self._places:
+            positions = self.positions_centre(centre)
+            grandes = (self.caracteristiques[positions] & GRANDE) != 0
+            positions = np.concatenate([positions[grandes], positions[~grandes]])
+            capacites = np.maximum(self.capacites[positions], 0)
+            salles = np.repeat(positions, capacites)
+            debuts = np.repeat(np.cumsum(capacites) - capacites, capacites)
+            numeros = np.arange(len(salles)) - debuts + 1
+            self._places[centre] = (salles, numeros)
+        return self._places[centre]
+
+    def totaux_par_centre(self):
+        """DataFrame (centre, nb_salles, capacite, capacite_grandes) dans l'ordre des centres"""
+        if self._totaux is None:
+            nb = len(self.centres)
+            grandes = (self.caracteristiques & GRANDE) != 0
+            self._totaux = pd.DataFrame({
+                'centre': self.centres,
+                'nb_salles': np.bincount(self._codes, minlength=nb),
+                'capacite': np.bincount(self._codes, weights=self.capacites, minlength=nb).astype(np.int64),
+                'capacite_grandes': np.bincount(self._codes, weights=self.capacites * grandes,
+                                                minlength=nb).astype(np.int64),
+            })
+        return self._totaux
+
+    def salles_non_utilisees(self, utilisees, col_centre='Centre', col_salle='Salle'):
+        """
+        Salles absentes d'un résultat de répartition.
+        :return: DataFrame (Centre, Salle) dans l'ordre de la base
+        """
+        cles = set(zip(utilisees[col_centre].astype(str).str.strip(), utilisees[col_salle].astype(str).str.strip()))
+        libres = np.fromiter(
+            ((centre, nom) not in cles for centre, nom in zip(self.centres_salles, self.noms)),
+            dtype=bool, count=len(self)
+        )
+        return pd.DataFrame({'Centre': self.centres_salles[libres], 'Salle': self.noms[libres]})
+
+
+_inventaires = {}
+
+
+def inventaire_salles(salles_db):
+    """
+    Inventaire partagé des salles de cette base, reconstruit seulement si la base a
+    changé depuis la dernière construction (signature taille / date / compteur SQLite).
+    """
+    signature = signature_db(salles_db.db_path)
+    en_cache = _inventaires.get(salles_db.db_path)
+    if en_cache is None or en_cache[0] != signature:
+        en_cache = (signature, InventaireSalles(salles_db.get_salles_avec_centres()))
+        _inventaires[salles_db.db_path] = en_cache
+    return en_cache[1]
@@ -0,0 +1,240 @@
+import csv
+import codecs
+import unicodedata
+import pandas as pd
+
+# Lecture des fichiers d'import (candidats, salles) par lots.
+# Les classeurs .xlsx sont parcourus en flux (openpyxl read_only, valeurs seules) :
+# le modèle objet complet du classeur (cellules, styles) n'est jamais construit,
+# la mémoire utilisée par la lecture reste bornée par la taille d'un lot.
+# Les fichiers CSV sont lus en une passe : encodage et séparateur sont déduits
+# d'un préfixe de taille bornée, les types des colonnes connues sont imposés.
+
+TAILLE_LOT = 5000
+TAILLE_PREFIXE_CSV = 64 * 1024
+SEPARATEURS_CSV = ',;\t|'
+
+# Moteur de lecture CSV le plus rapide disponible
+try:
+    import pyarrow  # noqa: F401
+    MOTEUR_CSV = 'pyarrow'
+except ImportError:
+    MOTEUR_CSV = 'c'
+
+
+def _noms_colonnes(entete):
+    """Noms de colonnes à la manière de pd.read_excel (Unnamed: i, suffixes .1 pour les doublons)"""
+    colonnes = []
+    vus = {}
+    for i, valeur in enumerate(entete):
+        nom = f"Unnamed: {i}" if valeur is None else str(valeur)
+        if nom in vus:
+            vus[nom] += 1
+            nom = f"{nom}.{vus[nom]}"
+        else:
+            vus[nom] = 0
+        colonnes.append(nom)
+    return colonnes
+
+
+def _vers_dataframe(lignes, colonnes, dtypes=None):
+    """Convertit un lot de tuples en DataFrame typé par colonne"""
+    lot = pd.DataFrame.from_records(lignes, columns=colonnes).infer_objects()
+    for col, dtype in (dtypes or {}).items():
+        if col in lot.columns:
+            if dtype == 'float64':
+                lot[col] = pd.to_numeric(lot[col], errors='coerce')
+            else:
+                lot[col] = lot[col].astype(dtype)
+    return lot
+
+
+def _lignes_feuille(lignes, nb_colonnes):
+    """
+    Complète ou tronque chaque ligne à nb_colonnes valeurs.
+    Les lignes entièrement vides ne sont gardées que si une ligne non vide les suit
+    (les lignes vides de fin de feuille sont ignorées, comme pd.read_excel).
+    """
+    vides_en_attente = []
+    for ligne in lignes:
+        ligne = tuple(ligne[:nb_colonnes]) + (None,) * (nb_colonnes - len(ligne))
+        if all(valeur is None for valeur in ligne):
+            vides_en_attente.append(ligne)
+            continue
+        yield from vides_en_attente
+        vides_en_attente = []
+        yield ligne
+
+
+def lire_excel_par_lots(chemin, taille_lot=TAILLE_LOT, dtypes=None):
+    """
+    Lit la première feuille d'un classeur .xlsx en flux et produit des DataFrames de taille_lot lignes.
+    :param dtypes: types à imposer par colonne (ex. {'Score': 'float64'})
+    """
+    # openpyxl n'est chargé qu'à la première lecture d'un classeur
+    import openpyxl
+    classeur = openpyxl.load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        lignes = classeur.worksheets[0].iter_rows(values_only=True)
+        entete = next(lignes, None)
+        if entete is None:
+            return
+        colonnes = _noms_colonnes(entete)
+
+        lot = []
+        for ligne in _lignes_feuille(lignes, len(colonnes)):
+            lot.append(ligne)
+            if len(lot) >= taille_lot:
+                yield _vers_dataframe(lot, colonnes, dtypes)
+                lot = []
+        if lot:
+            yield _vers_dataframe(lot, colonnes, dtypes)
+    finally:
+        classeur.close()
+
+
+def lire_excel(chemin, taille_lot=TAILLE_LOT, dtypes=None):
+    """
+    Lit un classeur .xlsx en flux et assemble les lots en un seul DataFrame.
+    :return: DataFrame (vide si la feuille est vide)
+    """
+    lots = list(lire_excel_par_lots(chemin, taille_lot, dtypes))
+    if not lots:
+        return pd.DataFrame()
+    return pd.concat(lots, ignore_index=True)
+
+
+def normaliser_nom_colonne(nom):
+    """Nom de colonne sans accents, espaces ni majuscules (ex. "Locaux d'examen" -> "locauxd'examen")"""
+    nom = str(nom)
+    nom = ''.join(c for c in unicodedata.normalize('NFD', nom) if unicodedata.category(c) != 'Mn')
+    return nom.strip().lower().replace(' ', '')
+
+
+def est_police_rouge(cellule):
+    """Vrai si la police de la cellule est rouge (FF0000, quel que soit le canal alpha)"""
+    police = getattr(cellule, 'font', None)
+    couleur = police.color if police is not None else None
+    if couleur is None or couleur.type != 'rgb':
+        return False
+    return isinstance(couleur.rgb, str) and couleur.rgb.upper().endswith('FF0000')
+
+
+def cle_salle(valeur):
+    """Clé d'un nom de salle : texte sans espaces autour, 101.0 (colonne lue en float) -> '101'"""
+    if valeur is None or (isinstance(valeur, float) and valeur != valeur):
+        return ''
+    if isinstance(valeur, float) and valeur.is_integer():
+        valeur = int(valeur)
+    return str(valeur).strip()
+
+
+def lire_salles_excel(chemin):
+    """
+    Lit un classeur de salles en une seule passe en lecture seule : valeurs des cellules
+    et couleur de police des noms de salles (rouge = petite salle).
+    La colonne des noms est la première dont l'en-tête contient 'locaux' ou 'salle'.
+    :return: (DataFrame des valeurs, dictionnaire nom de salle -> 'Petite' / 'Grande')
+             Un nom écrit en rouge sur au moins une ligne est 'Petite'.
+    """
+    import openpyxl
+    classeur = openpyxl.load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        lignes = classeur.worksheets[0].iter_rows()
+        entete = next(lignes, None)
+        if entete is None:
+            return pd.DataFrame(), {}
+        colonnes = _noms_colonnes([cellule.value for cellule in entete])
+        idx_salle = next(
+            (i for i, nom in enumerate(colonnes)
+             if 'locaux' in normaliser_nom_colonne(nom) or 'salle' in normaliser_nom_colonne(nom)),
+            None
+        )
+
+        types_salles = {}
+
+        def valeurs():
+            for ligne in lignes:
+                if idx_salle is not None and idx_salle < len(ligne):
+                    cellule = ligne[idx_salle]
+                    nom = cle_salle(cellule.value)
+                    if nom:
+                        if est_police_rouge(cellule):
+                            types_salles[nom] = 'Petite'
+                        else:
+                            types_salles.setdefault(nom, 'Grande')
+                yield tuple(cellule.value for cellule in ligne)
+
+        df = _vers_dataframe(list(_lignes_feuille(valeurs(), len(colonnes))), colonnes)
+        return df, types_salles
+    finally:
+        classeur.close()
+
+
+def detecter_format_csv(chemin):
+    """
+    Déduit l'encodage et le séparateur d'un fichier CSV depuis ses premiers octets.
+    :return: (encodage, separateur)
+    """
+    with open(chemin, 'rb') as f:
+        prefixe = f.read(TAILLE_PREFIXE_CSV)
+
+    if prefixe.startswith(codecs.BOM_UTF8):
+        encodage = 'utf-8-sig'
+    else:
+        try:
+            prefixe.decode('utf-8')
+            encodage = 'utf-8'
+        except UnicodeDecodeError as e:
+            # Un caractère multi-octets peut être coupé par la fin du préfixe
+            coupe = len(prefixe) == TAILLE_PREFIXE_CSV and e.start >= len(prefixe) - 3
+            encodage = 'utf-8' if coupe and e.reason == 'unexpected end of data' else 'latin1'
+
+    # Échantillon de lignes complètes pour le séparateur
+    lignes = prefixe.decode(encodage, errors='ignore').splitlines()
+    if len(prefixe) == TAILLE_PREFIXE_CSV and len(lignes) > 1:
+        lignes = lignes[:-1]
+    try:
+        separateur = csv.Sniffer().sniff("\n".join(lignes[:50]), delimiters=SEPARATEURS_CSV).delimiter
+    except csv.Error:
+        separateur = ','
+    return encodage, separateur
+
+
+def _convertir_numeriques(df, colonnes_numeriques):
+    """Convertit en float64 les colonnes dont toutes les valeurs sont des nombres (virgule décimale acceptée)"""
+    for col in colonnes_numeriques or []:
+        if col in df.columns and (df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col].dtype)):
+            valeurs = df[col].str.strip().str.replace(',', '.', regex=False)
+            nombres = pd.to_numeric(valeurs, errors='coerce')
+            if not (nombres.isna() & df[col].notna()).any():
+                df[col] = nombres
+    return df
+
+
+def _options_csv(chemin, dtypes):
+    """Paramètres communs de pd.read_csv : encodage, séparateur et types des colonnes présentes"""
+    encodage, separateur = detecter_format_csv(chemin)
+    options = {'sep': separateur, 'encoding': encodage}
+    if dtypes:
+        colonnes = pd.read_csv(chemin, nrows=0, **options).columns
+        options['dtype'] = {col: dtype for col, dtype in dtypes.items() if col in colonnes}
+    return options
+
+
+def lire_csv(chemin, dtypes=None, colonnes_numeriques=None):
+    """
+    Lit un fichier CSV en une seule passe avec le moteur le plus rapide disponible.
+    :param dtypes: types imposés par colonne (ex. str pour les colonnes texte)
+    :param colonnes_numeriques: colonnes lues en texte puis converties en float64 si possible
+    :return: DataFrame
+    """
+    options = _options_csv(chemin, dtypes)
+    try:
+        df = pd.read_csv(chemin, engine=MOTEUR_CSV, **options)
+    except UnicodeDecodeError:
+        # Octet invalide après le préfixe analysé : relire en latin1
+        print(f"Encodage {options['encoding']} invalide dans {chemin}, relecture en latin1")
+        options['encoding'] = 'latin1'
+        df = pd.read_csv(chemin, engine=MOTEUR_CSV, **options)
+    return _convertir_numeriques(df, colonnes_numeriques)
@@ -35,6 +35,11 @@ class RepartitionDB:
                         date_repartition TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
+                # Index pour les requêtes par centre et par salle (documents PDF)
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_repartition_centre_salle
+                    ON repartition (centre, salle, numplace)
+                ''')
                 conn.commit()
         except sqlite3.Error as e:
             print(f"Erreur lors de la création de la table: {e}")
@@ -122,3 +127,48 @@ class RepartitionDB:
         except sqlite3.Error as e:
             print(f"Erreur lors de la récupération de la répartition: {e}")
             return None
+
+    def get_centres(self):
+        """Récupère la liste triée des centres présents dans la dernière répartition"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT DISTINCT centre
+                    FROM repartition
+                    WHERE centre IS NOT NULL AND centre != ''
+                    ORDER BY centre
+                ''')
+                return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la récupération des centres: {e}")
+            return []
+
+    def get_repartition_by_centre(self, centre):
+        """
+        Récupère la répartition d'un seul centre, triée par salle puis par place.
+        :param centre: Nom du centre d'examen
+        :return: DataFrame (vide si le centre n'a aucun candidat)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                query = '''
+                    SELECT 
+                        code as Code,
+                        lastname as LastName,
+                        firstname as FirstName,
+                        region,
+                        province,
+                        centre as Centre,
+                        salle as Salle,
+                        numplace as NumPlace,
+                        langues,
+                        mode_repartition
+                    FROM repartition
+                    WHERE centre = ?
+                    ORDER BY salle, numplace
+                '''
+                return pd.read_sql_query(query, conn, params=(str(centre),))
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la récupération de la répartition du centre {centre}: {e}")
+            return pd.DataFrame()
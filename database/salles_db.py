@@ -1,9 +1,8 @@
 import sqlite3
 import pandas as pd
+import numpy as np
 import os
-import openpyxl
-from openpyxl.styles import Font
-from openpyxl.utils.dataframe import dataframe_to_rows
+from database.lecture_fichiers import lire_salles_excel, cle_salle
 
 # Définitions des constantes
 COLUMN_MAPPING = {
@@ -14,6 +13,81 @@ COLUMN_MAPPING = {
     "Camera": "camera"
 }
 
+# Colonnes du fichier des salles, lues en texte à l'import CSV
+DTYPES_FICHIER_SALLES = {col: str for col in COLUMN_MAPPING}
+COLONNES_NUMERIQUES_SALLES = ["Capacité"]
+
+# Schémas de validation (voir database/validation.py) : fichier des salles
+# (le centre n'est écrit que sur la première salle de chaque centre) ...
+VALEURS_OUI_NON = ['Oui', 'Non', 'Yes', 'No', 'True', 'False', '1', '0', 'O', 'N']
+SCHEMA_SALLES = {
+    "Centres d'examen": {'obligatoire': False},
+    "Locaux d'examen": {},
+    "Capacité": {'type': 'entier', 'min': 1},
+    "Climatisé": {'obligatoire': False, 'valeurs': VALEURS_OUI_NON},
+    "Camera": {'obligatoire': False, 'valeurs': VALEURS_OUI_NON},
+}
+# ... et salles chargées depuis la base
+SCHEMA_SALLES_DB = {
+    'nom': {},
+    'centre': {},
+    'capacite': {'type': 'entier', 'min': 1},
+}
+
+
+def schema_salles_classeur(col_salle, col_capacite, col_clim=None, col_camera=None):
+    """Schéma des lignes de salles d'un classeur dont les colonnes ont été normalisées"""
+    schema = {col_salle: {}, col_capacite: {'type': 'entier', 'min': 1}}
+    for col in (col_clim, col_camera):
+        if col:
+            schema[col] = {'obligatoire': False, 'valeurs': VALEURS_OUI_NON}
+    return schema
+
+
+def lignes_salles(df, col_centre, col_salle):
+    """
+    Repère les lignes d'un classeur qui décrivent une salle. Le centre n'est écrit que
+    sur la première salle de chaque centre ; les lignes sans nom de salle, les totaux
+    et les lignes placées avant le premier centre sont des lignes de mise en forme.
+    :return: (centre de chaque ligne, masque booléen des lignes de salles)
+    """
+    centres = df[col_centre].map(_texte)
+    centres = centres.mask(centres.isin(['', 'nan'])).ffill()
+    noms = df[col_salle].map(_texte)
+    masque = (centres.notna() & ~noms.isin(['', 'nan'])
+              & ~noms.str.lower().str.startswith('total'))
+    return centres, masque.to_numpy(dtype=bool)
+
+# Format des salles en base : une salle est identifiée par (centre, nom)
+CLE_SALLE = ['centre', 'nom']
+COLONNES_VALEURS_SALLES = ['capacite', 'climatise', 'camera', 'type']
+VALEURS_VRAIES = {'1', 'true', 'oui', 'yes', 'o', 'y'}
+
+
+def _texte(valeur):
+    return '' if pd.isna(valeur) else cle_salle(valeur)
+
+
+def normaliser_salles(df):
+    """
+    Met des salles au format de comparaison et d'écriture en base :
+    noms sans espaces autour, capacité entière, climatisé / caméra en 'Oui' / 'Non',
+    type 'Grande' ou 'Petite'. Les lignes sans centre ou sans nom sont ignorées ;
+    pour une même salle (centre, nom) la dernière ligne l'emporte.
+    L'index d'origine est conservé.
+    """
+    df = df.reindex(columns=CLE_SALLE + COLONNES_VALEURS_SALLES)
+    salles = pd.DataFrame({
+        'centre': df['centre'].map(_texte),
+        'nom': df['nom'].map(_texte),
+        'capacite': pd.to_numeric(df['capacite'], errors='coerce').fillna(0).astype(int),
+        'climatise': df['climatise'].map(lambda v: 'Oui' if _texte(v).lower() in VALEURS_VRAIES else 'Non'),
+        'camera': df['camera'].map(lambda v: 'Oui' if _texte(v).lower() in VALEURS_VRAIES else 'Non'),
+        'type': df['type'].where(df['type'].isin(['Grande', 'Petite']), 'Grande'),
+    }, index=df.index)
+    salles = salles[(salles['centre'] != '') & (salles['nom'] != '')]
+    return salles.drop_duplicates(CLE_SALLE, keep='last')
+
 class SallesDB:
     def __init__(self):
         """Initialise la base de données"""
@@ -33,6 +107,10 @@ class SallesDB:
                 table_count = cursor.fetchone()[0]
                 if table_count < 2:
                     self.create_tables()
+        except sqlite3.OperationalError as e:
+            # Base verrouillée ou occupée : elle n'est pas corrompue, ne surtout pas la recréer
+            print(f"Base de données des salles inaccessible: {e}")
+            raise
         except sqlite3.Error as e:
             print(f"Erreur lors de l'initialisation de la base de données: {e}")
             # Si la base de données est corrompue, la recréer
@@ -98,18 +176,17 @@ class SallesDB:
             # Ne pas supprimer la base de données, juste propager l'erreur
             raise
 
-    def save_salles(self, df_salles, excel_path=None):
+    def save_salles(self, df_salles, excel_path=None, types_salles=None):
         """
-        Sauvegarde les données des salles depuis un DataFrame
+        Sauvegarde les données des salles depuis un DataFrame au format du fichier d'import
+        (seules les différences avec la base sont écrites, voir synchroniser_salles)
         Args:
             df_salles: DataFrame contenant les données des salles
             excel_path: Chemin vers le fichier Excel d'origine (pour détecter les couleurs)
+            types_salles: dictionnaire nom de salle -> 'Petite' / 'Grande' déjà extrait
+                du fichier par lire_salles_excel (évite de relire le classeur)
         """
         try:
-            # Sauvegarder le chemin du fichier Excel dans les métadonnées du DataFrame
-            if excel_path:
-                df_salles._metadata = {'excel_path': excel_path}
-                
             # Vérifier que toutes les colonnes requises sont présentes
             required_cols = ["Centres d'examen", "Locaux d'examen", "Capacité", "Climatisé", "Camera"]
             
@@ -122,44 +199,15 @@ class SallesDB:
             if missing_cols:
                 raise ValueError(f"Colonnes manquantes : {', '.join(missing_cols)}")
 
-            # Créer une copie du DataFrame et préparer les données
-            df['type'] = 'Grande'  # Par défaut toutes les salles sont grandes
-            
-            # Détecter les salles en rouge depuis Excel et les marquer comme Petite
-            try:
-                import openpyxl
-                from openpyxl.styles import Font
-                from openpyxl.utils.dataframe import dataframe_to_rows
-                
-                # Récupérer le fichier Excel d'origine
-                if hasattr(df_salles, '_metadata') and 'excel_path' in df_salles._metadata:
-                    excel_path = df_salles._metadata['excel_path']
-                    
-                    # Charger le workbook
-                    wb = openpyxl.load_workbook(excel_path)
-                    ws = wb.active
-                    
-                    # Trouver l'index de la colonne "Locaux d'examen"
-                    header_row = next(ws.rows)
-                    col_idx = None
-                    for idx, cell in enumerate(header_row):
-                        if cell.value == "Locaux d'examen":
-                            col_idx = idx
-                            break
-                    
-                    if col_idx is not None:
-                        # Pour chaque ligne après l'en-tête
-                        for row in list(ws.rows)[1:]:
-                            cell = row[col_idx]
-                            if cell.font and cell.font.color and cell.font.color.rgb == "FFFF0000":  # Rouge
-                                # Trouver cette salle dans notre DataFrame et la marquer comme Petite
-                                salle_nom = cell.value
-                                if salle_nom:
-                                    mask = df["Locaux d'examen"] == salle_nom
-                                    df.loc[mask, 'type'] = 'Petite'
-            except Exception as e:
-                print(f"Attention: Impossible de détecter les couleurs du fichier Excel: {str(e)}")
-                print("Les salles seront classifiées uniquement selon leur capacité.")
+            # Salles en rouge dans le fichier Excel : Petite ; toutes les autres : Grande
+            if types_salles is None and excel_path:
+                try:
+                    _, types_salles = lire_salles_excel(excel_path)
+                except Exception as e:
+                    print(f"Attention: Impossible de détecter les couleurs du fichier Excel: {str(e)}")
+                    print("Les salles seront classifiées uniquement selon leur capacité.")
+            noms = df["Locaux d'examen"].map(cle_salle)
+            df['type'] = noms.map(types_salles or {}).fillna('Grande')
             
             # Convertir les colonnes
             df['Capacité'] = pd.to_numeric(df['Capacité'], errors='coerce').fillna(0).astype(int)
@@ -175,205 +223,114 @@ class SallesDB:
                 "Camera": "camera"
             })
 
-            # Convertir Oui/Non en 1/0 pour la base de données
-            df['climatise'] = df['climatise'].apply(lambda x: 1 if str(x).lower() in ['oui', 'yes', 'true', '1'] else 0)
-            df['camera'] = df['camera'].apply(lambda x: 1 if str(x).lower() in ['oui', 'yes', 'true', '1'] else 0)
-            
-            with sqlite3.connect(self.db_path) as conn:
-                # Supprimer les anciennes données
-                conn.execute('DELETE FROM salles')
-                conn.execute('DELETE FROM sqlite_sequence WHERE name="salles"')
-                
-                # Insérer les données centre par centre
-                centres_ids = {}
-                
-                for centre_name in df['centre'].unique():
-                    # Insérer le centre
-                    cursor = conn.cursor()
-                    cursor.execute('INSERT INTO centres (nom) VALUES (?)', (centre_name,))
-                    centre_id = cursor.lastrowid
-                    centres_ids[centre_name] = centre_id
-                    
-                    # Insérer les salles de ce centre
-                    centre_df = df[df['centre'] == centre_name].copy()
-                    centre_df['centre_id'] = centre_id
-                    centre_df = centre_df[['centre_id', 'nom', 'capacite', 'climatise', 'camera', 'type']]
-                    centre_df.to_sql('salles', conn, if_exists='append', index=False)
-                
-            return True, "Données sauvegardées avec succès"
+            # Le centre n'est écrit que sur la première salle de chaque centre
+            df['centre'] = df['centre'].map(cle_salle).replace('', pd.NA).ffill()
+            rapport = self.synchroniser_salles(df)
+            return True, (f"Données sauvegardées avec succès ({rapport['ajouts']} ajouts, "
+                          f"{rapport['modifications']} modifications, {rapport['suppressions']} suppressions)")
             
         except Exception as e:
-            return False, f"Erreur lors de la sauvegarde : {str(e)}"# Remplacer les caractères mal encodés connus
-            replacements = {
-                'ú': 'é',
-                'Ú': 'é',
-                'è': 'e',
-                'à': 'a',
-                'â': 'a'
-            }
-            col = col.strip()
-            for old, new in replacements.items():
-                col = col.replace(old, new)
-            return col
-        
-        # Appliquer la normalisation aux noms de colonnes
-        df.columns = [normalize_column_name(col) for col in df.columns]
-        
-        print("Noms de colonnes après correction d'encodage:", df.columns.tolist())
-        
-        # Mapping des noms de colonnes possibles (avec toutes les variations possibles)
-        column_mapping = {
-            'centres d\'examen': "Centres d'examen",
-            'centre d\'examen': "Centres d'examen",
-            'centre': "Centres d'examen",
-            'centres': "Centres d'examen",
-            'locaux d\'examen': "Locaux d'examen",
-            'local d\'examen': "Locaux d'examen",
-            'locaux': "Locaux d'examen",
-            'local': "Locaux d'examen",
-            'nom': "Locaux d'examen",
-            'salle': "Locaux d'examen",
-            'capacité': "Capacité",
-            'capacite': "Capacité",
-            'cap': "Capacité",
-            'climatisé': "Climatisé",
-            'climatise': "Climatisé",
-            'clim': "Climatisé",
-            'camera': "Camera",
-            'caméra': "Camera",
-            'cam': "Camera",
-            'type': "Type",
-            'type de salle': "Type"
+            return False, f"Erreur lors de la sauvegarde : {str(e)}"
+
+    def _lire_salles_stockees(self, conn, centres=None):
+        """Salles en base (id, centre, nom, capacite, climatise, camera, type), éventuellement limitées à des centres"""
+        requete = '''
+            SELECT s.id, c.nom as centre, s.nom, s.capacite, s.climatise, s.camera, s.type
+            FROM salles s
+            JOIN centres c ON s.centre_id = c.id
+        '''
+        params = ()
+        if centres is not None:
+            requete += f" WHERE c.nom IN ({', '.join('?' for _ in centres)})"
+            params = tuple(centres)
+        return pd.read_sql_query(requete + " ORDER BY s.id", conn, params=params)
+
+    def synchroniser_salles(self, df_salles, centres=None):
+        """
+        Enregistre les salles en n'écrivant que les différences avec la base.
+        Les salles sont identifiées par (centre, nom) : les nouvelles sont insérées,
+        celles dont la capacité, la climatisation, la caméra ou le type ont changé
+        sont mises à jour, celles absentes de df_salles sont supprimées, ainsi que
+        les centres qui n'ont plus de salle. Tout est appliqué dans une transaction.
+        :param df_salles: DataFrame au format de la base (centre, nom, capacite, climatise, camera, type)
+        :param centres: noms des centres concernés ; None = toutes les salles.
+                        Les salles des autres centres ne sont ni comparées ni supprimées.
+        :return: dictionnaire {'ajouts', 'modifications', 'suppressions', 'inchanges'} (nombres)
+        """
+        nouvelles = normaliser_salles(df_salles)
+        if centres is not None:
+            centres = [cle_salle(centre) for centre in centres]
+            nouvelles = nouvelles[nouvelles['centre'].isin(centres)]
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                stockees = self._lire_salles_stockees(conn, centres)
+                anciennes = normaliser_salles(stockees)
+                anciennes['id'] = stockees.loc[anciennes.index, 'id'].to_numpy()
+
+                # Jointure sur (centre, nom) entre le fichier et la base
+                jointure = nouvelles.merge(anciennes, on=CLE_SALLE, how='outer',
+                                           suffixes=('', '_db'), indicator=True)
+                ajouts = jointure[jointure['_merge'] == 'left_only']
+                suppressions = jointure[jointure['_merge'] == 'right_only']
+                communes = jointure[jointure['_merge'] == 'both']
+                differentes = np.zeros(len(communes), dtype=bool)
+                for col in COLONNES_VALEURS_SALLES:
+                    differentes |= (communes[col].to_numpy() != communes[f'{col}_db'].to_numpy())
+                modifications = communes[differentes]
+
+                if len(suppressions):
+                    cursor.executemany('DELETE FROM salles WHERE id = ?',
+                                       ((int(i),) for i in suppressions['id']))
+
+                if len(modifications):
+                    cursor.executemany(
+                        'UPDATE salles SET capacite = ?, climatise = ?, camera = ?, type = ? WHERE id = ?',
+                        ((int(capacite), climatise, camera, type_salle, int(i))
+                         for capacite, climatise, camera, type_salle, i in
+                         modifications[COLONNES_VALEURS_SALLES + ['id']].itertuples(index=False, name=None))
+                    )
+
+                if len(ajouts):
+                    cursor.executemany('INSERT OR IGNORE INTO centres (nom) VALUES (?)',
+                                       ((centre,) for centre in ajouts['centre'].unique()))
+                    ids_centres = dict(cursor.execute('SELECT nom, id FROM centres').fetchall())
+                    cursor.executemany(
+                        '''INSERT INTO salles (centre_id, nom, capacite, climatise, camera, type)
+                           VALUES (?, ?, ?, ?, ?, ?)''',
+                        ((ids_centres[centre], nom, int(capacite), climatise, camera, type_salle)
+                         for centre, nom, capacite, climatise, camera, type_salle in
+                         ajouts[CLE_SALLE + COLONNES_VALEURS_SALLES].itertuples(index=False, name=None))
+                    )
+
+                # Centres sans salle après la synchronisation
+                if len(suppressions):
+                    cursor.execute('DELETE FROM centres WHERE id NOT IN (SELECT DISTINCT centre_id FROM salles)')
+                conn.commit()
+        except sqlite3.Error as e:
+            error_msg = f"Erreur lors de la synchronisation des salles: {str(e)}"
+            print(error_msg)
+            raise Exception(error_msg)
+
+        rapport = {
+            'ajouts': len(ajouts),
+            'modifications': len(modifications),
+            'suppressions': len(suppressions),
+            'inchanges': len(communes) - len(modifications),
         }
-        
-        # Renommer les colonnes si nécessaire avec gestion des variations
-        for old_col in df.columns:
-            # Normaliser le nom de la colonne pour la comparaison
-            normalized_col = old_col.lower().strip()
-            normalized_col = ''.join(c for c in normalized_col if c.isalnum() or c in ["'", " "])
-            
-            # Chercher la meilleure correspondance dans le mapping
-            for key in column_mapping:
-                if key in normalized_col or normalized_col in key:
-                    df = df.rename(columns={old_col: column_mapping[key]})
-                    break
-        
-        print("Colonnes après normalisation:", df.columns.tolist())
-        
-        # Vérifier les colonnes requises
-        colonnes_requises = [
-            "Centres d'examen",
-            "Locaux d'examen",
-            "Capacité",
-            "Climatisé",
-            "Camera",
-            "Type"
-        ]
-        
-        colonnes_manquantes = [col for col in colonnes_requises if col not in df.columns]
-        if colonnes_manquantes:
-            raise ValueError(f"Colonnes manquantes dans le fichier : {', '.join(colonnes_manquantes)}")
-        
-        # Nettoyer les données
-        df = df.fillna('')
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.strip().replace({'nan': '', 'None': '', 'NaN': '', 'none': ''})
-        
+        print(f"Synchronisation des salles: {rapport['ajouts']} ajouts, {rapport['modifications']} modifications, "
+              f"{rapport['suppressions']} suppressions, {rapport['inchanges']} inchangées")
+        return rapport
+
+    def renommer_centre(self, ancien_nom, nouveau_nom):
+        """Renomme un centre (une seule ligne modifiée, ses salles restent rattachées)"""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
-            
-            try:
-                # Commencer une transaction
-                cursor.execute("BEGIN TRANSACTION")
-                
-                # Vider les tables existantes
-                cursor.execute("DELETE FROM salles")
-                cursor.execute("DELETE FROM centres")
-                
-                # Réinitialiser les séquences
-                cursor.execute("DELETE FROM sqlite_sequence WHERE name IN ('centres', 'salles')")
-                
-                # Garder une trace des centres pour éviter les duplications
-                centres_ids = {}
-                
-                for index, row in df.iterrows():
-                    # Vérifier et nettoyer le nom du centre
-                    centre_name = str(row["Centres d'examen"]).strip()
-                    if not centre_name:
-                        print(f"Ligne {index + 2}: Centre manquant, ignoré")
-                        continue
-                    
-                    # Vérifier et nettoyer le nom de la salle
-                    local_name = str(row["Locaux d'examen"]).strip()
-                    if not local_name:
-                        print(f"Ligne {index + 2}: Local d'examen manquant pour le centre '{centre_name}', ignoré")
-                        continue
-                        
-                    print(f"Traitement de la salle '{local_name}' du centre '{centre_name}'")
-                        
-                    # Vérifier si le centre existe déjà
-                    if centre_name in centres_ids:
-                        centre_id = centres_ids[centre_name]
-                    else:
-                        cursor.execute('INSERT INTO centres (nom) VALUES (?)', (centre_name,))
-                        centre_id = cursor.lastrowid
-                        centres_ids[centre_name] = centre_id
-                    
-                    # Convertir la capacité en entier
-                    try:
-                        capacite_str = str(row['Capacité']).strip()
-                        if not capacite_str:
-                            print(f"Ligne {index + 2}: Capacité manquante pour la salle '{local_name}' du centre '{centre_name}', ignoré")
-                            continue
-                            
-                        capacite = int(float(capacite_str))
-                        if capacite < 0:
-                            print(f"Ligne {index + 2}: Capacité négative ({capacite}) pour la salle '{local_name}' du centre '{centre_name}', ignoré")
-                            continue
-                    except (ValueError, TypeError):
-                        print(f"Ligne {index + 2}: Capacité invalide '{capacite_str}' pour la salle '{local_name}' du centre '{centre_name}', ignoré")
-                        continue
-                    
-                    # Traiter les valeurs pour climatisé et caméra
-                    climatise_val = str(row['Climatisé']).lower()
-                    climatise = 1 if climatise_val in ['1', 'true', 'oui', 'yes', 'o', 'y'] else 0
-                    
-                    camera_val = str(row['Camera']).lower()
-                    camera = 1 if camera_val in ['1', 'true', 'oui', 'yes', 'o', 'y'] else 0
-                    
-                    # Récupérer et valider le type de la salle
-                    type_salle = str(row['Type']).strip()
-                    if not type_salle or type_salle.lower() not in ['grande', 'petite']:
-                        type_salle = 'Grande'
-                        # En cas d'erreur, on garde le type 'Grande' par défaut
-                    
-                    try:
-                        # Insérer la salle
-                        cursor.execute('''
-                            INSERT INTO salles 
-                            (centre_id, nom, capacite, climatise, camera, type)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (
-                            centre_id,
-                            local_name,
-                            capacite,
-                            climatise,
-                            camera,
-                            type_salle
-                        ))
-                    except sqlite3.IntegrityError as e:
-                        print(f"Erreur: La salle '{local_name}' existe déjà dans le centre '{centre_name}'")
-                        continue
-                
-                # Valider la transaction
-                cursor.execute("COMMIT")
-                
-            except Exception as e:
-                # En cas d'erreur, annuler toutes les modifications
-                cursor.execute("ROLLBACK")
-                print(f"Erreur lors de la sauvegarde des données: {str(e)}")
-                raise e
+            cursor.execute('UPDATE centres SET nom = ? WHERE nom = ?', (nouveau_nom, ancien_nom))
+            if cursor.rowcount == 0:
+                raise ValueError(f"Centre '{ancien_nom}' non trouvé")
+            conn.commit()
 
     def get_all_salles(self):
         """
@@ -440,6 +397,29 @@ class SallesDB:
                 ORDER BY s.id ASC
             ''', conn, params=(centre_id,))
 
+    def get_salles_avec_centres(self):
+        """
+        Récupère toutes les salles avec le nom de leur centre en une seule requête,
+        directement au format utilisé par la répartition :
+        colonnes nom, capacite, climatise, camera, type, centre
+        (ordre des centres puis ordre d'origine des salles)
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            df = pd.read_sql_query('''
+                SELECT
+                    TRIM(s.nom) as nom,
+                    s.capacite as capacite,
+                    CAST(s.climatise AS TEXT) as climatise,
+                    CAST(s.camera AS TEXT) as camera,
+                    CAST(s.type AS TEXT) as type,
+                    TRIM(c.nom) as centre
+                FROM salles s
+                JOIN centres c ON s.centre_id = c.id
+                ORDER BY c.id, s.id
+            ''', conn)
+        df['capacite'] = pd.to_numeric(df['capacite'], errors='coerce')
+        return df
+
     def get_salle_details(self, salle_id):
         """Récupère les détails d'une salle"""
         with sqlite3.connect(self.db_path) as conn:
@@ -0,0 +1,133 @@
+import os
+import json
+import tempfile
+import threading
+import pandas as pd
+
+# Cache disque des DataFrames nettoyés et typés (df_candidats, df_salles).
+# Chaque instantané est associé à la signature des bases SQLite dont il provient :
+# taille, date de modification et compteur de modifications de l'en-tête SQLite
+# (octets 24 à 27, incrémenté à chaque transaction validée). La signature se lit
+# en temps constant ; tant qu'elle correspond, l'instantané est chargé directement,
+# sans requête ni nettoyage.
+#
+# Format : Parquet (colonnes, lu en mémoire mappée) si pyarrow est installé,
+# sinon pickle pandas (blocs de colonnes numpy, conserve les types 'category').
+
+try:
+    import pyarrow  # noqa: F401
+    FORMAT_SNAPSHOT = 'parquet'
+except ImportError:
+    FORMAT_SNAPSHOT = 'pickle'
+
+
+def signature_db(db_path):
+    """Signature d'une base SQLite, lue sans parcourir le fichier"""
+    if not os.path.exists(db_path):
+        return None
+    infos = os.stat(db_path)
+    with open(db_path, 'rb') as f:
+        entete = f.read(100)
+    compteur = int.from_bytes(entete[24:28], 'big') if len(entete) >= 28 else 0
+    return [infos.st_size, infos.st_mtime_ns, compteur]
+
+
+def signatures_db(chemins_db):
+    """Signatures de plusieurs bases, par nom de fichier"""
+    return {os.path.basename(chemin): signature_db(chemin) for chemin in chemins_db}
+
+
+class SnapshotCache:
+    def __init__(self, dossier):
+        """
+        :param dossier: répertoire des instantanés (créé si besoin)
+        """
+        self.dossier = dossier
+        os.makedirs(self.dossier, exist_ok=True)
+        # Les instantanés sont écrits depuis le thread de l'interface et depuis AsyncDB
+        self._verrou = threading.Lock()
+
+    def _chemins(self, nom):
+        extension = 'parquet' if FORMAT_SNAPSHOT == 'parquet' else 'pkl'
+        return (os.path.join(self.dossier, f"{nom}.{extension}"),
+                os.path.join(self.dossier, f"{nom}.json"))
+
+    def signature(self, chemins_db):
+        return signatures_db(chemins_db)
+
+    def charger(self, nom, chemins_db):
+        """
+        Charge un instantané s'il correspond à l'état actuel des bases.
+        :return: DataFrame, ou None si absent, périmé ou illisible
+        """
+        chemin_donnees, chemin_meta = self._chemins(nom)
+        try:
+            with open(chemin_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format') != FORMAT_SNAPSHOT or meta.get('signature') != self.signature(chemins_db):
+                return None
+            if FORMAT_SNAPSHOT == 'parquet':
+                return pd.read_parquet(chemin_donnees, memory_map=True)
+            return pd.read_pickle(chemin_donnees)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Instantané '{nom}' illisible, relecture depuis la base: {e}")
+            return None
+
+    def _temporaire(self, chemin):
+        """Fichier temporaire propre à cet appel, dans le dossier de chemin (même disque pour os.replace)"""
+        fd, temporaire = tempfile.mkstemp(prefix=os.path.basename(chemin) + '.', suffix='.tmp', dir=self.dossier)
+        os.close(fd)
+        return temporaire
+
+    def enregistrer(self, nom, df, signature):
+        """
+        Écrit un instantané et sa signature (écriture atomique : fichier temporaire puis remplacement).
+        Les écritures d'un même cache sont sérialisées : l'instantané et sa signature
+        viennent toujours du même appel.
+        :param signature: signature des bases relevée AVANT la lecture de df
+        """
+        chemin_donnees, chemin_meta = self._chemins(nom)
+        temporaires = []
+        try:
+            with self._verrou:
+                # Invalider l'ancien instantané avant de le remplacer
+                if os.path.exists(chemin_meta):
+                    os.remove(chemin_meta)
+
+                temporaire = self._temporaire(chemin_donnees)
+                temporaires.append(temporaire)
+                if FORMAT_SNAPSHOT == 'parquet':
+                    df.to_parquet(temporaire, index=False)
+                else:
+                    df.to_pickle(temporaire)
+                os.replace(temporaire, chemin_donnees)
+
+                temporaire = self._temporaire(chemin_meta)
+                temporaires.append(temporaire)
+                with open(temporaire, 'w', encoding='utf-8') as f:
+                    json.dump({'format': FORMAT_SNAPSHOT, 'signature': signature}, f)
+                os.replace(temporaire, chemin_meta)
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de l'instantané '{nom}': {e}")
+        finally:
+            # Temporaires restants après une erreur
+            for temporaire in temporaires:
+                if os.path.exists(temporaire):
+                    os.remove(temporaire)
+
+    def charger_ou_construire(self, nom, chemins_db, construire):
+        """
+        Retourne l'instantané s'il est à jour, sinon appelle construire() et l'enregistre.
+        :param chemins_db: bases SQLite dont dépend le DataFrame
+        :param construire: fonction qui relit le DataFrame depuis les bases
+        """
+        df = self.charger(nom, chemins_db)
+        if df is not None:
+            return df
+        # Relever la signature avant la lecture : une écriture concurrente invalidera l'instantané
+        signature = self.signature(chemins_db)
+        df = construire()
+        self.enregistrer(nom, df, signature)
+        return df
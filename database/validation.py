@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+# Validation déclarative des fichiers d'import.
+# Un schéma associe à chaque colonne ses règles :
+#   'type'        : 'texte' (défaut), 'nombre', 'entier' ou 'date'
+#   'obligatoire' : colonne présente et cases non vides (défaut True)
+#   'min', 'max'  : bornes pour les nombres
+#   'regex'       : motif que doit respecter toute la valeur (texte)
+#   'formats'     : formats strptime acceptés pour les dates écrites en texte
+#   'valeurs'     : valeurs autorisées (comparaison sans casse ni espaces)
+#   'unique'      : pas deux lignes avec la même valeur
+# Chaque règle est évaluée en une opération vectorisée par colonne ; toutes les
+# violations sont rassemblées dans un seul rapport.
+
+MAX_DETAILS = 10000
+
+LIBELLES_REGLES = {
+    'vide': "case vide",
+    'type': "valeur non numérique",
+    'entier': "nombre non entier",
+    'min': "valeur trop petite",
+    'max': "valeur trop grande",
+    'regex': "format invalide",
+    'date': "date invalide",
+    'valeurs': "valeur non autorisée",
+    'unique': "valeur en double",
+}
+
+
+def masque_vides(serie):
+    """Cases vides : NaN ou texte ne contenant que des espaces"""
+    vides = serie.isna().to_numpy().copy()
+    if serie.dtype == 'object' or pd.api.types.is_string_dtype(serie.dtype):
+        # Tester les valeurs distinctes seulement, puis marquer les cellules par hachage
+        blancs = [valeur for valeur in pd.unique(serie.to_numpy())
+                  if isinstance(valeur, str) and not valeur.strip()]
+        if blancs:
+            vides |= serie.isin(blancs).to_numpy()
+    return vides
+
+
+def _masque_date(serie, formats, remplies):
+    """Cases remplies qui ne sont ni des dates ni du texte dans l'un des formats"""
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return np.zeros(len(serie), dtype=bool)
+    brut = serie.astype(str)
+    texte = brut.str.strip()
+    valide = np.zeros(len(serie), dtype=bool)
+    if serie.dtype == 'object':
+        # Cases qui ne sont pas du texte (différentes de leur conversion en texte) :
+        # dates Excel (datetime, date, Timestamp) ou nombres, qui ne sont pas des dates
+        autres = remplies & (serie.fillna('').to_numpy() != brut.to_numpy())
+        if autres.any():
+            valeurs = serie[autres]
+            dates = pd.to_datetime(valeurs, errors='coerce', utc=True).notna()
+            nombres = pd.to_numeric(valeurs, errors='coerce').notna()
+            valide[autres] = (dates & ~nombres).to_numpy()
+    for fmt in formats:
+        valide |= pd.to_datetime(texte, format=fmt, errors='coerce').notna().to_numpy()
+    return remplies & ~valide
+
+
+def valider(df, schema, max_details=MAX_DETAILS, lignes=None):
+    """
+    Valide un DataFrame contre un schéma en une passe.
+    :param lignes: numéros dans le fichier des lignes de df, si df n'en garde qu'une
+                   partie (défaut : position + 2, en-tête en ligne 1)
+    :return: dictionnaire {'valide': bool,
+             'colonnes_manquantes': [colonnes obligatoires absentes],
+             'nb_violations': nombre total de cases en erreur,
+             'par_regle': DataFrame (colonne, regle, nb),
+             'detail': DataFrame (ligne, colonne, regle, valeur) trié par ligne,
+                       limité à max_details violations (ligne = numéro dans le fichier)}
+    """
+    colonnes_manquantes = [col for col, regles in schema.items()
+                           if regles.get('obligatoire', True) and col not in df.columns]
+
+    if lignes is None:
+        lignes = np.arange(len(df)) + 2
+    else:
+        lignes = np.asarray(lignes)
+
+    resume = []
+    details = []
+    for col, regles in schema.items():
+        if col not in df.columns:
+            continue
+        serie = df[col]
+        vides = masque_vides(serie)
+        remplies = ~vides
+        masques = {}
+
+        if regles.get('obligatoire', True):
+            masques['vide'] = vides
+
+        type_col = regles.get('type', 'texte')
+        if type_col in ('nombre', 'entier'):
+            nombres = pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64')
+            numeriques = remplies & ~np.isnan(nombres)
+            masques['type'] = remplies & np.isnan(nombres)
+            # Les comparaisons avec NaN sont fausses : seules les cases numériques sont testées
+            if type_col == 'entier':
+                masques['entier'] = numeriques & (np.floor(nombres) != nombres)
+            if 'min' in regles:
+                masques['min'] = nombres < regles['min']
+            if 'max' in regles:
+                masques['max'] = nombres > regles['max']
+        elif type_col == 'date':
+            masques['date'] = _masque_date(serie, regles.get('formats', []), remplies)
+
+        if 'regex' in regles:
+            texte = serie.astype(str).str.strip()
+            conformes = texte.str.fullmatch(regles['regex']).fillna(False).to_numpy(dtype=bool)
+            masques['regex'] = remplies & ~conformes
+
+        if 'valeurs' in regles:
+            autorisees = {str(v).strip().lower() for v in regles['valeurs']}
+            texte = serie.astype(str).str.strip().str.lower()
+            masques['valeurs'] = remplies & ~texte.isin(autorisees).to_numpy()
+
+        if regles.get('unique'):
+            masques['unique'] = remplies & serie.duplicated(keep=False).to_numpy()
+
+        for regle, masque in masques.items():
+            positions = np.flatnonzero(masque)
+            if len(positions) == 0:
+                continue
+            resume.append((col, regle, len(positions)))
+            retenues = positions[:max_details]
+            details.append(pd.DataFrame({
+                'ligne': lignes[retenues],
+                'colonne': col,
+                'regle': regle,
+                'valeur': serie.iloc[retenues].to_numpy(dtype=object),
+            }))
+
+    par_regle = pd.DataFrame(resume, columns=['colonne', 'regle', 'nb'])
+    if details:
+        detail = (pd.concat(details, ignore_index=True)
+                  .sort_values('ligne', kind='stable')
+                  .head(max_details)
+                  .reset_index(drop=True))
+    else:
+        detail = pd.DataFrame(columns=['ligne', 'colonne', 'regle', 'valeur'])
+    nb_violations = int(par_regle['nb'].sum()) if not par_regle.empty else 0
+
+    return {
+        'valide': not colonnes_manquantes and nb_violations == 0,
+        'colonnes_manquantes': colonnes_manquantes,
+        'nb_violations': nb_violations,
+        'par_regle': par_regle,
+        'detail': detail,
+    }
+
+
+def formater_resume(rapport):
+    """Résumé du rapport : colonnes manquantes et nombre de violations par colonne et par règle"""
+    lignes = []
+    if rapport['colonnes_manquantes']:
+        lignes.append(f"Colonnes manquantes : {', '.join(rapport['colonnes_manquantes'])}")
+    if rapport['nb_violations']:
+        lignes.append(f"{rapport['nb_violations']} cases en erreur :")
+        for col, regle, nb in rapport['par_regle'].itertuples(index=False, name=None):
+            lignes.append(f"• {col} — {LIBELLES_REGLES.get(regle, regle)} : {nb}")
+        if len(rapport['detail']) < rapport['nb_violations']:
+            lignes.append(f"(détail limité aux {len(rapport['detail'])} premières erreurs)")
+    return "\n".join(lignes)
+
+
+def formater_detail(rapport, debut, fin):
+    """Lignes de texte du détail des violations debut à fin-1"""
+    return [
+        f"Ligne {ligne}, colonne '{col}' : {LIBELLES_REGLES.get(regle, regle)}"
+        + ("" if regle == 'vide' else f" ({valeur})")
+        for ligne, col, regle, valeur in rapport['detail'].iloc[debut:fin].itertuples(index=False, name=None)
+    ]
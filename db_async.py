@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class AsyncDB(QObject):
+    """
+    Façade d'accès asynchrone aux bases de données.
+    Les requêtes s'exécutent sur un thread dédié (un seul, donc sérialisées dans
+    l'ordre de soumission) et leurs résultats sont renvoyés sur le thread Qt via
+    un signal : l'interface ne se fige plus pendant les lectures, même si le
+    fichier SQLite est verrouillé.
+    """
+    # (callback, valeur) : émis depuis le thread base de données, reçu sur le thread Qt
+    _livraison = pyqtSignal(object, object)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Retourne la façade partagée par toute l'application"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self._lectures_en_cours = {}  # clé -> Future
+        self._verrou = threading.Lock()
+        self._livraison.connect(self._appeler)
+
+    def lire(self, cle, fonction, *args, on_resultat=None, on_erreur=None):
+        """
+        Planifie une lecture sur le thread base de données.
+        Les lectures de même clé encore en file d'attente sont regroupées : une seule
+        exécution, résultat livré à tous les demandeurs. Une lecture déjà démarrée
+        n'est pas partagée, car elle a pu commencer avant la dernière écriture.
+        :param cle: identifiant de la lecture (ex. 'centres_et_salles')
+        :param fonction: fonction à exécuter (ne doit pas toucher aux widgets)
+        :param on_resultat: appelé sur le thread Qt avec le résultat
+        :param on_erreur: appelé sur le thread Qt avec l'exception
+        :return: Future
+        """
+        with self._verrou:
+            future = self._lectures_en_cours.get(cle)
+            if future is None or future.running() or future.done():
+                future = self._executor.submit(fonction, *args)
+                self._lectures_en_cours[cle] = future
+                future.add_done_callback(lambda f, cle=cle: self._terminer_lecture(cle, f))
+        self._suivre(future, on_resultat, on_erreur)
+        return future
+
+    def ecrire(self, fonction, *args, on_resultat=None, on_erreur=None):
+        """
+        Planifie une écriture sur le thread base de données.
+        Les écritures ne sont jamais regroupées ; elles passent après les lectures déjà soumises.
+        :return: Future
+        """
+        future = self._executor.submit(fonction, *args)
+        self._suivre(future, on_resultat, on_erreur)
+        return future
+
+    def _terminer_lecture(self, cle, future):
+        with self._verrou:
+            if self._lectures_en_cours.get(cle) is future:
+                del self._lectures_en_cours[cle]
+
+    def _suivre(self, future, on_resultat, on_erreur):
+        """Relaie la fin de la Future vers le thread Qt"""
+        if on_resultat is None and on_erreur is None:
+            return
+
+        def terminee(f):
+            erreur = f.exception()
+            if erreur is not None:
+                if on_erreur is not None:
+                    self._livraison.emit(on_erreur, erreur)
+                else:
+                    print(f"Erreur d'accès à la base de données: {erreur}")
+            elif on_resultat is not None:
+                self._livraison.emit(on_resultat, f.result())
+
+        future.add_done_callback(terminee)
+
+    def _appeler(self, callback, valeur):
+        try:
+            callback(valeur)
+        except RuntimeError as e:
+            # Le widget destinataire a été fermé entre-temps
+            if "has been deleted" not in str(e):
+                raise
+
+    def arreter(self):
+        """
+        Attend la fin des requêtes en cours et arrête le thread base de données.
+        La façade partagée suivante (instance()) démarre un nouveau thread.
+        """
+        self._executor.shutdown(wait=True)
+        if AsyncDB._instance is self:
+            AsyncDB._instance = None
@@ -1,13 +1,30 @@
-from dashboard import *
 import os
+import sys
+import multiprocessing
+from profil_demarrage import ProfilImports, profil_demande
 
-app = QApplication(sys.argv)
+# Les processus de lecture des imports multiples réimportent ce module :
+# l'application ne doit démarrer (et charger l'interface) que dans le processus principal.
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
 
-# Définir l'icône de l'application
-icon_path = os.path.join(os.path.dirname(__file__), "assets", "iconapp_512.png")
-if os.path.exists(icon_path):
-    app.setWindowIcon(QIcon(icon_path))
+    # Rapport de démarrage (CONMEDPART_PROFIL_DEMARRAGE=1 ou --profil-demarrage)
+    profil = ProfilImports().installer() if profil_demande() else None
 
-window = ConMedPartApp()
-window.show()
-sys.exit(app.exec())
\ No newline at end of file
+    from dashboard import *
+    from PyQt6.QtCore import QTimer
+
+    app = QApplication(sys.argv)
+
+    # Définir l'icône de l'application
+    icon_path = os.path.join(os.path.dirname(__file__), "assets", "iconapp_512.png")
+    if os.path.exists(icon_path):
+        app.setWindowIcon(QIcon(icon_path))
+
+    window = ConMedPartApp()
+    window.show()
+    if profil is not None:
+        profil.etape("fenêtre créée")
+        # Premier passage de la boucle d'événements : fenêtre dessinée
+        QTimer.singleShot(0, lambda: (profil.etape("première fenêtre affichée"), profil.ecrire_rapport()))
+    sys.exit(app.exec())
@@ -0,0 +1,405 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QSize
+from PyQt6.QtGui import QBrush, QColor, QFont
+from PyQt6.QtWidgets import QHeaderView
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from database.candidats_db import COLONNES_CANDIDATS, COLONNES_TRI_INDEXEES
+from database.index_recherche import index_recherche
+
+# Modèles de données des tableaux du tableau de bord.
+# Les valeurs restent dans des tableaux numpy (une colonne par tableau) ; le texte
+# d'une cellule n'est produit que lorsque la vue la dessine, pour les seules
+# lignes visibles. Aucune cellule n'est créée à l'avance.
+
+HAUTEUR_LIGNE = 30
+ROUGE = QBrush(QColor("#FF0000"))
+# Textes de cellules gardés en cache : plusieurs écrans de défilement, pas le tableau entier
+TAILLE_CACHE_CELLULES = 20000
+
+
+class CacheCellules:
+    """Textes des cellules récemment affichées, les moins récentes sont oubliées au-delà de la taille maximale"""
+
+    def __init__(self, taille_max=TAILLE_CACHE_CELLULES):
+        self.taille_max = taille_max
+        self._textes = OrderedDict()
+
+    def __len__(self):
+        return len(self._textes)
+
+    def obtenir(self, cle, calculer):
+        """Texte en cache pour cle, sinon calculer() puis mise en cache"""
+        texte = self._textes.get(cle)
+        if texte is None:
+            texte = calculer()
+            self._textes[cle] = texte
+            if len(self._textes) > self.taille_max:
+                self._textes.popitem(last=False)
+        else:
+            self._textes.move_to_end(cle)
+        return texte
+
+
+def configurer_vue(vue, hauteur_ligne=HAUTEUR_LIGNE):
+    """Hauteur de ligne uniforme : la vue n'a pas à mesurer chaque ligne"""
+    entete = vue.verticalHeader()
+    entete.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    entete.setDefaultSectionSize(hauteur_ligne)
+
+
+class ModeleColonnes(QAbstractTableModel):
+    """Modèle en lecture seule sur les colonnes d'un DataFrame"""
+
+    def __init__(self, df, colonnes=None, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self.noms_colonnes = list(colonnes if colonnes is not None else df.columns)
+        self.colonnes = [self._valeurs(df, col) if col in df.columns else None for col in self.noms_colonnes]
+        self.nb_lignes = len(df)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.nb_lignes
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.noms_colonnes)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self.noms_colonnes[section])
+        return str(section + 1)
+
+    def texte(self, ligne, col):
+        """Texte affiché pour une cellule"""
+        valeurs = self.colonnes[col]
+        return "" if valeurs is None else str(valeurs[ligne])
+
+    def _valeurs(self, df, col):
+        return df[col].to_numpy()
+
+    def index_recherche(self):
+        """Index Code / Cin / noms du jeu de données, partagé entre affichages"""
+        return index_recherche(self.df)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.texte(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+
+class ModeleResultats(ModeleColonnes):
+    """Résultats de la répartition : une ligne par candidat placé, salle en rouge si petite"""
+    COLONNES = ['Code', 'LastName', 'FirstName', 'region', 'province',
+                'Centre', 'Salle', 'NumPlace', 'langues']
+
+    def __init__(self, resultats, parent=None):
+        super().__init__(resultats, self.COLONNES, parent)
+        if 'TypeSalle' in resultats.columns:
+            self.petites = (resultats['TypeSalle'].astype(str).str.strip() == 'Petite').to_numpy()
+        else:
+            self.petites = None
+        self.col_salle = self.COLONNES.index('Salle')
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if (role == Qt.ItemDataRole.ForegroundRole and index.isValid() and self.petites is not None
+                and index.column() == self.col_salle and self.petites[index.row()]):
+            # Mettre en rouge les petites salles
+            return ROUGE
+        return super().data(index, role)
+
+
+class ProxyRecherche(QAbstractProxyModel):
+    """
+    Filtre de recherche : les lignes retenues sont données directement par l'index
+    du modèle source (positions triées), la correspondance ligne affichée -> ligne
+    source est un simple tableau. Aucun test n'est fait ligne par ligne.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.lignes = None
+        self.positions = None
+
+    def rechercher(self, texte):
+        lignes = self.sourceModel().index_recherche().rechercher(texte)
+        if lignes is None and self.lignes is None:
+            return
+        self.beginResetModel()
+        self.lignes = lignes
+        if lignes is not None:
+            # Ligne source -> ligne affichée (-1 si filtrée)
+            self.positions = np.full(self.sourceModel().rowCount(), -1, dtype=np.int64)
+            self.positions[lignes] = np.arange(len(lignes))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.sourceModel().rowCount() if self.lignes is None else len(self.lignes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def index(self, ligne, col, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= ligne < self.rowCount() and 0 <= col < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(ligne, col)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        ligne = index.row() if self.lignes is None else int(self.lignes[index.row()])
+        return self.sourceModel().index(ligne, index.column())
+
+    def mapFromSource(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        ligne = index.row() if self.lignes is None else int(self.positions[index.row()])
+        return self.index(ligne, index.column()) if ligne >= 0 else QModelIndex()
+
+
+def formater_cellule(valeur):
+    """Date-heure texte réduite à la date, date au format jj-mm-aaaa, sinon texte brut"""
+    if isinstance(valeur, str):
+        if "-" in valeur and ":" in valeur and valeur.split():
+            return valeur.split()[0]
+        return valeur
+    if hasattr(valeur, 'strftime') and not pd.isna(valeur):
+        return valeur.strftime('%d-%m-%Y')
+    return str(valeur)
+
+
+def formater_annee(valeur):
+    """Année lue en flottant (1998.0) affichée comme entier, vide si absente"""
+    if isinstance(valeur, float):
+        return "" if pd.isna(valeur) else str(int(valeur))
+    return formater_cellule(valeur)
+
+
+def formateur_colonne(nom):
+    """Formateur d'une colonne de candidats d'après son nom"""
+    nom = str(nom).lower()
+    if "annee" in nom or "année" in nom:
+        return formater_annee
+    return formater_cellule
+
+
+class ModeleCandidats(ModeleColonnes):
+    """
+    Liste des candidats : valeurs brutes par colonne, formatées à la première
+    lecture d'une cellule puis gardées en cache (cellules récentes seulement).
+    """
+
+    def __init__(self, df_candidats, parent=None):
+        super().__init__(df_candidats, parent=parent)
+        self.formateurs = [formateur_colonne(col) for col in self.noms_colonnes]
+        self._cache = CacheCellules()
+
+    def _valeurs(self, df, col):
+        # Les dates restent des Timestamp (numpy les convertirait en datetime64 sans strftime)
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            return df[col].astype(object).to_numpy()
+        return df[col].to_numpy()
+
+    def texte(self, ligne, col):
+        return self._cache.obtenir((ligne, col), lambda: self.formateurs[col](self.colonnes[col][ligne]))
+
+
+class ModeleCandidatsSQL(QAbstractTableModel):
+    """
+    Candidats lus dans SQLite par pages, à mesure que la vue défile
+    (canFetchMore / fetchMore). Le tri est fait par la base (ORDER BY indexé) :
+    seules les lignes déjà parcourues sont gardées en mémoire. Le tri n'est
+    proposé que sur les colonnes indexées.
+    """
+    triable = True
+
+    def __init__(self, candidats_db, taille_page=500, parent=None):
+        super().__init__(parent)
+        self.candidats_db = candidats_db
+        self.taille_page = taille_page
+        self.noms_colonnes = list(COLONNES_CANDIDATS)
+        self.formateurs = [formateur_colonne(col) for col in self.noms_colonnes]
+        self.tri = 'Code'
+        self.decroissant = False
+        self._vider()
+
+    def _vider(self):
+        self.lignes = []
+        self._apres = None
+        self._fin = False
+        self._cache = CacheCellules()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lignes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.noms_colonnes)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.noms_colonnes[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._fin
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fin:
+            return
+        try:
+            page, apres = self.candidats_db.lire_page_candidats(
+                self.tri, self.decroissant, self._apres, self.taille_page)
+        except Exception as e:
+            print(f"Erreur lors de la lecture des candidats: {e}")
+            self._fin = True
+            return
+        if len(page) < self.taille_page:
+            self._fin = True
+        if not page:
+            return
+        debut = len(self.lignes)
+        self.beginInsertRows(QModelIndex(), debut, debut + len(page) - 1)
+        self.lignes.extend(page)
+        self._apres = apres
+        self.endInsertRows()
+
+    def colonne_triable(self, column):
+        return self.noms_colonnes[column] == 'Code' or self.noms_colonnes[column] in COLONNES_TRI_INDEXEES
+
+    def section_tri(self):
+        """Colonne et ordre du tri courant, pour l'indicateur de l'en-tête"""
+        ordre = Qt.SortOrder.DescendingOrder if self.decroissant else Qt.SortOrder.AscendingOrder
+        return self.noms_colonnes.index(self.tri), ordre
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Repart du début dans le nouvel ordre, calculé par la base.
+        Ignoré pour une colonne sans index : le tri parcourrait toute la table
+        sur le thread de l'interface.
+        """
+        if not self.colonne_triable(column):
+            return
+        self.beginResetModel()
+        self.tri = self.noms_colonnes[column]
+        self.decroissant = order == Qt.SortOrder.DescendingOrder
+        self._vider()
+        self.endResetModel()
+
+    def texte(self, ligne, col):
+        return self._cache.obtenir((ligne, col), lambda: self.formateurs[col](self.lignes[ligne][col]))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.texte(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+
+class ModeleSallesGroupees(QAbstractTableModel):
+    """
+    Vue d'ensemble des salles groupées par centre. Les débuts de centre et les totaux
+    viennent de l'inventaire (un seul passage sur les salles) ; le centre et ses
+    totaux sont fusionnés sur les lignes du centre via span() / fusions().
+    """
+    ENTETES = ["Centre", "Nom de la salle", "Capacité", "Climatisé",
+               "Caméra", "Type", "Total Centre", "Total Grandes Salles"]
+    COLONNES_FUSIONNEES = (0, 6, 7)
+    FOND_CENTRE = QBrush(QColor(40, 40, 50))
+    TEXTE_CENTRE = QBrush(QColor("white"))
+    POLICE_CENTRE = QFont("Arial", 11, QFont.Weight.Bold)
+
+    def __init__(self, inventaire, parent=None):
+        super().__init__(parent)
+        ordre, bornes = inventaire.ordre_par_centre()
+        totaux = inventaire.totaux_par_centre()
+        self.centres = list(totaux['centre'])
+        self.debuts = bornes[:-1]
+        self.nb_salles = np.diff(bornes)
+        self.total = totaux['capacite'].to_numpy()
+        self.total_grandes = totaux['capacite_grandes'].to_numpy()
+
+        # Une ligne par salle, dans l'ordre des centres
+        self.code_centre = np.repeat(np.arange(len(self.centres)), self.nb_salles)
+        self.debut_ligne = np.isin(np.arange(len(ordre)), self.debuts)
+        df = inventaire.df.iloc[ordre]
+        self.noms = inventaire.noms[ordre]
+        self.capacites = inventaire.capacites[ordre]
+        self.climatise = df['climatise'].astype(str).to_numpy()
+        self.camera = df['camera'].astype(str).to_numpy()
+        self.types = df['type'].astype(str).to_numpy()
+        self.petites = np.char.strip(self.types.astype(str)) == 'Petite'
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.noms)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENTETES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.ENTETES[section]
+        return str(section + 1)
+
+    def fusions(self):
+        """(première ligne, colonne, nombre de lignes) des cellules fusionnées"""
+        return [(int(debut), col, int(nb))
+                for debut, nb in zip(self.debuts, self.nb_salles) if nb > 1
+                for col in self.COLONNES_FUSIONNEES]
+
+    def span(self, index):
+        ligne, col = index.row(), index.column()
+        if col in self.COLONNES_FUSIONNEES and self.debut_ligne[ligne]:
+            return QSize(1, int(self.nb_salles[self.code_centre[ligne]]))
+        return QSize(1, 1)
+
+    def texte(self, ligne, col):
+        if col in self.COLONNES_FUSIONNEES:
+            if not self.debut_ligne[ligne]:
+                return ""
+            c = self.code_centre[ligne]
+            if col == 0:
+                return self.centres[c]
+            return str(int(self.total[c] if col == 6 else self.total_grandes[c]))
+        if col == 1:
+            return str(self.noms[ligne])
+        if col == 2:
+            return str(int(self.capacites[ligne]))
+        return str((self.climatise, self.camera, self.types)[col - 3][ligne])
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        ligne, col = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.texte(ligne, col)
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if col == 0:
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return self.FOND_CENTRE
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self.TEXTE_CENTRE
+            if role == Qt.ItemDataRole.FontRole:
+                return self.POLICE_CENTRE
+        # Petites salles en rouge (nom et capacité)
+        if role == Qt.ItemDataRole.ForegroundRole and col in (1, 2) and self.petites[ligne]:
+            return ROUGE
+        return None
@@ -0,0 +1,90 @@
+import builtins
+import os
+import sys
+import time
+
+# Rapport du coût de démarrage : temps d'import de chaque module (cumulé, sous-imports
+# compris, et propre) et délai jusqu'à l'affichage de la première fenêtre.
+# Activé par la variable d'environnement CONMEDPART_PROFIL_DEMARRAGE=1 ou l'option
+# --profil-demarrage ; fonctionne aussi dans l'exécutable PyInstaller, où
+# « python -X importtime » n'est pas disponible. Le rapport est affiché et écrit dans
+# profil_demarrage.txt à côté de l'application (l'exécutable n'a pas de console).
+
+VARIABLE_PROFIL = 'CONMEDPART_PROFIL_DEMARRAGE'
+OPTION_PROFIL = '--profil-demarrage'
+NB_MODULES_RAPPORT = 30
+
+
+def profil_demande():
+    """Vrai si le profil de démarrage est demandé (variable d'environnement ou option)"""
+    return os.environ.get(VARIABLE_PROFIL, '') not in ('', '0') or OPTION_PROFIL in sys.argv
+
+
+def dossier_application():
+    """Dossier de l'exécutable (PyInstaller) ou des sources"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+class ProfilImports:
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.mesures = {}  # module -> [temps cumulé, temps propre] en secondes
+        self.etapes = []   # (libellé, secondes depuis le début)
+        self._pile = []
+        self._import_original = None
+
+    def installer(self):
+        """Intercepte les imports à partir de maintenant"""
+        self._import_original = builtins.__import__
+        builtins.__import__ = self._importer
+        return self
+
+    def desinstaller(self):
+        if self._import_original is not None:
+            builtins.__import__ = self._import_original
+            self._import_original = None
+
+    def _importer(self, nom, globals=None, locals=None, fromlist=(), level=0):
+        # Seuls les premiers imports (module absent de sys.modules) sont mesurés
+        if level or nom in sys.modules:
+            return self._import_original(nom, globals, locals, fromlist, level)
+        self._pile.append(0.0)
+        debut = time.perf_counter()
+        try:
+            return self._import_original(nom, globals, locals, fromlist, level)
+        finally:
+            duree = time.perf_counter() - debut
+            sous_imports = self._pile.pop()
+            if self._pile:
+                self._pile[-1] += duree
+            mesure = self.mesures.setdefault(nom, [0.0, 0.0])
+            mesure[0] += duree
+            mesure[1] += duree - sous_imports
+
+    def etape(self, libelle):
+        """Note le temps écoulé depuis le début (ex. 'fenêtre affichée')"""
+        self.etapes.append((libelle, time.perf_counter() - self.debut))
+
+    def rapport(self, nb_modules=NB_MODULES_RAPPORT):
+        """Texte du rapport : étapes puis modules les plus coûteux"""
+        lignes = ["Profil de démarrage", ""]
+        lignes += [f"{libelle:<40} {secondes * 1000:>9.1f} ms" for libelle, secondes in self.etapes]
+        lignes += ["", f"{'Module':<40} {'cumulé':>9}    {'propre':>9}"]
+        plus_couteux = sorted(self.mesures.items(), key=lambda m: m[1][0], reverse=True)[:nb_modules]
+        lignes += [f"{nom:<40} {cumule * 1000:>9.1f} ms {propre * 1000:>9.1f} ms"
+                   for nom, (cumule, propre) in plus_couteux]
+        lignes.append(f"{len(self.mesures)} modules importés")
+        return "\n".join(lignes)
+
+    def ecrire_rapport(self):
+        """Affiche le rapport et l'enregistre dans profil_demarrage.txt"""
+        self.desinstaller()
+        texte = self.rapport()
+        print(texte)
+        try:
+            with open(os.path.join(dossier_application(), 'profil_demarrage.txt'), 'w', encoding='utf-8') as f:
+                f.write(texte + "\n")
+        except OSError as e:
+            print(f"Impossible d'enregistrer le profil de démarrage: {e}")
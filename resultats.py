@@ -13,6 +13,7 @@ from reportlab.pdfbase.ttfonts import TTFont
 from database.candidats_db import CandidatsDB
 from database.salles_db import SallesDB
 from database.repartition_db import RepartitionDB
+from db_async import AsyncDB
 
 def get_current_room(page_content):
     """Helper pour extraire le numéro de salle de la page courante."""
@@ -160,17 +161,26 @@ class ResultatsDialog(QDialog):
         self.btn_all.clicked.connect(self.generer_tous_documents)
         
     def charger_centres(self):
+        """Charge la liste des centres de la dernière répartition sans bloquer l'interface"""
+        self.centres_combo.setEnabled(False)
+        AsyncDB.instance().lire(
+            'centres_repartition',
+            lambda: RepartitionDB().get_centres(),
+            on_resultat=self.afficher_centres,
+            on_erreur=self.erreur_chargement_centres
+        )
+
+    def erreur_chargement_centres(self, e):
+        self.centres_combo.setEnabled(True)
+        QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des centres: {str(e)}")
+
+    def afficher_centres(self, centres_utilises):
+        """Remplit la liste des centres (appelé sur le thread Qt)"""
         try:
-            # Récupérer la dernière répartition
-            repartition_db = RepartitionDB()
-            derniere_repartition = repartition_db.get_last_repartition()
-            
-            if derniere_repartition is None or derniere_repartition.empty:
+            self.centres_combo.setEnabled(True)
+            if not centres_utilises:
                 QMessageBox.warning(self, "Attention", "Aucune répartition trouvée")
                 return
-                
-            # Récupérer les centres uniques de la dernière répartition
-            centres_utilises = sorted(derniere_repartition['Centre'].unique())
             
             # Mettre à jour la combobox
             self.centres_combo.clear()
@@ -215,16 +225,9 @@ class ResultatsDialog(QDialog):
 
     def generer_presence_centre(self, centre):
         try:
-            # Récupérer la dernière répartition pour ce centre
+            # Récupérer uniquement les candidats de ce centre, déjà triés par salle et par place
             repartition_db = RepartitionDB()
-            candidats_db = CandidatsDB()
-            
-            derniere_repartition = repartition_db.get_last_repartition()
-            if derniere_repartition is None:
-                raise Exception("Aucune répartition trouvée")
-                
-            # Filtrer pour le centre sélectionné et convertir en dictionnaire pour un accès plus facile
-            resultats_centre = derniere_repartition[derniere_repartition['Centre'].astype(str) == str(centre)]
+            resultats_centre = repartition_db.get_repartition_by_centre(centre)
             if len(resultats_centre) == 0:
                 raise Exception(f"Aucun candidat trouvé pour le centre {centre}")
             
@@ -299,13 +302,12 @@ class ResultatsDialog(QDialog):
             ])
             
             # Préparer les données par salle
-            salles = sorted(resultats_centre['Salle'].unique(), key=str)
-            resultats_par_salle = {}
-            
-            # Pré-traiter les données pour chaque salle
-            for salle in salles:
-                mask = resultats_centre['Salle'].astype(str) == str(salle)
-                resultats_par_salle[str(salle)] = resultats_centre[mask].copy()
+            # Les lignes arrivent triées par salle : un seul groupby suffit
+            resultats_par_salle = {
+                str(salle): groupe
+                for salle, groupe in resultats_centre.groupby('Salle', sort=False)
+            }
+            salles = list(resultats_par_salle.keys())
             
             # Garder l'ordre original des candidats et grouper par salle
             for idx, salle in enumerate(salles):
@@ -454,16 +456,9 @@ class ResultatsDialog(QDialog):
             
     def generer_affichage_centre(self, centre):
         try:
-            # Récupérer la dernière répartition pour ce centre
+            # Récupérer uniquement les candidats de ce centre, déjà triés par salle et par place
             repartition_db = RepartitionDB()
-            candidats_db = CandidatsDB()
-            
-            derniere_repartition = repartition_db.get_last_repartition()
-            if derniere_repartition is None:
-                raise Exception("Aucune répartition trouvée")
-                
-            # Filtrer pour le centre sélectionné et convertir en dictionnaire pour un accès plus facile
-            resultats_centre = derniere_repartition[derniere_repartition['Centre'].astype(str) == str(centre)]
+            resultats_centre = repartition_db.get_repartition_by_centre(centre)
             if len(resultats_centre) == 0:
                 raise Exception(f"Aucun candidat trouvé pour le centre {centre}")
             
@@ -587,13 +582,12 @@ class ResultatsDialog(QDialog):
                 canvas.restoreState()
             
             # Préparer les données par salle de manière plus robuste
-            salles = sorted(resultats_centre['Salle'].unique(), key=str)
-            resultats_par_salle = {}
-            
-            # Pré-traiter les données pour chaque salle
-            for salle in salles:
-                mask = resultats_centre['Salle'].astype(str) == str(salle)
-                resultats_par_salle[str(salle)] = resultats_centre[mask].copy()
+            # Les lignes arrivent triées par salle : un seul groupby suffit
+            resultats_par_salle = {
+                str(salle): groupe
+                for salle, groupe in resultats_centre.groupby('Salle', sort=False)
+            }
+            salles = list(resultats_par_salle.keys())
             
             # Garder l'ordre original des candidats et grouper par salle
             for idx, salle in enumerate(salles):
@@ -1,15 +1,20 @@
 import os
 import sqlite3
-import time
+from bisect import bisect_right
 from PyQt6.QtWidgets import *
 from PyQt6.QtGui import *
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractTableModel, QModelIndex
 from datetime import datetime
 import pandas as pd
+import numpy as np
 import random
 import unicodedata
-from reportlab.lib.pagesizes import A4
-from reportlab import *
+from database.salles_db import SallesDB, lignes_salles, schema_salles_classeur
+from database.validation import valider
+from database.inventaire_salles import inventaire_salles
+from database.lecture_fichiers import lire_salles_excel, normaliser_nom_colonne, cle_salle
+from db_async import AsyncDB
+from widgets import DialogueRapportValidation
 
 class SallesEntryDialog(QDialog):
     def __init__(self, parent=None):
@@ -244,6 +249,125 @@ class CentreDialog(QDialog):
             "salles": self.salles_data
         }
 
+class ModeleSalles(QAbstractTableModel):
+    """
+    Modèle du tableau des centres et salles : une ligne par salle, regroupées par centre.
+    Les données restent dans la liste self.centres ({"nom_centre", "salles"}) ;
+    la première ligne de chaque centre est tenue à jour dans self.debuts, ce qui
+    donne le centre d'une ligne par recherche dichotomique et les fusions de la
+    colonne Centre sans parcourir les salles.
+    """
+    COLONNES = ["Centre", "Locaux d'examen", "Capacité", "Climatisé", "Caméra", "Type"]
+    CLES = [None, "nom", "capacite", "climatise", "camera", "type"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.centres = []
+        self.debuts = []
+        self.nb_lignes = 0
+
+    def _indexer(self):
+        """Recalcule la première ligne de chaque centre (un passage sur les centres)"""
+        self.debuts = []
+        ligne = 0
+        for centre in self.centres:
+            self.debuts.append(ligne)
+            ligne += len(centre["salles"])
+        self.nb_lignes = ligne
+
+    def charger(self, centres):
+        """Remplace toutes les données (chargement initial ou import)"""
+        self.beginResetModel()
+        self.centres = centres
+        self._indexer()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.nb_lignes
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLONNES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLONNES[section]
+        return None
+
+    def centre_de_ligne(self, ligne):
+        """Indice dans self.centres du centre affiché à cette ligne"""
+        return bisect_right(self.debuts, ligne) - 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        i = self.centre_de_ligne(index.row())
+        centre = self.centres[i]
+        position = index.row() - self.debuts[i]
+        salle = centre["salles"][position]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                # Centre uniquement sur la première ligne (fusionnée)
+                return centre["nom_centre"] if position == 0 else ""
+            valeur = salle.get(self.CLES[col])
+            if col == 2:
+                return str(valeur)
+            if col in (3, 4, 5):
+                return valeur if valeur else "-"
+            return valeur
+        if role == Qt.ItemDataRole.ForegroundRole and col == 1 and salle.get("type") == "Petite":
+            return QColor("#FF0000")  # Rouge pour les petites salles
+        if role == Qt.ItemDataRole.TextAlignmentRole and col >= 2:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def fusions(self):
+        """(première ligne, nombre de lignes) des centres de plusieurs salles"""
+        return [(debut, len(centre["salles"]))
+                for debut, centre in zip(self.debuts, self.centres) if len(centre["salles"]) > 1]
+
+    def ajouter_centre(self, centre):
+        """Ajoute un centre et ses salles en fin de tableau"""
+        debut = self.nb_lignes
+        if centre["salles"]:
+            self.beginInsertRows(QModelIndex(), debut, debut + len(centre["salles"]) - 1)
+        self.centres.append(centre)
+        self._indexer()
+        if centre["salles"]:
+            self.endInsertRows()
+
+    def modifier_centre(self, i, nom_centre, salles):
+        """
+        Remplace le nom et les salles du centre i en ne signalant que les lignes touchées :
+        lignes communes -> dataChanged, lignes en plus ou en moins -> insertion / suppression.
+        Un centre sans salle est retiré.
+        """
+        centre = self.centres[i]
+        debut = self.debuts[i]
+        ancien, nouveau = len(centre["salles"]), len(salles)
+
+        centre["nom_centre"] = nom_centre
+        if nouveau < ancien:
+            self.beginRemoveRows(QModelIndex(), debut + nouveau, debut + ancien - 1)
+            centre["salles"] = salles
+            self._indexer()
+            self.endRemoveRows()
+        elif nouveau > ancien:
+            self.beginInsertRows(QModelIndex(), debut + ancien, debut + nouveau - 1)
+            centre["salles"] = salles
+            self._indexer()
+            self.endInsertRows()
+        else:
+            centre["salles"] = salles
+
+        communes = min(ancien, nouveau)
+        if communes:
+            self.dataChanged.emit(self.index(debut, 0), self.index(debut + communes - 1, len(self.COLONNES) - 1))
+        if not salles:
+            del self.centres[i]
+            self._indexer()
+
 class CentresSallesEntryDialog(QDialog):
     data_changed = pyqtSignal()  # Définir le signal
     
@@ -268,12 +392,13 @@ class CentresSallesEntryDialog(QDialog):
         title.setTextFormat(Qt.TextFormat.RichText)
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(title)
-        # Tableau des centres et salles (sans colonne Actions)
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(["Centre", "Locaux d'examen", "Capacité", "Climatisé", "Caméra", "Type"])
+        # Tableau des centres et salles (sans colonne Actions), alimenté par un modèle
+        self.modele = ModeleSalles(self)
+        self.table = QTableView()
+        self.table.setModel(self.modele)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: rgba(50, 50, 60, 0.7);
                 color: white;
                 border-radius: 5px;
@@ -288,8 +413,12 @@ class CentresSallesEntryDialog(QDialog):
                 padding: 6px;
             }
         """)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.layout.addWidget(self.table)
+        # Les fusions de la colonne Centre suivent les insertions et suppressions de lignes
+        self.modele.rowsInserted.connect(self.appliquer_fusions)
+        self.modele.rowsRemoved.connect(self.appliquer_fusions)
+        self.modele.modelReset.connect(self.appliquer_fusions)
         # Boutons
         btn_layout = QHBoxLayout()
         btn_ajouter_centre = QPushButton("Ajouter un Centre")
@@ -388,38 +517,54 @@ class CentresSallesEntryDialog(QDialog):
         btn_layout.addWidget(btn_valider)
         btn_layout.addWidget(btn_annuler)
         self.layout.addLayout(btn_layout)
-        self.centres = []
+        # Boutons désactivés tant que les données ne sont pas chargées
+        self.boutons_edition = [btn_ajouter_centre, btn_importer, btn_afficher_totaux, btn_gerer_salles, btn_valider]
         # Charger les données existantes
         self.charger_donnees()
 
+    @property
+    def centres(self):
+        """Centres et salles affichés (données du modèle)"""
+        return self.modele.centres
+
     def charger_donnees(self):
-        """Charge les données depuis la base de données"""
-        try:
-            # Initialiser les centres
-            self.centres = []
-            
-            # Charger les données
-            centres_charges = charger_centres_et_salles()
-            if centres_charges:
-                self.centres = centres_charges
-                
-            # Mettre à jour l'interface
-            self.mettre_a_jour_tableau()
-            
-        except sqlite3.OperationalError as e:
-            QMessageBox.warning(self, "Base de données occupée", 
-                              "La base de données est temporairement inaccessible. Veuillez réessayer.")
-        except Exception as e:
+        """Charge les données depuis la base de données sans bloquer l'interface"""
+        self.modele.charger([])
+        self.mettre_a_jour_tableau()
+
+    def appliquer_fusions(self, *args):
+        """Fusionne la colonne Centre sur les lignes de chaque centre"""
+        self.table.clearSpans()
+        for debut, nb in self.modele.fusions():
+            self.table.setSpan(debut, 0, nb, 1)
+
+    def set_chargement(self, en_cours):
+        """Désactive le tableau et les boutons d'édition pendant un chargement"""
+        self.table.setEnabled(not en_cours)
+        for bouton in self.boutons_edition:
+            bouton.setEnabled(not en_cours)
+
+    def erreur_chargement(self, e):
+        # Le tableau reste désactivé : il ne reflète pas la base et ne doit pas être enregistré
+        if isinstance(e, sqlite3.OperationalError):
+            reponse = QMessageBox.question(
+                self, "Base de données occupée",
+                "La base de données est temporairement inaccessible. Réessayer ?",
+                QMessageBox.StandardButton.Retry | QMessageBox.StandardButton.Cancel
+            )
+            if reponse == QMessageBox.StandardButton.Retry:
+                self.mettre_a_jour_tableau()
+        else:
             QMessageBox.critical(self, "Erreur de chargement", 
                                f"Erreur lors du chargement des données : {str(e)}")
 
-    def sauvegarder_donnees(self):
-        """Sauvegarde les données dans la base de données"""
+    def sauvegarder_donnees(self, centres=None):
+        """
+        Sauvegarde les données dans la base de données (seules les salles modifiées sont écrites)
+        :param centres: noms des centres modifiés ; None = tous les centres
+        """
         try:
-            if not self.centres:
-                self.centres = []
-            time.sleep(0.5)  # Attendre un court instant avant de sauvegarder
-            sauvegarder_centres_et_salles(self.centres)
+            sauvegarder_centres_et_salles(self.centres, centres)
             self.data_changed.emit()
             return True
         except Exception as e:
@@ -433,33 +578,39 @@ class CentresSallesEntryDialog(QDialog):
             data = dialog.get_data()
             if data["nom_centre"] and data["salles"]:
                 # Vérifier si le centre existe déjà
-                centre_existant = None
-                for centre in self.centres:
-                    if centre["nom_centre"] == data["nom_centre"]:
-                        centre_existant = centre
-                        break
+                indice = next((i for i, centre in enumerate(self.centres)
+                               if centre["nom_centre"] == data["nom_centre"]), None)
                 
-                if centre_existant:
+                if indice is not None:
                     # Ajouter les nouvelles salles au centre existant
-                    centre_existant["salles"].extend(data["salles"])
+                    centre_existant = self.centres[indice]
+                    self.modele.modifier_centre(indice, data["nom_centre"], centre_existant["salles"] + data["salles"])
                 else:
                     # Ajouter le nouveau centre
-                    self.centres.append(data)
+                    self.modele.ajouter_centre(data)
                 
-                # Sauvegarder et mettre à jour
-                self.sauvegarder_donnees()
-                self.mettre_a_jour_tableau()
+                # Sauvegarder (seules les lignes de ce centre sont mises à jour à l'écran)
+                if not self.sauvegarder_donnees(centres=[data["nom_centre"]]):
+                    self.mettre_a_jour_tableau()
 
     def mettre_a_jour_tableau(self):
+        """Relit les centres et salles sur le thread base de données puis remplit le tableau"""
+        self.set_chargement(True)
+        AsyncDB.instance().lire(
+            'centres_et_salles',
+            charger_centres_et_salles,
+            on_resultat=self.remplir_tableau,
+            on_erreur=self.erreur_chargement
+        )
+
+    def remplir_tableau(self, centres):
+        """Remplit le tableau avec les centres lus (appelé sur le thread Qt)"""
         try:
-            self.table.setRowCount(0)  # Vider le tableau
+            self.set_chargement(False)
             centres_uniques = {}  # Dictionnaire pour stocker les centres uniques
             
-            # Charger les données fraîches depuis la base de données
-            self.centres = charger_centres_et_salles()
-            
-            # Regrouper les salles par centre
-            for centre in self.centres:
+            # Regrouper les salles par centre (données fraîches lues depuis la base de données)
+            for centre in centres:
                 nom_centre = centre["nom_centre"]
                 if nom_centre and nom_centre not in centres_uniques:
                     centres_uniques[nom_centre] = {
@@ -469,48 +620,8 @@ class CentresSallesEntryDialog(QDialog):
                 if nom_centre:
                     centres_uniques[nom_centre]["salles"].extend(centre["salles"])
             
-            # Mettre à jour le tableau avec les centres uniques
-            for centre in centres_uniques.values():
-                start_row = self.table.rowCount()
-                for i, salle in enumerate(centre["salles"]):
-                    row = self.table.rowCount()
-                    self.table.insertRow(row)
-                    
-                    # Centre (uniquement sur la première ligne)
-                    if i == 0:
-                        item = QTableWidgetItem(centre["nom_centre"])
-                        item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                        self.table.setItem(row, 0, item)
-                    else:
-                        self.table.setItem(row, 0, QTableWidgetItem(""))
-                    
-                    # Informations sur la salle
-                    salle_item = QTableWidgetItem(salle["nom"])
-                    if salle["type"] == "Petite":
-                        salle_item.setForeground(QColor("#FF0000"))  # Rouge pour les petites salles
-                    self.table.setItem(row, 1, salle_item)
-                    
-                    capacite_item = QTableWidgetItem(str(salle["capacite"]))
-                    capacite_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, 2, capacite_item)
-                    
-                    clim_item = QTableWidgetItem(salle["climatise"] if salle["climatise"] else "-")
-                    clim_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, 3, clim_item)
-                    
-                    cam_item = QTableWidgetItem(salle["camera"] if salle["camera"] else "-")
-                    cam_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, 4, cam_item)
-                    
-                    type_item = QTableWidgetItem(salle["type"] if salle["type"] else "-")
-                    type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    self.table.setItem(row, 5, type_item)
-                
-                if len(centre["salles"]) > 1:
-                    self.table.setSpan(start_row, 0, len(centre["salles"]), 1)
-            
-            # Mettre à jour self.centres avec les centres uniques
-            self.centres = list(centres_uniques.values())
+            # Un seul reset du modèle : les lignes sont produites à l'affichage
+            self.modele.charger(list(centres_uniques.values()))
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la mise à jour du tableau : {str(e)}")
 
@@ -519,18 +630,13 @@ class CentresSallesEntryDialog(QDialog):
             QMessageBox.warning(self, "Aucun centre", "Aucun centre n'a été saisi. Veuillez d'abord ajouter un centre.")
             return
         # Récupérer le centre sélectionné (ligne sélectionnée)
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QMessageBox.warning(self, "Aucun centre sélectionné", "Veuillez sélectionner une ligne du centre à gérer.")
             return
-        # Trouver le nom du centre (colonne 0, première ligne fusionnée)
-        nom_centre = self.table.item(row, 0).text()
-        if not nom_centre:
-            for r in range(row, -1, -1):
-                nom_centre = self.table.item(r, 0).text()
-                if nom_centre:
-                    break
-        for centre in self.centres:
+        # Trouver le centre de la ligne (colonne 0, première ligne fusionnée)
+        nom_centre = self.centres[self.modele.centre_de_ligne(row)]["nom_centre"]
+        for indice, centre in enumerate(self.centres):
             if centre["nom_centre"] == nom_centre:
                 # Ouvrir un QDialog pour modifier le nom du centre et ses salles
                 dialog = QDialog(self)
@@ -621,7 +727,13 @@ class CentresSallesEntryDialog(QDialog):
                 layout.addLayout(btns2_layout)
                 if dialog.exec() == QDialog.DialogCode.Accepted:
                     # Appliquer les modifications
-                    centre["nom_centre"] = edit_nom.text().strip()
+                    nouveau_nom = edit_nom.text().strip() or nom_centre
+                    if nouveau_nom != nom_centre:
+                        try:
+                            SallesDB().renommer_centre(nom_centre, nouveau_nom)
+                        except Exception as e:
+                            QMessageBox.critical(self, "Erreur", f"Impossible de renommer le centre : {e}")
+                            return
                     new_salles = []
                     for r in range(table.rowCount()):
                         nom = table.item(r, 0).text() if table.item(r, 0) else ""
@@ -637,9 +749,10 @@ class CentresSallesEntryDialog(QDialog):
                                 "climatise": clim,
                                 "camera": cam
                             })
-                    centre["salles"] = new_salles
-                    self.sauvegarder_donnees()
-                    self.mettre_a_jour_tableau()
+                    # Seules les lignes de ce centre sont rafraîchies, comparées et écrites
+                    self.modele.modifier_centre(indice, nouveau_nom, new_salles)
+                    if not self.sauvegarder_donnees(centres=[nouveau_nom]):
+                        self.mettre_a_jour_tableau()
                 break
 
     def _add_row_to_table(self, table):
@@ -663,22 +776,8 @@ class CentresSallesEntryDialog(QDialog):
             table.removeRow(row)
 
     def afficher_totaux(self):
-        totaux = {}
-        for centre in self.centres:
-            total = 0
-            total_grande = 0
-            for salle in centre["salles"]:
-                try:
-                    capacite = int(salle["capacite"])
-                    total += capacite
-                    if salle["type"] == "Grande":
-                        total_grande += capacite
-                except ValueError:
-                    pass
-            totaux[centre["nom_centre"]] = {
-                "total": total,
-                "total_grande": total_grande
-            }
+        # Totaux par centre de l'inventaire partagé (chaque modification est déjà enregistrée)
+        totaux = inventaire_salles(SallesDB()).totaux_par_centre()
         
         # Afficher les totaux dans une boîte de dialogue
         dialog = QDialog(self)
@@ -720,10 +819,11 @@ class CentresSallesEntryDialog(QDialog):
         """)
         table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         
-        for i, (centre, data) in enumerate(totaux.items()):
+        for i, (centre, total, total_grande) in enumerate(
+                totaux[['centre', 'capacite', 'capacite_grandes']].itertuples(index=False, name=None)):
             table.setItem(i, 0, QTableWidgetItem(centre))
-            table.setItem(i, 1, QTableWidgetItem(str(data["total"])))
-            table.setItem(i, 2, QTableWidgetItem(str(data["total_grande"])))
+            table.setItem(i, 1, QTableWidgetItem(str(total)))
+            table.setItem(i, 2, QTableWidgetItem(str(total_grande)))
         
         layout.addWidget(table)
         
@@ -767,28 +867,31 @@ class CentresSallesEntryDialog(QDialog):
         dialog.add_row()
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_salles = dialog.get_data()
-            for centre in self.centres:
+            for indice, centre in enumerate(self.centres):
                 if centre["nom_centre"] == nom_centre:
-                    centre["salles"].extend(new_salles)
-                    self.sauvegarder_donnees()
+                    self.modele.modifier_centre(indice, nom_centre, centre["salles"] + new_salles)
+                    if not self.sauvegarder_donnees(centres=[nom_centre]):
+                        self.mettre_a_jour_tableau()
                     break
-            self.mettre_a_jour_tableau()
     def importer_excel(self):
         import pandas as pd
-        import unicodedata
         from PyQt6.QtWidgets import QFileDialog, QMessageBox
-        import openpyxl
         file, _ = QFileDialog.getOpenFileName(self, "Choisir un fichier Excel", "", "Fichiers Excel (*.xlsx *.xls)")
         if not file:
             return
         try:
-            df = pd.read_excel(file)
+            # Fichier identique au dernier import et base inchangée : le tableau montre déjà ses salles
+            historique = getattr(self.parent, 'historique_imports', None)
+            db_path = SallesDB().db_path
+            if historique and historique.deja_importe('salles', file, [db_path]):
+                self.last_imported_file = os.path.basename(file)
+                QMessageBox.information(self, "Fichier déjà importé",
+                                        "Ce fichier a déjà été importé et les salles n'ont pas changé depuis.")
+                return
+            # Une seule lecture du classeur : valeurs et couleur des noms de salles
+            df, types_salles = lire_salles_excel(file)
             # Normaliser les noms de colonnes (enlever accents, espaces, tout en minuscule)
-            def normalize(col):
-                col = str(col)
-                col = ''.join(c for c in unicodedata.normalize('NFD', col) if unicodedata.category(c) != 'Mn')
-                return col.strip().lower().replace(' ', '')
-            df.columns = [normalize(c) for c in df.columns]
+            df.columns = [normaliser_nom_colonne(c) for c in df.columns]
             # Trouver les bons noms de colonnes
             col_centre = next((c for c in df.columns if 'centre' in c), None)
             col_salle = next((c for c in df.columns if 'locaux' in c or 'salle' in c), None)
@@ -798,51 +901,26 @@ class CentresSallesEntryDialog(QDialog):
             if not (col_centre and col_salle and col_capacite):
                 QMessageBox.warning(self, "Colonnes manquantes", "Le fichier doit contenir au moins les colonnes centre, salle et capacité.")
                 return
-            # Charger le workbook openpyxl pour lire la couleur
-            wb = openpyxl.load_workbook(file)
-            ws = wb.active
-            # Associer index pandas et lignes Excel (header=0)
-            excel_headers = [normalize(cell.value) for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-            idx_salle = excel_headers.index(col_salle) if col_salle in excel_headers else None
+            # Lignes de salles (hors totaux et lignes vides), validées en une passe
+            centres_lignes, est_salle = lignes_salles(df, col_centre, col_salle)
+            salles = df[est_salle]
+            validation = valider(
+                salles, schema_salles_classeur(col_salle, col_capacite, col_clim, col_camera),
+                lignes=np.flatnonzero(est_salle) + 2
+            )
+            if not validation['valide']:
+                DialogueRapportValidation("Le fichier des salles contient des erreurs", validation, self).exec()
+                return
             centres_dict = {}
-            last_centre = None
-            for idx, row in df.iterrows():
-                centre = str(row.get(col_centre, "")).strip()
-                if centre and centre.lower() != 'nan':
-                    last_centre = centre
-                if not last_centre:
-                    continue
-                if last_centre not in centres_dict:
-                    centres_dict[last_centre] = []
+            for centre, (_, row) in zip(centres_lignes[est_salle], salles.iterrows()):
                 salle = str(row.get(col_salle, "")).strip()
-                capacite = row.get(col_capacite, "")
                 climatise = str(row.get(col_clim, "")).strip() if col_clim else ''
                 camera = str(row.get(col_camera, "")).strip() if col_camera else ''
-                # Filtrer les lignes vides, totaux, ou non numériques
-                if not salle or salle.lower().startswith('total') or salle == 'nan':
-                    continue
-                try:
-                    cap_int = int(str(capacite).strip())
-                except:
-                    continue
-                # Vérifier la couleur de la cellule du nom de salle (ligne Excel = idx+2 car header=1)
-                type_salle = "Grande"
-                if idx_salle is not None:
-                    cell = ws.cell(row=idx+2, column=idx_salle+1)
-                    color = None
-                    if cell.font and cell.font.color:
-                        if hasattr(cell.font.color, 'rgb') and cell.font.color.rgb:
-                            color = str(cell.font.color.rgb)
-                        elif hasattr(cell.font.color, 'type') and cell.font.color.type == 'rgb' and hasattr(cell.font.color, 'value'):
-                            color = str(cell.font.color.value)
-                    if color:
-                        color_str = color.upper()
-                        # Accepte FFFF0000, FF0000, 00FF0000, etc.
-                        if color_str.endswith('FF0000') or color_str == 'FFFF0000' or color_str == 'FF0000':
-                            type_salle = "Petite"
-                centres_dict[last_centre].append({
+                # Salle écrite en rouge dans le fichier : petite salle
+                type_salle = types_salles.get(cle_salle(row.get(col_salle)), "Grande")
+                centres_dict.setdefault(centre, []).append({
                     "nom": salle,
-                    "capacite": cap_int,
+                    "capacite": int(float(row[col_capacite])),
                     "type": type_salle,
                     "climatise": climatise,
                     "camera": camera
@@ -855,153 +933,45 @@ class CentresSallesEntryDialog(QDialog):
                 QMessageBox.warning(self, "Aucun centre", "Aucun centre ou salle valide trouvé dans le fichier.")
                 return
 
-            try:
-                # Initialiser la base de données
-                os.makedirs('database', exist_ok=True)
-                db_path = os.path.join('database', 'salles.db')
-                
-                # Supprimer l'ancien fichier de base de données s'il existe
-                if os.path.exists(db_path):
-                    os.remove(db_path)
-                
-                # Créer une nouvelle connexion
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                
-                # Créer les nouvelles tables avec les bonnes contraintes
-                cursor.execute('''CREATE TABLE centres
-                                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                 nom TEXT UNIQUE NOT NULL)''')
-                
-                cursor.execute('''CREATE TABLE salles
-                                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                 centre_id INTEGER NOT NULL,
-                                 nom TEXT NOT NULL,
-                                 capacite INTEGER NOT NULL,
-                                 type TEXT NOT NULL,
-                                 climatise TEXT NOT NULL,
-                                 camera TEXT NOT NULL,
-                                 FOREIGN KEY (centre_id) REFERENCES centres(id),
-                                 UNIQUE(centre_id, nom))''')
-                
-                # Insérer les nouvelles données
-                for centre in centres:
-                    cursor.execute("INSERT INTO centres (nom) VALUES (?)",
-                                 (centre["nom_centre"],))
-                    centre_id = cursor.lastrowid
-                    
-                    for salle in centre["salles"]:
-                        cursor.execute("""INSERT INTO salles 
-                                     (centre_id, nom, capacite, type, climatise, camera)
-                                     VALUES (?, ?, ?, ?, ?, ?)""",
-                                     (centre_id, salle["nom"], salle["capacite"],
-                                      salle["type"], salle["climatise"], salle["camera"]))
-                
-                conn.commit()
-                
-                # Mettre à jour l'interface et sauvegarder dans la base de données
-                self.centres = centres
-                time.sleep(0.5)  # Attendre un court instant avant de sauvegarder
-                self.sauvegarder_donnees()  # Sauvegarder explicitement après l'importation
-                self.mettre_a_jour_tableau()
-                self.last_imported_file = os.path.basename(file)
-                QMessageBox.information(self, "Importation réussie", 
-                                     "Les données ont été importées avec succès et remplacent les anciennes données.")
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur d'importation", 
-                                   f"Erreur lors de l'importation : {e}")
-            finally:
-                if 'conn' in locals():
-                    conn.close()
-            QMessageBox.information(self, "Importation réussie", "Les centres et salles ont été importés avec succès.")
+            # Les données importées remplacent les anciennes : seules les différences sont écrites
+            self.modele.charger(centres)
+            if not self.sauvegarder_donnees():
+                return
+            if historique:
+                historique.enregistrer('salles', file, [db_path])
+            # Relire les valeurs normalisées par la base
+            self.mettre_a_jour_tableau()
+            self.last_imported_file = os.path.basename(file)
+            QMessageBox.information(self, "Importation réussie",
+                                 "Les données ont été importées avec succès et remplacent les anciennes données.")
         except Exception as e:
             QMessageBox.critical(self, "Erreur d'importation", f"Erreur lors de l'importation : {e}")
 
-def sauvegarder_centres_et_salles(centres):
-    conn = None
+def sauvegarder_centres_et_salles(centres, noms_centres=None):
+    """
+    Enregistre les centres et leurs salles en n'écrivant que les différences avec la base
+    :param centres: liste de {"nom_centre": ..., "salles": [{"nom", "capacite", "type", "climatise", "camera"}]}
+    :param noms_centres: centres à synchroniser ; None = tous (les centres absents sont supprimés)
+    """
+    lignes = [
+        {"centre": centre["nom_centre"], **salle}
+        for centre in centres
+        for salle in centre["salles"]
+    ]
+    df = pd.DataFrame(lignes, columns=["centre", "nom", "capacite", "climatise", "camera", "type"])
     try:
-        # S'assurer que le dossier database existe
-        os.makedirs('database', exist_ok=True)
-        db_path = os.path.join('database', 'salles.db')
-        
-        # Établir la connexion avec un timeout
-        conn = sqlite3.connect(db_path, timeout=20)
-        cursor = conn.cursor()
-        
-        # Créer les tables avec les bonnes contraintes
-        cursor.execute('''CREATE TABLE IF NOT EXISTS centres
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       nom TEXT UNIQUE NOT NULL)''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS salles
-                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                       centre_id INTEGER NOT NULL,
-                       nom TEXT NOT NULL,
-                       capacite INTEGER NOT NULL,
-                       type TEXT NOT NULL,
-                       climatise TEXT NOT NULL,
-                       camera TEXT NOT NULL,
-                       FOREIGN KEY (centre_id) REFERENCES centres(id),
-                       UNIQUE(centre_id, nom))''')
-        
-        # Vider les tables existantes
-        cursor.execute("DELETE FROM salles")
-        cursor.execute("DELETE FROM centres")
-        
-        # Insérer les nouvelles données avec gestion des doublons
-        for centre in centres:
-            # Insérer ou récupérer le centre
-            cursor.execute("INSERT OR IGNORE INTO centres (nom) VALUES (?)",
-                         (centre["nom_centre"],))
-            cursor.execute("SELECT id FROM centres WHERE nom = ?",
-                         (centre["nom_centre"],))
-            centre_id = cursor.fetchone()[0]
-            
-            # Insérer les salles en évitant les doublons
-            for salle in centre["salles"]:
-                cursor.execute("""INSERT OR REPLACE INTO salles 
-                                (centre_id, nom, capacite, type, climatise, camera)
-                                VALUES (?, ?, ?, ?, ?, ?)""",
-                             (centre_id, salle["nom"], salle["capacite"],
-                              salle["type"], salle["climatise"], salle["camera"]))
-        
-        conn.commit()
+        return SallesDB().synchroniser_salles(df, noms_centres)
     except Exception as e:
-        if conn:
-            conn.rollback()
         print(f"Erreur lors de la sauvegarde : {e}")
-        raise  # Relever l'exception pour le débogage
-    finally:
-        if conn:
-            conn.close()
+        raise
 
 def charger_centres_et_salles():
     conn = None
     try:
-        db_path = os.path.join('database', 'salles.db')
-        if not os.path.exists(db_path):
-            return []
-            
-        conn = sqlite3.connect(db_path, timeout=20)
+        # SallesDB crée les tables si besoin
+        conn = sqlite3.connect(SallesDB().db_path, timeout=20)
         cursor = conn.cursor()
         
-        # Vérifier que les tables existent et les créer si nécessaire
-        cursor.execute('''CREATE TABLE IF NOT EXISTS centres
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          nom TEXT UNIQUE NOT NULL)''')
-        
-        cursor.execute('''CREATE TABLE IF NOT EXISTS salles
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          centre_id INTEGER NOT NULL,
-                          nom TEXT NOT NULL,
-                          capacite INTEGER NOT NULL,
-                          type TEXT NOT NULL,
-                          climatise TEXT NOT NULL,
-                          camera TEXT NOT NULL,
-                          FOREIGN KEY (centre_id) REFERENCES centres(id),
-                          UNIQUE(centre_id, nom))''')
-        
         # Charger les centres et leurs salles
         cursor.execute("""SELECT c.nom,
                                 s.nom, s.capacite, s.type, s.climatise, s.camera
@@ -1036,9 +1006,11 @@ def charger_centres_et_salles():
                 }
         
         return list(centres.values())
-    except Exception as e:
+    except sqlite3.Error as e:
+        # Remonter l'erreur jusqu'à AsyncDB (on_erreur) : un tableau vide affiché à la
+        # place de la base pourrait ensuite être enregistré par-dessus les vraies données
         print(f"Erreur lors du chargement : {e}")
-        return []
+        raise
     finally:
         if conn:
             conn.close()
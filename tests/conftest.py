@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.candidats_db import COLONNES_CANDIDATS, COLONNES_NUMERIQUES, CandidatsDB  # noqa: E402
+from database.salles_db import SallesDB  # noqa: E402
+
+
+def candidats(nb, debut=0):
+    """DataFrame de nb candidats valides, codes C0000, C0001... à partir de debut"""
+    lignes = range(debut, debut + nb)
+    df = pd.DataFrame({col: [f"{col}{i}" for i in lignes] for col in COLONNES_CANDIDATS})
+    df['Code'] = [f"C{i:04d}" for i in lignes]
+    df['Cin'] = [f"AB{i:06d}" for i in lignes]
+    df['DateNaissance'] = '01/02/2005'
+    df['Genre'] = ['M' if i % 2 else 'F' for i in lignes]
+    for col in COLONNES_NUMERIQUES:
+        df[col] = [float(i % 20) for i in lignes]
+    return df
+
+
+@pytest.fixture
+def candidats_db(tmp_path):
+    """CandidatsDB sur une base temporaire (la base de l'application n'est pas touchée)"""
+    db = CandidatsDB.__new__(CandidatsDB)
+    db.db_path = str(tmp_path / 'candidats.db')
+    db.create_tables()
+    return db
+
+
+@pytest.fixture
+def salles_db(tmp_path):
+    """SallesDB sur une base temporaire"""
+    db = SallesDB.__new__(SallesDB)
+    db.db_path = str(tmp_path / 'salles.db')
+    db.create_tables()
+    return db
@@ -0,0 +1,19 @@
+from conftest import candidats
+from database.candidats_db import detecter_codes_en_double
+
+
+def test_codes_en_double_absents():
+    rapport = detecter_codes_en_double(candidats(10))
+    assert rapport.empty
+    assert list(rapport.columns) == ['Code', 'lignes', 'noms']
+
+
+def test_codes_en_double_groupes_par_premiere_apparition():
+    df = candidats(6)
+    df['Code'] = ['B', 'A', 'B', 'C', 'A', 'B']
+    rapport = detecter_codes_en_double(df)
+    assert rapport['Code'].tolist() == ['B', 'A']
+    # Numéros de ligne du fichier (en-tête en ligne 1)
+    assert rapport['lignes'].tolist() == [[2, 4, 7], [3, 6]]
+    assert rapport['noms'].tolist() == [['FirstName0 LastName0', 'FirstName2 LastName2', 'FirstName5 LastName5'],
+                                        ['FirstName1 LastName1', 'FirstName4 LastName4']]
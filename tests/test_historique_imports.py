@@ -0,0 +1,38 @@
+import os
+import shutil
+
+from database.historique_imports import HistoriqueImports
+
+
+def _fichier(chemin, contenu):
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(contenu)
+    return str(chemin)
+
+
+def test_import_de_plusieurs_fichiers(tmp_path, candidats_db):
+    historique = HistoriqueImports(str(tmp_path / 'cache'))
+    chemins_db = [candidats_db.db_path]
+    a = _fichier(tmp_path / 'a.csv', 'Code\nC1\n')
+    b = _fichier(tmp_path / 'b.csv', 'Code\nC2\n')
+
+    assert not historique.deja_importe('candidats', [a, b], chemins_db)
+    historique.enregistrer('candidats', [a, b], chemins_db)
+    assert historique.deja_importe('candidats', [a, b], chemins_db)
+    # Autre ensemble de fichiers, ou un seul des fichiers : import à refaire
+    assert not historique.deja_importe('candidats', [b, a], chemins_db)
+    assert not historique.deja_importe('candidats', a, chemins_db)
+
+    # Copie d'un fichier (autre chemin, même contenu) : reconnue par l'empreinte
+    copie = str(tmp_path / 'copie.csv')
+    shutil.copy(b, copie)
+    assert historique.deja_importe('candidats', [a, copie], chemins_db)
+
+    # Fichier modifié ou base modifiée depuis l'import
+    _fichier(tmp_path / 'a.csv', 'Code\nC3\n')
+    assert not historique.deja_importe('candidats', [a, copie], chemins_db)
+    historique.enregistrer('candidats', [a, copie], chemins_db)
+    with open(candidats_db.db_path, 'ab') as f:
+        f.write(b'\0')
+    assert not historique.deja_importe('candidats', [a, copie], chemins_db)
+    assert not [nom for nom in os.listdir(historique.dossier) if nom.endswith('.tmp')]
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from conftest import candidats
+from database.candidats_db import CodesEnDoubleError
+from database.snapshot_cache import signature_db
+
+
+def _compter(rapport):
+    return (len(rapport['ajouts']), len(rapport['modifications']),
+            len(rapport['suppressions']), rapport['inchanges'])
+
+
+def test_import_differentiel(candidats_db):
+    assert _compter(candidats_db.importer_differentiel(candidats(10))) == (10, 0, 0, 0)
+
+    df = candidats(10)
+    df = df[df['Code'] != 'C0000']                         # 1 suppression
+    df.loc[df['Code'] == 'C0003', 'LastName'] = 'Nouveau'  # 1 modification
+    df = pd.concat([df, candidats(2, debut=10)], ignore_index=True)  # 2 ajouts
+    rapport = candidats_db.importer_differentiel(df)
+    assert rapport['ajouts'] == ['C0010', 'C0011']
+    assert rapport['modifications'] == ['C0003']
+    assert rapport['suppressions'] == ['C0000']
+    assert rapport['inchanges'] == 8
+
+    stockes = candidats_db.get_candidats(['Code', 'LastName']).set_index('Code')['LastName']
+    assert len(stockes) == 11
+    assert stockes['C0003'] == 'Nouveau'
+    assert candidats_db.get_stats()['total_candidats'] == 11
+
+
+def test_import_differentiel_fichier_inchange(candidats_db):
+    candidats_db.importer_differentiel(candidats(20))
+    signature = signature_db(candidats_db.db_path)
+    assert _compter(candidats_db.importer_differentiel(candidats(20))) == (0, 0, 0, 20)
+    assert signature_db(candidats_db.db_path) == signature
+
+
+def test_import_differentiel_refuse_les_codes_en_double(candidats_db):
+    df = candidats(3)
+    df.loc[2, 'Code'] = df.loc[0, 'Code']
+    with pytest.raises(CodesEnDoubleError):
+        candidats_db.importer_differentiel(df)
@@ -0,0 +1,50 @@
+import gc
+
+import pandas as pd
+
+from database.index_recherche import IndexRecherche, _index, index_recherche
+
+CANDIDATS = pd.DataFrame({
+    'Code': ['C001', 'C002', 'C003', 'C004'],
+    'Cin': ['AB123', 'CD456', None, 'ab123'],
+    'LastName': ['Élodie', 'Martin', 'Martinez', 'Durand'],
+    'FirstName': ['Dupont', 'Jean', 'Ana', 'Marta'],
+})
+
+
+def rechercher(texte):
+    resultat = IndexRecherche(CANDIDATS).rechercher(texte)
+    return None if resultat is None else resultat.tolist()
+
+
+def test_texte_vide():
+    assert rechercher('') is None
+    assert rechercher('   ') is None
+
+
+def test_code_et_cin_exacts_sans_casse():
+    assert rechercher(' c002 ') == [1]
+    assert rechercher('AB123') == [0, 3]
+    assert rechercher('C00') == []
+
+
+def test_prefixe_de_nom_sans_accents():
+    assert rechercher('mart') == [1, 2, 3]
+    assert rechercher('MARTINE') == [2]
+    assert rechercher('elo') == [0]
+
+
+def test_nom_complet_dans_les_deux_ordres():
+    assert rechercher('martin jean') == [1]
+    assert rechercher('jean  martin') == [1]
+    assert rechercher('dupont élodie') == [0]
+
+
+def test_index_partage_sans_retenir_le_dataframe():
+    df = CANDIDATS.copy()
+    index = index_recherche(df)
+    assert index_recherche(df) is index
+    cle = id(df)
+    del df
+    gc.collect()
+    assert cle not in _index
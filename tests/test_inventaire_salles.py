@@ -0,0 +1,32 @@
+import pandas as pd
+
+from database.inventaire_salles import CAMERA, GRANDE, InventaireSalles
+
+SALLES = pd.DataFrame([
+    ('P1', 2, 'Non', 'Oui', 'Petite', 'Centre A'),
+    ('G1', 3, 'Oui', 'Non', 'Grande', 'Centre A'),
+    ('X1', 4, 'Non', 'Non', 'Grande', 'Centre B'),
+    ('G2', 1, 'Non', 'Non', 'Grande', 'Centre A'),
+    ('P2', 0, 'Non', 'Non', 'Petite', 'Centre A'),
+], columns=['nom', 'capacite', 'climatise', 'camera', 'type', 'centre'])
+
+
+def test_places_grandes_salles_puis_petites():
+    inventaire = InventaireSalles(SALLES)
+    positions, numeros = inventaire.places('Centre A')
+    assert inventaire.noms[positions].tolist() == ['G1', 'G1', 'G1', 'G2', 'P1', 'P1']
+    assert numeros.tolist() == [1, 2, 3, 1, 1, 2]
+
+
+def test_places_centre_inconnu():
+    positions, numeros = InventaireSalles(SALLES).places('Centre Z')
+    assert len(positions) == 0 and len(numeros) == 0
+
+
+def test_rechercher_et_totaux():
+    inventaire = InventaireSalles(SALLES)
+    assert inventaire.noms[inventaire.rechercher('Centre A', capacite_min=2)].tolist() == ['P1', 'G1']
+    assert inventaire.noms[inventaire.rechercher(requises=CAMERA, exclues=GRANDE)].tolist() == ['P1']
+    totaux = inventaire.totaux_par_centre()
+    assert totaux['capacite'].tolist() == [6, 4]
+    assert totaux['capacite_grandes'].tolist() == [4, 4]
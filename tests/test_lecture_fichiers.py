@@ -0,0 +1,34 @@
+import pytest
+
+from database.lecture_fichiers import TAILLE_PREFIXE_CSV, detecter_format_csv, lire_csv
+
+
+@pytest.mark.parametrize('separateur', [',', ';', '\t', '|'])
+def test_separateur(tmp_path, separateur):
+    chemin = tmp_path / 'f.csv'
+    chemin.write_text(f"Code{separateur}Nom\n001{separateur}Ali\n002{separateur}Sara\n", encoding='utf-8')
+    assert detecter_format_csv(chemin) == ('utf-8', separateur)
+
+
+def test_encodages(tmp_path):
+    chemin = tmp_path / 'f.csv'
+    chemin.write_bytes('Code;Nom\n001;Hélène\n'.encode('utf-8-sig'))
+    assert detecter_format_csv(chemin) == ('utf-8-sig', ';')
+    chemin.write_bytes('Code;Nom\n001;Hélène\n'.encode('latin1'))
+    assert detecter_format_csv(chemin) == ('latin1', ';')
+
+
+def test_caractere_coupe_par_la_fin_du_prefixe(tmp_path):
+    # Un « é » (2 octets) à cheval sur la limite du préfixe analysé reste de l'UTF-8
+    debut = 'Code,Nom\n' + 'x' * (TAILLE_PREFIXE_CSV - len('Code,Nom\n') - 1)
+    chemin = tmp_path / 'f.csv'
+    chemin.write_bytes((debut + 'é\n').encode('utf-8'))
+    assert detecter_format_csv(chemin)[0] == 'utf-8'
+
+
+def test_lecture_codes_texte_et_notes_numeriques(tmp_path):
+    chemin = tmp_path / 'f.csv'
+    chemin.write_text("Code;Score\n001;12,5\n002;8\n", encoding='utf-8')
+    df = lire_csv(chemin, dtypes={'Code': str, 'Score': str}, colonnes_numeriques=['Score'])
+    assert df['Code'].tolist() == ['001', '002']
+    assert df['Score'].tolist() == [12.5, 8.0]
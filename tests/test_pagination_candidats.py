@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import candidats
+from database.candidats_db import COLONNES_CANDIDATS
+from database.snapshot_cache import signature_db
+
+
+def _toutes_les_pages(db, tri, decroissant, taille):
+    lignes, apres = [], None
+    while True:
+        page, apres = db.lire_page_candidats(tri, decroissant, apres, taille)
+        lignes += page
+        if len(page) < taille:
+            return lignes
+
+
+@pytest.mark.parametrize('tri', ['Code', 'LastName', 'Genre', 'Score'])
+@pytest.mark.parametrize('decroissant', [False, True])
+def test_pagination_par_cle(candidats_db, tri, decroissant):
+    df = candidats(53)
+    df['LastName'] = [f"Nom{i % 7}" for i in range(53)]  # valeurs répétées : départage par Code
+    candidats_db.importer_differentiel(df)
+    signature = signature_db(candidats_db.db_path)
+
+    lignes = _toutes_les_pages(candidats_db, tri, decroissant, taille=10)
+
+    col = COLONNES_CANDIDATS.index(tri)
+    code = COLONNES_CANDIDATS.index('Code')
+    cles = [(ligne[col], ligne[code]) for ligne in lignes]
+    assert len(lignes) == 53
+    assert len(set(ligne[code] for ligne in lignes)) == 53
+    assert cles == sorted(cles, reverse=decroissant)
+    # La lecture paginée n'écrit pas dans la base
+    assert signature_db(candidats_db.db_path) == signature
+
+
+def test_pagination_colonne_inconnue(candidats_db):
+    with pytest.raises(ValueError):
+        candidats_db.lire_page_candidats('Inconnue')
+
+
+def test_tri_du_modele_limite_aux_colonnes_indexees(candidats_db):
+    from PyQt6.QtCore import Qt
+    from modeles import ModeleCandidatsSQL
+    candidats_db.importer_differentiel(candidats(5))
+    modele = ModeleCandidatsSQL(candidats_db)
+    modele.sort(COLONNES_CANDIDATS.index('LastName'), Qt.SortOrder.DescendingOrder)
+    assert (modele.tri, modele.decroissant) == ('LastName', True)
+    # Colonne sans index : tri ignoré, l'en-tête revient au tri courant
+    modele.sort(COLONNES_CANDIDATS.index('Genre'), Qt.SortOrder.AscendingOrder)
+    assert modele.section_tri() == (COLONNES_CANDIDATS.index('LastName'), Qt.SortOrder.DescendingOrder)
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pandas as pd
+
+from database.snapshot_cache import signature_db
+
+
+def salles(lignes):
+    return pd.DataFrame(lignes, columns=['centre', 'nom', 'capacite', 'climatise', 'camera', 'type'])
+
+
+INITIALES = salles([
+    ('Centre A', 'Salle 1', 30, 'Oui', 'Non', 'Grande'),
+    ('Centre A', 'Salle 2', 20, 'Non', 'Oui', 'Petite'),
+    ('Centre B', 'Salle 1', 40, 'Non', 'Non', 'Grande'),
+])
+
+
+def _stockees(db):
+    df = db.get_salles_avec_centres()
+    return {(centre, nom): int(capacite) for centre, nom, capacite in df[['centre', 'nom', 'capacite']].itertuples(index=False)}
+
+
+def test_premiere_synchronisation(salles_db):
+    rapport = salles_db.synchroniser_salles(INITIALES)
+    assert rapport == {'ajouts': 3, 'modifications': 0, 'suppressions': 0, 'inchanges': 0}
+    assert _stockees(salles_db) == {('Centre A', 'Salle 1'): 30, ('Centre A', 'Salle 2'): 20,
+                                    ('Centre B', 'Salle 1'): 40}
+    assert salles_db.get_capacite_totale() == (90, 70, 20)
+
+
+def test_differences_seulement(salles_db):
+    salles_db.synchroniser_salles(INITIALES)
+    nouvelles = salles([
+        (' Centre A ', 'Salle 1', 35, 'oui', 'non', 'Grande'),  # capacité modifiée, espaces et casse ignorés
+        ('Centre A', 'Salle 2', 20, 'Non', 'Oui', 'Petite'),
+        ('Centre C', 'Salle 9', 25, 'Non', 'Non', 'Grande'),
+    ])
+    rapport = salles_db.synchroniser_salles(nouvelles)
+    assert rapport == {'ajouts': 1, 'modifications': 1, 'suppressions': 1, 'inchanges': 1}
+    assert _stockees(salles_db) == {('Centre A', 'Salle 1'): 35, ('Centre A', 'Salle 2'): 20,
+                                    ('Centre C', 'Salle 9'): 25}
+    # Le centre B n'a plus de salle : il est supprimé
+    with sqlite3.connect(salles_db.db_path) as conn:
+        assert [nom for nom, in conn.execute('SELECT nom FROM centres ORDER BY nom')] == ['Centre A', 'Centre C']
+
+
+def test_synchronisation_inchangee(salles_db):
+    salles_db.synchroniser_salles(INITIALES)
+    signature = signature_db(salles_db.db_path)
+    rapport = salles_db.synchroniser_salles(INITIALES)
+    assert rapport == {'ajouts': 0, 'modifications': 0, 'suppressions': 0, 'inchanges': 3}
+    assert signature_db(salles_db.db_path) == signature
+
+
+def test_synchronisation_limitee_a_des_centres(salles_db):
+    salles_db.synchroniser_salles(INITIALES)
+    rapport = salles_db.synchroniser_salles(salles([('Centre B', 'Salle 2', 15, 'Non', 'Non', 'Petite')]),
+                                            centres=['Centre B'])
+    assert rapport == {'ajouts': 1, 'modifications': 0, 'suppressions': 1, 'inchanges': 0}
+    # Les salles du centre A ne sont ni comparées ni supprimées
+    assert _stockees(salles_db) == {('Centre A', 'Salle 1'): 30, ('Centre A', 'Salle 2'): 20,
+                                    ('Centre B', 'Salle 2'): 15}
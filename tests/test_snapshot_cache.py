@@ -0,0 +1,28 @@
+import os
+import threading
+
+import pandas as pd
+
+from database.snapshot_cache import SnapshotCache
+
+
+def test_ecritures_concurrentes(tmp_path):
+    cache = SnapshotCache(str(tmp_path / 'cache'))
+    db_path = str(tmp_path / 'base.db')
+    open(db_path, 'wb').close()
+    signature = cache.signature([db_path])
+
+    def ecrire(i):
+        for _ in range(20):
+            cache.enregistrer('candidats', pd.DataFrame({'x': [i] * 1000}), signature)
+
+    threads = [threading.Thread(target=ecrire, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Un instantané complet, écrit par un seul appel, et aucun fichier temporaire restant
+    df = cache.charger('candidats', [db_path])
+    assert df is not None and len(df) == 1000 and df['x'].nunique() == 1
+    assert not [nom for nom in os.listdir(cache.dossier) if nom.endswith('.tmp')]
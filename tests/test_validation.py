@@ -0,0 +1,75 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from conftest import candidats
+from database.candidats_db import SCHEMA_CANDIDATS
+from database.salles_db import lignes_salles, schema_salles_classeur
+from database.validation import valider
+
+
+def test_fichier_conforme():
+    rapport = valider(candidats(50), SCHEMA_CANDIDATS)
+    assert rapport['valide']
+    assert rapport['nb_violations'] == 0
+    assert rapport['detail'].empty
+
+
+def test_colonne_obligatoire_manquante():
+    rapport = valider(candidats(5).drop(columns=['Cin']), SCHEMA_CANDIDATS)
+    assert not rapport['valide']
+    assert rapport['colonnes_manquantes'] == ['Cin']
+
+
+def test_violations_par_regle_et_numero_de_ligne():
+    df = candidats(6)
+    df['Score'] = df['Score'].astype(object)
+    df.loc[1, 'LastName'] = '   '
+    df.loc[2, 'Score'] = 'abc'
+    df.loc[3, 'MoyGenerale'] = 25.0
+    df.loc[4, 'Cin'] = 'AB-12'
+    rapport = valider(df, SCHEMA_CANDIDATS)
+
+    assert not rapport['valide']
+    assert rapport['nb_violations'] == 4
+    par_regle = {(col, regle): nb for col, regle, nb in rapport['par_regle'].itertuples(index=False)}
+    assert par_regle == {('LastName', 'vide'): 1, ('Score', 'type'): 1,
+                         ('MoyGenerale', 'max'): 1, ('Cin', 'regex'): 1}
+    # Ligne 1 du fichier = en-tête : la première ligne de données est la ligne 2
+    assert rapport['detail']['ligne'].tolist() == [3, 4, 5, 6]
+
+
+def test_dates_texte_et_dates_excel():
+    df = candidats(6)
+    df['DateNaissance'] = pd.Series(['01/02/2005', '2005-02-01', datetime.datetime(2005, 2, 1),
+                                     pd.Timestamp('2005-02-01'), '31/31/2005', 12345], dtype=object)
+    rapport = valider(df, SCHEMA_CANDIDATS)
+    detail = rapport['detail']
+    assert detail['regle'].tolist() == ['date', 'date']
+    assert detail['ligne'].tolist() == [6, 7]
+
+
+def test_regle_unique_et_detail_limite():
+    df = pd.DataFrame({'x': [1, 1, 2, np.nan, 2]})
+    rapport = valider(df, {'x': {'type': 'entier', 'unique': True, 'obligatoire': False}}, max_details=3)
+    assert rapport['nb_violations'] == 4
+    assert len(rapport['detail']) == 3
+
+
+def test_lignes_de_salles_d_un_classeur():
+    # Centre écrit sur sa première salle seulement, ligne de total et ligne vide entre les centres
+    df = pd.DataFrame({
+        'centres d examen': ['Centre A', None, None, None, 'Centre B', None],
+        'locaux d examen': ['101', 'Salle 2', 'Total', None, 'Salle 1', 'Salle 2'],
+        'capacite': [30, 'vingt', 50, None, 40, 0],
+    })
+    centres, est_salle = lignes_salles(df, 'centres d examen', 'locaux d examen')
+    assert est_salle.tolist() == [True, True, False, False, True, True]
+    assert centres[est_salle].tolist() == ['Centre A', 'Centre A', 'Centre B', 'Centre B']
+
+    # Les lignes de mise en forme ne sont pas validées ; numéros de ligne du fichier
+    salles = df[est_salle]
+    rapport = valider(salles, schema_salles_classeur('locaux d examen', 'capacite'),
+                      lignes=np.flatnonzero(est_salle) + 2)
+    assert rapport['detail'][['ligne', 'regle']].values.tolist() == [[3, 'type'], [7, 'min']]
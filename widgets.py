@@ -1,22 +1,56 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtGui import *
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QSize, QRect, QPoint
 import os
+from database.validation import formater_resume, formater_detail
+
+# Délai avant de recalculer le fond après un redimensionnement (ms)
+DELAI_REDIMENSIONNEMENT_FOND = 150
+
+
+def taille_ecrans():
+    """Plus grande taille d'écran disponible, en pixels physiques"""
+    taille = QSize()
+    for ecran in QGuiApplication.screens():
+        taille = taille.expandedTo(ecran.size() * ecran.devicePixelRatio())
+    return taille
+
 
 class BackgroundWidget(QWidget):
     """Widget avec image de fond"""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, taille_decodage=None):
+        """
+        :param taille_decodage: si donnée (QSize), l'image est décodée directement à la
+                                plus petite taille couvrant cette surface plutôt qu'en
+                                pleine résolution (ex. taille_ecrans())
+        """
         super().__init__(parent)
         self.background_pixmap = None
+        self.taille_decodage = taille_decodage
+        # Fond mis à l'échelle pour la taille actuelle, recalculé seulement au redimensionnement
+        self.fond_mis_a_echelle = None
+        self.minuteur_fond = QTimer(self)
+        self.minuteur_fond.setSingleShot(True)
+        self.minuteur_fond.setInterval(DELAI_REDIMENSIONNEMENT_FOND)
+        self.minuteur_fond.timeout.connect(self.mettre_fond_a_echelle)
         self.load_background_image()
     
     def load_background_image(self):
         """Charge l'image de fond"""
         background_path = os.path.join(os.path.dirname(__file__), "assets", "img.jpg")
         if os.path.exists(background_path):
-            self.background_pixmap = QPixmap(background_path)
-        else:
-            self.create_default_background()
+            lecteur = QImageReader(background_path)
+            if self.taille_decodage is not None and self.taille_decodage.isValid():
+                taille = lecteur.size().scaled(self.taille_decodage, Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+                if taille.width() < lecteur.size().width():
+                    # Le décodeur JPEG réduit l'image pendant la lecture
+                    lecteur.setScaledSize(taille)
+            image = lecteur.read()
+            if not image.isNull():
+                self.background_pixmap = QPixmap.fromImage(image)
+                self.fond_mis_a_echelle = None
+                return
+        self.create_default_background()
     
     def create_default_background(self):
         """Crée une image de fond par défaut"""
@@ -28,17 +62,40 @@ class BackgroundWidget(QWidget):
         painter.fillRect(pixmap.rect(), QBrush(gradient))
         painter.end()
         self.background_pixmap = pixmap
+        self.fond_mis_a_echelle = None
     
-    def paintEvent(self, event):
-        """Dessine l'image de fond"""
-        painter = QPainter(self)
-        if self.background_pixmap:
-            scaled_pixmap = self.background_pixmap.scaled(
+    def mettre_fond_a_echelle(self, redessiner=True):
+        """Recalcule le fond lissé à la taille du widget"""
+        if self.background_pixmap and (self.fond_mis_a_echelle is None
+                                       or self.fond_mis_a_echelle.size() != self.taille_fond()):
+            self.fond_mis_a_echelle = self.background_pixmap.scaled(
                 self.size(), 
                 Qt.AspectRatioMode.KeepAspectRatioByExpanding,
                 Qt.TransformationMode.SmoothTransformation
             )
-            painter.drawPixmap(0, 0, scaled_pixmap)
+            if redessiner:
+                self.update()
+    
+    def taille_fond(self):
+        """Taille du fond couvrant le widget"""
+        return self.background_pixmap.size().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+    
+    def resizeEvent(self, event):
+        # Attendre la fin du redimensionnement avant de relisser le fond
+        self.minuteur_fond.start()
+        super().resizeEvent(event)
+    
+    def paintEvent(self, event):
+        """Dessine l'image de fond"""
+        painter = QPainter(self)
+        if self.background_pixmap:
+            if self.fond_mis_a_echelle is None:
+                self.mettre_fond_a_echelle(redessiner=False)
+            if self.fond_mis_a_echelle.size() == self.taille_fond():
+                painter.drawPixmap(0, 0, self.fond_mis_a_echelle)
+            else:
+                # Redimensionnement en cours : fond précédent étiré sans lissage
+                painter.drawPixmap(QRect(QPoint(0, 0), self.taille_fond()), self.fond_mis_a_echelle)
         super().paintEvent(event)
 
 class CardWidget(QFrame):
@@ -91,6 +148,109 @@ class ModernButton(QPushButton):
             }}
         """)
 
+class RapportPagine(QWidget):
+    """
+    Zone de texte paginée pour les rapports d'erreurs volumineux.
+    Seule la page affichée est mise en forme : formater(debut, fin) retourne
+    les lignes de texte des éléments debut à fin-1.
+    """
+    def __init__(self, nb_elements, formater, par_page=100, parent=None):
+        super().__init__(parent)
+        self.nb_elements = nb_elements
+        self.formater = formater
+        self.par_page = par_page
+        self.nb_pages = max(1, -(-nb_elements // par_page))
+        self.page = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.text_area = QTextEdit()
+        self.text_area.setReadOnly(True)
+        self.text_area.setStyleSheet("""
+            QTextEdit {
+                background-color: rgba(40, 44, 52, 1);
+                color: #ffffff;
+                font-size: 14px;
+                border: 2px solid rgba(255, 255, 255, 0.2);
+                border-radius: 6px;
+                padding: 15px;
+            }
+        """)
+        self.text_area.setMinimumHeight(200)
+        layout.addWidget(self.text_area)
+
+        navigation = QHBoxLayout()
+        self.btn_precedent = ModernButton("◀ Précédent", height=30)
+        self.btn_precedent.clicked.connect(lambda: self.afficher_page(self.page - 1))
+        self.label_page = QLabel()
+        self.label_page.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label_page.setStyleSheet("color: #bdc3c7; background: transparent;")
+        self.btn_suivant = ModernButton("Suivant ▶", height=30)
+        self.btn_suivant.clicked.connect(lambda: self.afficher_page(self.page + 1))
+        navigation.addWidget(self.btn_precedent)
+        navigation.addWidget(self.label_page, 1)
+        navigation.addWidget(self.btn_suivant)
+        layout.addLayout(navigation)
+
+        self.afficher_page(0)
+
+    def afficher_page(self, page):
+        self.page = min(max(page, 0), self.nb_pages - 1)
+        debut = self.page * self.par_page
+        fin = min(debut + self.par_page, self.nb_elements)
+        self.text_area.setPlainText("\n".join(self.formater(debut, fin)))
+        self.label_page.setText(
+            f"Page {self.page + 1} / {self.nb_pages} — éléments {debut + 1 if fin else 0} à {fin} sur {self.nb_elements}"
+        )
+        self.btn_precedent.setEnabled(self.page > 0)
+        self.btn_suivant.setEnabled(self.page < self.nb_pages - 1)
+
+class DialogueRapportValidation(QDialog):
+    """Rapport de validation d'un fichier : résumé par règle et détail paginé"""
+    def __init__(self, titre, rapport, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Erreur - Fichier invalide")
+        self.setStyleSheet("""
+           QDialog {
+            background-color: rgba(40, 40, 50, 0.7);
+            border-radius: 12px;
+        }
+         """)
+        self.setMinimumWidth(500)
+        layout = QVBoxLayout(self)
+        title = QLabel(f"<span style='color:#3498db; font-size:18px; font-weight:bold;'>{titre}</span>")
+        title.setTextFormat(Qt.TextFormat.RichText)
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        # Résumé par colonne et par règle
+        resume_label = QLabel(formater_resume(rapport))
+        resume_label.setStyleSheet("color: white; font-size: 14px; background: transparent;")
+        layout.addWidget(resume_label)
+        # Détail par case, page par page
+        if len(rapport['detail']):
+            layout.addWidget(RapportPagine(
+                len(rapport['detail']),
+                lambda debut, fin: formater_detail(rapport, debut, fin)
+            ))
+        # Bouton fermer
+        btn_close = QPushButton("Fermer")
+        btn_close.setStyleSheet("""
+        QPushButton {
+            background-color: #3498db;
+            color: white;
+            border-radius: 6px;
+            padding: 8px 24px;
+            font-weight: bold;
+            font-size: 15px;
+        }
+        QPushButton:hover {
+            background-color: #217dbb;
+        }
+       """)
+        btn_close.clicked.connect(self.accept)
+        layout.addWidget(btn_close, alignment=Qt.AlignmentFlag.AlignCenter)
+
 class CentresSallesEntryDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)